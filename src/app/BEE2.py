@@ -81,6 +81,7 @@ async def init_app() -> None:
             loader=loadScreen.main_loader,
             has_mel_music=gameMan.MUSIC_MEL_VPK is not None,
             has_tag_music=gameMan.MUSIC_TAG_LOC is not None,
+            use_processes=conf.parse_in_processes,
         ))
     package_sys = packages.PACKAGE_SYS
     loadScreen.main_loader.step('UI', 'pre_ui')
@@ -449,6 +449,10 @@ def quit_application() -> None:
         gameMan.save()
     except Exception:
         pass
+    try:
+        img.save_cache()
+    except Exception:
+        LOGGER.exception('Saving image cache:')
     # Clean this out.
     snd.clean_sample_folder()
 
@@ -490,6 +490,7 @@ class GenOptions(Data):
     log_item_fallbacks: bool = attrs.field(default=False, metadata={'legacy': 'Debug'})
     log_incorrect_packfile: bool = attrs.field(default=False, metadata={'legacy': 'Debug'})
     force_all_editor_models: bool = attrs.field(default=False, metadata={'legacy': 'Debug'})
+    parse_in_processes: bool = attrs.field(default=False, metadata={'legacy': 'Debug'})
 
     @classmethod
     def parse_legacy(cls, conf: Property) -> Dict[str, 'GenOptions']:
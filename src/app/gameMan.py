@@ -6,7 +6,7 @@ Does stuff related to the actual games.
 - Generating and saving editoritems/vbsp_config
 """
 from __future__ import annotations
-from typing import Optional, Union, Any, Type, IO
+from typing import Optional, Union, Any, Type, IO, Dict, Tuple
 from pathlib import Path
 from collections.abc import Iterable, Iterator
 
@@ -14,13 +14,13 @@ from tkinter import *  # ui library
 from tkinter import filedialog  # open/save as dialog creator
 from tkinter import messagebox  # simple, standard modal dialogs
 
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import os
 import shutil
 import math
 import re
 import io
 import pickle
-import pickletools
 import copy
 import webbrowser
 from atomicwrites import atomic_write
@@ -32,12 +32,15 @@ from srctools import (
     VMF, Output,
     FileSystem, FileSystemChain,
 )
+from srctools.filesys import File
 import srctools.logger
 import srctools.fgd
 from app import backup, config, tk_tools, resource_gen, TK_ROOT, DEV_MODE
 from localisation import gettext
 import loadScreen
 import packages.template_brush
+import compiled_conf
+import editoritems_db
 import editoritems
 import utils
 
@@ -115,6 +118,12 @@ MaterialModify
 # The location of all the instances in the game directory
 INST_PATH = 'sdk_content/maps/instances/bee2'
 
+# Records the resources copied into the game, so unchanged files can be skipped.
+RES_MANIFEST = 'bin/bee2/resources.bin'
+RES_MANIFEST_VERSION = 1
+# Destination path -> source package, source cache key, size and modification time.
+ResManifest = Dict[str, Tuple[str, int, int, int]]
+
 # The line we inject to add our BEE2 folder into the game search path.
 # We always add ours such that it's the highest priority, other
 # than '|gameinfo_path|.'
@@ -286,6 +295,14 @@ def should_backup_app(file: str) -> bool:
         return b'BenVlodgi' not in end_data and b'MEI\014\013\012\013\016' not in end_data
 
 
+def copy_resource(file: File, dest: str) -> os.stat_result:
+    """Copy a resource file into the game, returning the new file's details."""
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    with file.open_bin() as fsrc, open(dest, 'wb') as fdest:
+        shutil.copyfileobj(fsrc, fdest)
+    return os.stat(dest)
+
+
 class Game:
     def __init__(
         self,
@@ -544,38 +561,71 @@ class Game:
 
         already_copied is passed from copy_mod_music(), to
         indicate which files should remain. It is the full path to the files.
+
+        A manifest of the files we copied is kept, so files which haven't
+        changed since the last export don't need to be copied again.
         """
         screen_func = export_screen.step
+        old_manifest = self._load_res_manifest()
+        manifest: ResManifest = {}
+        # Package filesystem -> ID, to record where each file came from.
+        sys_to_pak = {id(fsys): pak_id for pak_id, fsys in packages.PACKAGE_SYS.items()}
+
+        with res_system, ThreadPoolExecutor(thread_name_prefix='res_copy') as pool:
+            copying: dict[Future[os.stat_result], tuple[str, str, int]] = {}
+            # Equivalent to res_system.walk_folder_repeat(), but we need the package.
+            for fsys, prefix in res_system.systems:
+                pak_id = sys_to_pak.get(id(fsys), '')
+                for file in fsys.walk_folder(prefix):
+                    rel_path = os.path.relpath(file.path, prefix).replace('\\', '/')
+                    try:
+                        start_folder, path = rel_path.split('/', 1)
+                    except ValueError:
+                        LOGGER.warning('File in resources root: "{}"!', rel_path)
+                        continue
 
-        with res_system:
-            for file in res_system.walk_folder_repeat():
-                try:
-                    start_folder, path = file.path.split('/', 1)
-                except ValueError:
-                    LOGGER.warning('File in resources root: "{}"!', file.path)
-                    continue
+                    start_folder = start_folder.casefold()
 
-                start_folder = start_folder.casefold()
+                    if start_folder == 'instances':
+                        dest = self.abs_path(INST_PATH + '/' + path)
+                    elif start_folder in ('bee2', 'music_samp'):
+                        screen_func('RES', start_folder)
+                        continue  # Skip app icons and music samples.
+                    else:
+                        # Preserve original casing.
+                        dest = self.abs_path(os.path.join('bee2', rel_path))
 
-                if start_folder == 'instances':
-                    dest = self.abs_path(INST_PATH + '/' + path)
-                elif start_folder in ('bee2', 'music_samp'):
-                    screen_func('RES', start_folder)
-                    continue  # Skip app icons and music samples.
-                else:
-                    # Preserve original casing.
-                    dest = self.abs_path(os.path.join('bee2', file.path))
+                    # Already copied from another package.
+                    if dest in already_copied:
+                        screen_func('RES', dest)
+                        continue
+                    already_copied.add(dest)
 
-                # Already copied from another package.
-                if dest in already_copied:
-                    screen_func('RES', dest)
-                    continue
-                already_copied.add(dest)
+                    cache_key = file.cache_key()
+                    # If the source is the same, and the file we wrote is still there
+                    # unmodified, it doesn't need to be copied again.
+                    try:
+                        old_pak, old_key, old_size, old_mtime = old_manifest[dest]
+                        stat = os.stat(dest)
+                    except (KeyError, FileNotFoundError):
+                        pass
+                    else:
+                        if (
+                            cache_key != -1 and old_key == cache_key and old_pak == pak_id
+                            and old_size == stat.st_size and old_mtime == stat.st_mtime_ns
+                        ):
+                            manifest[dest] = old_manifest[dest]
+                            screen_func('RES', rel_path)
+                            continue
 
-                os.makedirs(os.path.dirname(dest), exist_ok=True)
-                with file.open_bin() as fsrc, open(dest, 'wb') as fdest:
-                    shutil.copyfileobj(fsrc, fdest)
-                screen_func('RES', file.path)
+                    copying[pool.submit(copy_resource, file, dest)] = (dest, pak_id, cache_key)
+
+            LOGGER.info('Copying {} changed resources...', len(copying))
+            for future in as_completed(copying):
+                dest, pak_id, cache_key = copying[future]
+                stat = future.result()
+                manifest[dest] = (pak_id, cache_key, stat.st_size, stat.st_mtime_ns)
+                screen_func('RES', dest)
 
         LOGGER.info('Cache copied.')
 
@@ -593,6 +643,9 @@ class Game:
                         LOGGER.info('Deleting: {}', path)
                         os.remove(path)
 
+        with atomic_write(self.abs_path(RES_MANIFEST), mode='wb', overwrite=True) as f:
+            pickle.dump((RES_MANIFEST_VERSION, manifest), f, pickle.HIGHEST_PROTOCOL)
+
         # Save the new cache modification date.
         self.mod_times.clear()
         for pack_id, pack in packages.LOADED.packages.items():
@@ -600,6 +653,20 @@ class Game:
         self.save()
         CONFIG.save_check()
 
+    def _load_res_manifest(self) -> ResManifest:
+        """Load the manifest of resources copied in the last export."""
+        try:
+            with open(self.abs_path(RES_MANIFEST), 'rb') as f:
+                version, manifest = pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            LOGGER.warning('Could not read resource manifest:', exc_info=True)
+            return {}
+        if version != RES_MANIFEST_VERSION:
+            return {}
+        return manifest
+
     def clear_cache(self) -> None:
         """Remove all resources from the game."""
         shutil.rmtree(self.abs_path(INST_PATH), ignore_errors=True)
@@ -838,8 +905,7 @@ class Game:
 
             LOGGER.info('Writing Editoritems database...')
             with open(self.abs_path('bin/bee2/editor.bin'), 'wb') as inst_file:
-                pick = pickletools.optimize(pickle.dumps(all_items))
-                inst_file.write(pick)
+                editoritems_db.write(inst_file, all_items)
             export_screen.step('EXP', 'editoritems_db')
 
             LOGGER.info('Writing VBSP Config!')
@@ -847,6 +913,9 @@ class Game:
             with open(self.abs_path('bin/bee2/vbsp_config.cfg'), 'w', encoding='utf8') as vbsp_file:
                 for line in vbsp_config.export():
                     vbsp_file.write(line)
+            # Also write the binary form, which the compiler reads much faster.
+            with atomic_write(self.abs_path('bin/bee2/vbsp_config.bin'), mode='wb', overwrite=True) as bin_file:
+                compiled_conf.write(bin_file, vbsp_config, self.abs_path('bin/bee2/vbsp_config.cfg'))
             export_screen.step('EXP', 'vbsp_config')
 
             if num_compiler_files > 0:
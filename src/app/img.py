@@ -24,7 +24,7 @@ from srctools.vtf import VTFFlags, VTF
 from srctools.filesys import FileSystem, RawFileSystem, FileSystemChain
 import srctools.logger
 
-from app import TK_ROOT
+from app import TK_ROOT, img_cache
 import utils
 
 # Widgets with an image attribute that can be set.
@@ -57,6 +57,8 @@ _unused_tk_img: dict[tuple[int, int], list[tk.PhotoImage]] = {}
 LOGGER = srctools.logger.get_logger('img')
 FSYS_BUILTIN = RawFileSystem(str(utils.install_path('images')))
 PACK_SYSTEMS: dict[str, FileSystem] = {}
+# Modification time of each package, or zero if images from it shouldn't be cached.
+_PACK_MTIMES: dict[str, int] = {}
 
 # Silence DEBUG messages from Pillow, they don't help.
 logging.getLogger('PIL').setLevel(logging.INFO)
@@ -166,6 +168,7 @@ def _load_file(
         img_file = fsys[path]
     except (KeyError, FileNotFoundError):
         img_file = None
+    in_package = img_file is not None
 
     # Deprecated behaviour, check the other packages.
     if img_file is None and check_other_packages:
@@ -185,6 +188,17 @@ def _load_file(
         LOGGER.error('"{}" does not exist!', uri)
         return Handle.error(width, height).get_pil()
 
+    cache_key: img_cache.Key | None = None
+    # Only cache if found in the package it was meant to be in.
+    if in_package and fsys is PACK_SYSTEMS.get(uri.package):
+        mtime = _PACK_MTIMES.get(uri.package, 0)
+        if mtime:
+            cache_key = (uri.package, path, mtime, width, height, resize_algo)
+            cached = img_cache.get(cache_key)
+            if cached is not None:
+                cache_width, cache_height, pixels = cached
+                return Image.frombytes('RGBA', (cache_width, cache_height), pixels)
+
     try:
         with img_file.open_bin() as file:
             if path.casefold().endswith('.vtf'):
@@ -216,6 +230,8 @@ def _load_file(
 
     if width > 0 and height > 0 and (width, height) != image.size:
         image = image.resize((width, height), resample=resize_algo)
+    if cache_key is not None and image.mode == 'RGBA':
+        img_cache.add(cache_key, image.width, image.height, image.tobytes())
     return image
 
 
@@ -790,18 +806,34 @@ async def _spin_load_icons() -> None:
                 handle._cached_tk.paste(handle._load_pil())
 
 
+def save_cache() -> None:
+    """Write the image cache to disk, if packages were loaded."""
+    if _PACK_MTIMES:
+        img_cache.save(_PACK_MTIMES)
+
+
 # noinspection PyProtectedMember
 async def init(filesystems: Mapping[str, FileSystem]) -> None:
     """Load in the filesystems used in package and start the background loading."""
     global _load_nursery
 
     PACK_SYSTEMS.clear()
+    _PACK_MTIMES.clear()
     for pak_id, sys in filesystems.items():
         PACK_SYSTEMS[pak_id] = FileSystemChain(
             (sys, 'resources/BEE2/'),
             (sys, 'resources/materials/'),
             (sys, 'resources/materials/models/props_map_editor/'),
         )
+        if isinstance(sys, RawFileSystem):
+            # Unzipped packages are being edited, so don't cache.
+            _PACK_MTIMES[pak_id] = 0
+        else:
+            try:
+                _PACK_MTIMES[pak_id] = int(Path(sys.path).stat().st_mtime)
+            except OSError:
+                _PACK_MTIMES[pak_id] = 0
+    await trio.to_thread.run_sync(img_cache.load)
 
     async with trio.open_nursery() as _load_nursery:
         LOGGER.debug('Early loads: {}', _early_loads)
@@ -0,0 +1,154 @@
+"""Caches decoded and resized images from packages, so unchanged icons load quickly.
+
+Images are stored as raw RGBA pixels in a single file, preceded by an index.
+The file is memory-mapped, so loading an image only needs to copy out the
+pixels. Entries are keyed by the modification time of the package, so any
+modified package is discarded. Unzipped packages are never cached, since
+they're being edited.
+"""
+from __future__ import annotations
+from typing import Tuple
+import mmap
+import pickle
+import struct
+import threading
+
+from atomicwrites import atomic_write
+import srctools.logger
+
+import utils
+
+
+LOGGER = srctools.logger.get_logger(__name__)
+CACHE_VERSION = 1
+FILENAME = 'cache/images.bin'
+MAGIC = b'BEE2IMG\0'
+# Magic, then the length of the pickled index.
+HEADER = struct.Struct('<8sI')
+
+# Package ID, path, package mtime, width, height, resize algorithm.
+Key = Tuple[str, str, int, int, int, int]
+
+_LOCK = threading.Lock()
+# Key -> (offset, width, height) in the mapped file.
+_INDEX: dict[Key, tuple[int, int, int]] = {}
+# Images added this session, key -> (width, height, pixels).
+_NEW: dict[Key, tuple[int, int, bytes]] = {}
+_MAP: mmap.mmap | None = None
+_DATA_START = 0
+
+
+def load() -> None:
+    """Open the cache file."""
+    with _LOCK:
+        _NEW.clear()
+        _open()
+
+
+def _open() -> None:
+    """Map the cache file into memory. The lock must be held."""
+    global _MAP, _DATA_START
+    _close()
+    try:
+        with open(utils.conf_location(FILENAME), 'rb') as f:
+            # The map stays valid after the file is closed.
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError):  # ValueError for an empty file.
+        LOGGER.warning('Could not read image cache:', exc_info=True)
+        return
+    try:
+        magic, index_size = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC:
+            raise ValueError('Not an image cache!')
+        version, index = pickle.loads(mapped[HEADER.size:HEADER.size + index_size])
+    except Exception:
+        LOGGER.warning('Could not read image cache:', exc_info=True)
+        mapped.close()
+        return
+    if version != CACHE_VERSION:
+        LOGGER.info('Image cache is from a different version, discarding.')
+        mapped.close()
+        return
+    _MAP = mapped
+    _DATA_START = HEADER.size + index_size
+    _INDEX.update(index)
+
+
+def _close() -> None:
+    """Close the mapped file. The lock must be held."""
+    global _MAP
+    _INDEX.clear()
+    if _MAP is not None:
+        _MAP.close()
+        _MAP = None
+
+
+def get(key: Key) -> tuple[int, int, bytes] | None:
+    """Return the width, height and RGBA pixels for an image, if cached."""
+    with _LOCK:
+        try:
+            return _NEW[key]
+        except KeyError:
+            pass
+        try:
+            offset, width, height = _INDEX[key]
+        except KeyError:
+            return None
+        assert _MAP is not None
+        start = _DATA_START + offset
+        return width, height, _MAP[start:start + 4 * width * height]
+
+
+def add(key: Key, width: int, height: int, pixels: bytes) -> None:
+    """Store the RGBA pixels for an image."""
+    if len(pixels) != 4 * width * height:
+        raise ValueError(f'Expected {4 * width * height} bytes for {width}x{height}, got {len(pixels)}!')
+    with _LOCK:
+        _NEW[key] = (width, height, pixels)
+
+
+def save(pack_mtimes: dict[str, int]) -> None:
+    """Write the cache back to disk.
+
+    Only images from the packages with these modification times are kept.
+    """
+    with _LOCK:
+        if not _NEW and all(
+            pack_mtimes.get(key[0]) == key[2]
+            for key in _INDEX
+        ):
+            return
+        entries: dict[Key, tuple[int, int, bytes]] = {}
+        for key, (offset, width, height) in _INDEX.items():
+            if key[2] and pack_mtimes.get(key[0]) == key[2]:
+                assert _MAP is not None
+                start = _DATA_START + offset
+                entries[key] = (width, height, _MAP[start:start + 4 * width * height])
+        for key, entry in _NEW.items():
+            if key[2] and pack_mtimes.get(key[0]) == key[2]:
+                entries[key] = entry
+        # The file needs to be closed before it can be replaced.
+        _close()
+        _NEW.clear()
+
+        index: dict[Key, tuple[int, int, int]] = {}
+        offset = 0
+        for key, (width, height, pixels) in entries.items():
+            index[key] = (offset, width, height)
+            offset += len(pixels)
+        index_data = pickle.dumps((CACHE_VERSION, index), pickle.HIGHEST_PROTOCOL)
+        LOGGER.info('Writing image cache with {} images...', len(entries))
+        try:
+            with atomic_write(utils.conf_location(FILENAME), mode='wb', overwrite=True) as f:
+                f.write(HEADER.pack(MAGIC, len(index_data)))
+                f.write(index_data)
+                for width, height, pixels in entries.values():
+                    f.write(pixels)
+        except OSError:
+            LOGGER.warning('Could not write image cache:', exc_info=True)
+            # Keep what we have in memory at least.
+            _NEW.update(entries)
+        else:
+            _open()
@@ -384,6 +384,15 @@ async def init_dev_tab(f: ttk.Frame) -> None:
         ),
     ).grid(row=3, column=2, columnspan=2, sticky='W')
 
+    make_checkbox(
+        f, 'parse_in_processes',
+        desc=gettext("Parse Packages in Parallel"),
+        tooltip=gettext(
+            'Use multiple processes to parse item definitions when loading packages. '
+            'Requires restart to have an effect.'
+        ),
+    ).grid(row=4, column=0, columnspan=2, sticky='W')
+
     ttk.Separator(orient='horizontal').grid(row=9, column=0, columnspan=3, sticky='EW')
 
     ttk.Button(
@@ -0,0 +1,9 @@
+"""Benchmarks for the VBSP precompiler.
+
+Synthetic PeTI maps are generated, then compiled with each stage of the
+compile timed separately. Run with "python -m bench" from the src folder.
+
+This lives in src/ next to the tests rather than at the top level, since the
+compiler is made of top-level modules in src (vbsp, precomp, etc), which are
+only importable when run from there.
+"""
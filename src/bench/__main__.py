@@ -0,0 +1,170 @@
+"""Run the compiler benchmarks.
+
+Each map is generated into a temporary folder, then compiled in a separate
+process so no state is shared between them. The time taken by each stage is
+compared against the stored baselines.
+
+Timings depend heavily on the machine, so no baselines are included. Until
+they're recorded locally with --save, the times are only reported and
+regressions are not checked.
+
+Usage: python -m bench [--save] [--repeat N] [--tolerance T] [map ...]
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, TypeVar
+import argparse
+import functools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench import mapgen
+
+
+BASELINE_FILE = Path(__file__).with_name('baselines.json')
+# The file the worker writes its timings into, relative to the workspace.
+TIMES_FILE = 'bee2/bench_times.json'
+# Regressions smaller than this are ignored, they're just noise.
+MIN_DIFFERENCE = 0.005
+T = TypeVar('T')
+
+
+def run_worker(map_path: str) -> None:
+    """Compile the map in this process, timing each stage."""
+    # VBSP opens its log relative to the working directory on import.
+    os.chdir(Path(map_path).parent.parent)
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+    import vbsp
+    from precomp import antlines, brushLoc, conditions, connections, corridor, tiling
+
+    times: dict[str, float] = {}
+
+    def timed(name: str, func: Callable[..., T]) -> Callable[..., T]:
+        """Wrap a function to record the time it takes."""
+        @functools.wraps(func)
+        def wrapper(*args: object, **kwargs: object) -> T:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                times[name] = times.get(name, 0.0) + time.perf_counter() - start
+        return wrapper
+
+    vbsp.load_settings = timed('load_settings', vbsp.load_settings)
+    vbsp.save = timed('save', vbsp.save)
+    brushLoc.POS.read_from_map = timed('read_from_map', brushLoc.POS.read_from_map)
+    corridor.analyse_and_modify = timed('analyse_and_modify', corridor.analyse_and_modify)
+    antlines.parse_antlines = timed('parse_antlines', antlines.parse_antlines)
+    connections.calc_connections = timed('calc_connections', connections.calc_connections)
+    tiling.analyse_map = timed('analyse_map', tiling.analyse_map)
+    conditions.check_all = timed('check_all', conditions.check_all)
+    tiling.generate_brushes = timed('generate_brushes', tiling.generate_brushes)
+
+    sys.argv = [
+        'vbsp', '-skip_vbsp',
+        '-entity_limit', '1750',
+        '-game', str(Path('portal2').absolute()),
+        map_path,
+    ]
+    start = time.perf_counter()
+    vbsp.main()
+    times['total'] = time.perf_counter() - start
+
+    with open(TIMES_FILE, 'w') as f:
+        json.dump(times, f)
+
+
+def run_map(spec: mapgen.MapSpec, folder: Path) -> dict[str, float]:
+    """Generate and compile a map, returning the stage timings."""
+    map_path = mapgen.write_workspace(spec, folder)
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [
+        str(Path(__file__).parent.parent),
+        env.get('PYTHONPATH', ''),
+    ]))
+    proc = subprocess.run(
+        [sys.executable, '-m', 'bench', '--worker', str(map_path)],
+        cwd=folder, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        encoding='utf8', errors='replace',
+    )
+    if proc.returncode != 0:
+        # Only show the log if it failed, the compiler warns about missing resources.
+        sys.stderr.write(proc.stderr)
+        raise RuntimeError(f'Compiling "{spec.name}" failed with code {proc.returncode}!')
+    with (folder / TIMES_FILE).open() as f:
+        return json.load(f)
+
+
+def main(argv: list[str]) -> int:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('maps', nargs='*', help='The maps to run, by default all of them.')
+    parser.add_argument('--save', action='store_true', help='Store the results as the new baselines.')
+    parser.add_argument('--repeat', type=int, default=3, help='Compile each map this many times, keeping the fastest.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='The slowdown allowed before reporting a regression.')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.worker)
+        return 0
+
+    names = args.maps or list(mapgen.SPECS)
+    for name in names:
+        if name not in mapgen.SPECS:
+            parser.error(f'Unknown map "{name}", valid: {", ".join(mapgen.SPECS)}')
+
+    try:
+        with BASELINE_FILE.open() as f:
+            baselines: dict[str, dict[str, float]] = json.load(f)
+    except FileNotFoundError:
+        baselines = {}
+        if not args.save:
+            print(f'No baselines in {BASELINE_FILE}, run with --save to record them.')
+
+    results: dict[str, dict[str, float]] = {}
+    regressions: list[str] = []
+    for name in names:
+        spec = mapgen.SPECS[name]
+        best: dict[str, float] = {}
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory(prefix=f'bee2_bench_{name}_') as folder:
+                for stage, duration in run_map(spec, Path(folder)).items():
+                    best[stage] = min(duration, best.get(stage, duration))
+        results[name] = best
+
+        baseline = baselines.get(name, {})
+        print(f'{name}:')
+        for stage, duration in best.items():
+            try:
+                base = baseline[stage]
+            except KeyError:
+                print(f'  {stage:<20} {duration:>9.4f}s')
+                continue
+            ratio = duration / base if base else 1.0
+            flag = ''
+            if duration > base * (1 + args.tolerance) and duration - base > MIN_DIFFERENCE:
+                flag = '  REGRESSION'
+                regressions.append(f'{name}.{stage}')
+            print(f'  {stage:<20} {duration:>9.4f}s  (baseline {base:.4f}s, {ratio:.2f}x){flag}')
+
+    if args.save:
+        baselines.update(results)
+        with BASELINE_FILE.open('w') as f:
+            json.dump(baselines, f, indent=1, sort_keys=True)
+        print(f'Saved baselines to {BASELINE_FILE}')
+
+    if regressions:
+        print('Regressions:', ', '.join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,524 @@
+"""Generates synthetic PeTI maps, along with the configs the compiler needs.
+
+Each map is written into a workspace folder laid out like the game's bin/
+folder, with a "bee2/" subfolder containing the compiler configuration, a
+"maps/" folder with the VMF, and a minimal game folder for the filesystem.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable
+import pickle
+import random
+
+import attrs
+from srctools import VMF, Vec, Angle, Solid
+from srctools.dmx import Attribute as DMXAttr, Element as DMXElement, ValueType as DMXValue
+from srctools.vmf import Output
+
+import consts
+import editoritems
+import editoritems_db
+from corridor import Corridor, GameMode, Direction, Orient
+
+
+# Instances used for each item. None of these files need to exist.
+CORR_ENTRY = 'instances/bee2_corridor/sp/entry/corr_1.vmf'
+CORR_EXIT = 'instances/bee2_corridor/sp/exit/corr_1.vmf'
+# Coop corridors aren't used, but the items need to exist.
+CORR_COOP = 'instances/bee2_corridor/coop/corr.vmf'
+INST_CUBE = 'instances/p2editor/cube.vmf'
+INST_DROPPER = 'instances/p2editor/dropper.vmf'
+INST_BUTTON = 'instances/p2editor/button.vmf'
+INST_DOOR = 'instances/p2editor/door.vmf'
+INST_EMITTER = 'instances/p2editor/fizzler_emitter.vmf'
+INST_LIGHT = 'instances/p2editor/point_light.vmf'
+INST_IND_TOGGLE = 'instances/p2editor/indicator_toggle.vmf'
+INST_IND_PANEL = 'instances/p2editor/indicator_panel.vmf'
+INST_IND_TIMER = 'instances/p2editor/indicator_panel_timer.vmf'
+
+# Templates the compiler always requires, using the default option values.
+TEMP_TILING = '__TILING_TEMPLATE__'
+TEMP_GLASS = 'BEE2_GLASS_TEMPLATE'
+TEMP_GRATING = 'BEE2_GRATING_TEMPLATE'
+
+# Editoritems definitions for the items placed in the maps.
+ITEM_DEFS = '''
+Item
+{{
+    "Type" "{id}"
+    "Editor"
+    {{
+        "SubType"
+        {{
+            "Name" "{id}"
+        }}
+    }}
+    "Exporting"
+    {{
+        "Instances"
+        {{
+{instances}
+        }}
+        "TargetName" "{targetname}"
+{extra}
+    }}
+}}
+'''
+# Outputs which connect items to each other.
+CONN_OUTPUT = '''
+        "Outputs"
+        {
+            "CONNECTION_STANDARD"
+            {
+                "Activate" "instance:button;OnPressed"
+                "Deactivate" "instance:button;OnUnPressed"
+            }
+        }
+'''
+CONN_INPUT = '''
+        "Inputs"
+        {
+            "CONNECTION_STANDARD"
+            {
+                "Activate" "instance:door;Open"
+                "Deactivate" "instance:door;Close"
+            }
+        }
+'''
+GAMEINFO = '''\
+"GameInfo"
+    {
+    "game" "Benchmark"
+    "FileSystem"
+        {
+        "SteamAppId" "620"
+        "SearchPaths"
+            {
+            "Game" "|gameinfo_path|."
+            }
+        }
+    }
+'''
+CONN_INDICATOR = '''
+        "Inputs"
+        {
+            "BEE2"
+            {
+                "Type" "default"
+                "Enable_cmd" "indicator,Check,,0,-1"
+                "Disable_cmd" "indicator,Uncheck,,0,-1"
+            }
+        }
+'''
+
+
+@attrs.frozen
+class MapSpec:
+    """Describes a map to generate."""
+    name: str
+    # The number of empty voxels along each axis, the room is a cube.
+    size: int
+    # The fraction of floor positions which have a pillar rising from them.
+    pillars: float = 0.05
+    # The number of cubes and their droppers.
+    cubes: int = 0
+    # The number of button -> door connections, and the length of each antline.
+    antlines: int = 0
+    antline_length: int = 4
+    # The number of fizzlers placed across the room.
+    fizzlers: int = 0
+    seed: int = 0
+
+
+SPECS: dict[str, MapSpec] = {spec.name: spec for spec in [
+    MapSpec('small', 4, antlines=2, cubes=1, fizzlers=1),
+    MapSpec('medium', 12, antlines=8, cubes=4, fizzlers=4),
+    MapSpec('max', 24, antlines=12, cubes=8, fizzlers=8),
+    MapSpec('cubes', 12, cubes=60),
+    MapSpec('antlines', 16, antlines=40, antline_length=12),
+    MapSpec('fizzlers', 16, fizzlers=40),
+]}
+
+
+def _instances(*files: str) -> str:
+    """Produce the instances block for an item."""
+    return '\n'.join([
+        f'            "{i}" "{file}"'
+        for i, file in enumerate(files)
+    ])
+
+
+def make_items() -> list[editoritems.Item]:
+    """Build the editoritems definitions used by the map."""
+    text = ''.join([
+        ITEM_DEFS.format(
+            id='ITEM_ENTRY_DOOR', targetname='door',
+            instances=_instances(*[CORR_ENTRY] * 12), extra='',
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_EXIT_DOOR', targetname='door',
+            instances=_instances(*[CORR_EXIT] * 4), extra='',
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_COOP_ENTRY_DOOR', targetname='door',
+            instances=_instances(*[CORR_COOP] * 5), extra='',
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_COOP_EXIT_DOOR', targetname='door',
+            instances=_instances(*[CORR_COOP] * 6), extra='',
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_CUBE', targetname='cube',
+            instances=_instances(INST_DROPPER, INST_CUBE), extra='',
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_BUTTON_FLOOR', targetname='button',
+            instances=_instances(INST_BUTTON), extra=CONN_OUTPUT,
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_DOOR_BENCH', targetname='door',
+            instances=_instances(INST_DOOR), extra=CONN_INPUT,
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_POINT_LIGHT', targetname='light',
+            instances=_instances(INST_LIGHT), extra='',
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_INDICATOR_TOGGLE', targetname='indicator',
+            instances=_instances(INST_IND_TOGGLE), extra='',
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_INDICATOR_PANEL', targetname='indicator',
+            instances=_instances(INST_IND_PANEL), extra=CONN_INDICATOR,
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_INDICATOR_PANEL_TIMER', targetname='indicator',
+            instances=_instances(INST_IND_TIMER), extra=CONN_INDICATOR,
+        ),
+        ITEM_DEFS.format(
+            id='ITEM_BARRIER_HAZARD', targetname='barrierhazard',
+            instances=_instances(INST_EMITTER), extra=CONN_INPUT,
+        ),
+    ])
+    items, _ = editoritems.Item.parse(text)
+    return items
+
+
+def make_config() -> str:
+    """Build the vbsp_config file for the maps."""
+    # The conditions exercise the instance index and flag checks, without
+    # requiring any other files.
+    return '''
+"Options"
+    {
+    }
+"Conditions"
+    {
+    "Condition"
+        {
+        "instance" "<ITEM_CUBE>"
+        "Result" { "OffsetInst" "0 0 0" }
+        }
+    "Condition"
+        {
+        "instance" "<ITEM_BUTTON_FLOOR>"
+        "InstVar" "$connectioncount > 0"
+        "Result" { "setInstVar" "$bench_linked 1" }
+        }
+    "Condition"
+        {
+        "Or"
+            {
+            "instance" "<ITEM_DOOR_BENCH>"
+            "instance" "<ITEM_BARRIER_HAZARD>"
+            }
+        "Result" { "setInstVar" "$bench_input 1" }
+        }
+    }
+'''
+
+
+def _block(vmf: VMF, pos: Vec, white: bool) -> Solid:
+    """Make a 128x128x128 block, at the given grid position."""
+    mat = consts.WhitePan.WHITE_1x1 if white else consts.BlackPan.BLACK_1x1
+    brush = vmf.make_prism(pos * 128, pos * 128 + 128, str(mat)).solid
+    vmf.add_brush(brush)
+    return brush
+
+
+def make_map(spec: MapSpec) -> VMF:
+    """Generate the VMF for a map."""
+    rand = random.Random(f'{spec.name}_{spec.seed}')
+    vmf = VMF()
+    size = spec.size
+    # Interior air voxels are 1-size, so walls are at 0 and size + 1.
+    interior = range(1, size + 1)
+
+    solid: set[tuple[int, int, int]] = set()
+    # Pillars rise from the floor, leaving the top layer of air.
+    for x in interior:
+        for y in interior:
+            if rand.random() < spec.pillars:
+                for z in range(1, rand.randint(1, max(1, size - 1)) + 1):
+                    solid.add((x, y, z))
+
+    def is_air(x: int, y: int, z: int) -> bool:
+        """Check if this position is inside the room."""
+        return (
+            1 <= x <= size and 1 <= y <= size and 1 <= z <= size
+            and (x, y, z) not in solid
+        )
+
+    for x in range(size + 2):
+        for y in range(size + 2):
+            for z in range(size + 2):
+                if is_air(x, y, z):
+                    continue
+                if any(
+                    is_air(x + dx, y + dy, z + dz) for dx, dy, dz in
+                    [(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)]
+                ):
+                    _block(vmf, Vec(x, y, z), rand.random() < 0.5)
+
+    def is_floor(pos: Vec) -> bool:
+        """Check if this world position is on the floor of the room."""
+        return is_air(int(pos.x // 128), int(pos.y // 128), 1)
+
+    def floor_pos() -> Vec:
+        """Pick a random floor position which isn't used."""
+        while True:
+            x, y = rand.choice(interior), rand.choice(interior)
+            if (x, y) not in used and (x, y, 1) not in solid:
+                used.add((x, y))
+                return Vec(x * 128 + 64, y * 128 + 64, 128)
+
+    # Corridors, on opposite walls. These point the instance's up into the wall.
+    used: set[tuple[int, int]] = set()
+    for file, x, yaw, no_start in [
+        (CORR_ENTRY, 1, 0, '0'),
+        (CORR_EXIT, size, 180, ''),
+    ]:
+        mid = (size + 1) // 2
+        used.add((x, mid))
+        inst = vmf.create_ent(
+            'func_instance',
+            targetname='entry' if file == CORR_ENTRY else 'exit',
+            file=file,
+            origin=Vec(x * 128, mid * 128 + 64, 128) if x == 1 else Vec(x * 128 + 128, mid * 128 + 64, 128),
+            angles=Angle(0, yaw, 0),
+        )
+        if no_start:
+            inst.fixup['no_player_start'] = no_start
+        inst.fixup['$connectioncount'] = '0'
+
+    # PeTI places ambient lights every 4 blocks, the map seed is derived from these.
+    for x in range(2, size + 1, 4):
+        for y in range(2, size + 1, 4):
+            for z in range(2, size + 1, 4):
+                if is_air(x, y, z):
+                    vmf.create_ent(
+                        'func_instance',
+                        file=INST_LIGHT,
+                        origin=Vec(x, y, z) * 128 + 64,
+                        angles=Angle(),
+                    )
+
+    for i in range(spec.cubes):
+        drop_pos = floor_pos()
+        vmf.create_ent(
+            'func_instance',
+            targetname=f'cube_dropper_{i}',
+            file=INST_DROPPER,
+            origin=Vec(drop_pos.x, drop_pos.y, (size + 1) * 128),
+            angles=Angle(0, 0, 180),
+        ).fixup.update({'$cube_type': '0', '$connectioncount': '0'})
+        vmf.create_ent(
+            'func_instance',
+            targetname=f'cube_{i}',
+            file=INST_CUBE,
+            origin=floor_pos(),
+            angles=Angle(0, 0, 0),
+        ).fixup.update({'$cube_type': '0', '$connectioncount': '0'})
+
+    for i in range(spec.antlines):
+        button_pos = floor_pos()
+        door_pos = floor_pos()
+        button_name = f'button_{i}'
+        door_name = f'door_{i}'
+        button = vmf.create_ent(
+            'func_instance',
+            targetname=button_name,
+            file=INST_BUTTON,
+            origin=button_pos,
+            angles=Angle(0, 0, 0),
+        )
+        button.fixup['$connectioncount'] = '0'
+        button.add_out(Output(
+            'ON_ACTIVATED', door_name, 'ACTIVATE',
+        ))
+        door = vmf.create_ent(
+            'func_instance',
+            targetname=door_name,
+            file=INST_DOOR,
+            origin=door_pos,
+            angles=Angle(0, 0, 0),
+        )
+        door.fixup['$connectioncount'] = '1'
+        door.fixup['$indicator_name'] = ''
+        button.fixup['$indicator_name'] = ant_name = f'{button_name}_indicator'
+        _make_antline(vmf, rand, ant_name, button_pos, spec.antline_length, is_floor)
+
+    for i in range(spec.fizzlers):
+        # Emitters sit on opposite walls, facing each other.
+        y = rand.choice(interior)
+        z = rand.choice(interior)
+        for name, x, yaw in [('emitter', 1, 0), ('emitter2', size, 180)]:
+            vmf.create_ent(
+                'func_instance',
+                targetname=f'barrierhazard_{i}',
+                file=INST_EMITTER,
+                origin=Vec(x * 128 + (0 if x == 1 else 128), y * 128 + 64, z * 128 + 64),
+                angles=Angle(0, yaw, 90),
+            ).fixup.update({'$connectioncount': '0', '$skin': '2'})
+
+    return vmf
+
+
+def _antline_overlay(vmf: VMF, name: str, mat: str, origin: Vec, direction: Vec, length: float) -> None:
+    """Add a floor antline overlay, laid out the way PeTI does."""
+    # The overlay runs along its local Y axis.
+    yaw = {(1, 0): 270, (-1, 0): 90, (0, 1): 0, (0, -1): 180}[round(direction.x), round(direction.y)]
+    half = length / 2
+    vmf.create_ent(
+        'info_overlay',
+        targetname=name,
+        material=mat,
+        angles=Angle(0, yaw, 0),
+        origin=origin,
+        basisorigin=origin,
+        basisnormal=Vec(0, 0, 1),
+        basisu=Vec(1, 0, 0),
+        basisv=Vec(0, 1, 0),
+        startu='0', startv='0', endu='1', endv=format(length / 16, 'g'),
+        uv0=f'-8 {-half:g} 0',
+        uv1=f'-8 {half:g} 0',
+        uv2=f'8 {half:g} 0',
+        uv3=f'8 {-half:g} 0',
+        sides='',
+    )
+
+
+def _make_antline(
+    vmf: VMF, rand: random.Random,
+    name: str, start: Vec, length: int,
+    is_floor: Callable[[Vec], bool],
+) -> None:
+    """Lay an L-shaped antline along the floor, starting from the edge of a voxel.
+
+    This is a straight section, a corner then another straight section.
+    """
+    directions = [Vec(1, 0, 0), Vec(-1, 0, 0), Vec(0, 1, 0), Vec(0, -1, 0)]
+    for _ in range(20):
+        dir_a = rand.choice(directions)
+        dir_b = rand.choice([d for d in directions if d.dot(dir_a) == 0])
+        len_a = rand.randint(2, max(2, length))
+        len_b = rand.randint(2, max(2, length))
+        # Start on the edge of the voxel, in the middle.
+        pos = Vec(start.x, start.y, 128) + 64 * dir_a
+        corner = pos + (16 * len_a + 8) * dir_a
+        end = corner + (8 + 16 * len_b) * dir_b
+        if all(map(is_floor, [pos + 8 * dir_a, corner, end - 8 * dir_b])):
+            break
+    else:
+        return
+    mat_straight = str(consts.Antlines.STRAIGHT)
+    _antline_overlay(vmf, name, mat_straight, pos + 8 * len_a * dir_a, dir_a, 16 * len_a)
+    _antline_overlay(vmf, name, str(consts.Antlines.CORNER), corner, dir_a, 16)
+    _antline_overlay(vmf, name, mat_straight, corner + (8 + 8 * len_b) * dir_b, dir_b, 16 * len_b)
+
+
+def _template_vmf(temp_id: str) -> VMF:
+    """Create a template map, with its config entity."""
+    vmf = VMF()
+    vmf.create_ent(
+        'bee2_template_conf',
+        template_id=temp_id,
+        temp_type='default',
+        discard_brushes='0',
+    )
+    return vmf
+
+
+def make_templates() -> dict[str, VMF]:
+    """Build the templates the compiler needs."""
+    tiling = _template_vmf(TEMP_TILING)
+    for thickness, size in [(2, 'thin'), (4, 'norm'), (8, 'thick')]:
+        for prefix in ['bevel', 'flat']:
+            # The tile points in the +X direction.
+            prism = tiling.make_prism(
+                Vec(-thickness / 2, -16, -16),
+                Vec(thickness / 2, 16, 16),
+                str(consts.Special.SQUAREBEAMS),
+            )
+            prism.east.mat = str(consts.WhitePan.WHITE_1x1)
+            prism.west.mat = str(consts.Special.BACKPANELS)
+            prism.solid.visgroup_ids.add(tiling.create_visgroup(f'{prefix}_{size}').id)
+            tiling.add_brush(prism.solid)
+
+    templates = {TEMP_TILING: tiling}
+    # Scaling templates only need a brush with each face textured.
+    for temp_id, mat in [(TEMP_GLASS, consts.Special.GLASS), (TEMP_GRATING, consts.Special.GRATING)]:
+        templates[temp_id] = vmf = _template_vmf(temp_id)
+        vmf.add_brush(vmf.make_prism(Vec(-64, -64, -64), Vec(64, 64, 64), str(mat)).solid)
+    return templates
+
+
+def write_workspace(spec: MapSpec, folder: Path) -> Path:
+    """Generate a map and all the files needed to compile it.
+
+    This returns the path to the VMF.
+    """
+    bee2 = folder / 'bee2'
+    bee2.mkdir(parents=True, exist_ok=True)
+    (folder / 'maps').mkdir(exist_ok=True)
+    game = folder / 'portal2'
+    game.mkdir(exist_ok=True)
+    (game / 'gameinfo.txt').write_text(GAMEINFO)
+
+    (bee2 / 'vbsp_config.cfg').write_text(make_config())
+    (bee2 / 'pack_list.cfg').write_text('')
+    # Templates are found in packages, here just a folder.
+    package = bee2 / 'package'
+    (package / 'templates').mkdir(parents=True, exist_ok=True)
+    templates = DMXElement('Templates', 'DMERoot')
+    templates['temp'] = template_list = DMXAttr.array('list', DMXValue.ELEMENT)
+    for temp_id, temp_vmf in make_templates().items():
+        path = f'templates/{temp_id.casefold()}.vmf'
+        with (package / path).open('w') as f:
+            temp_vmf.export(f)
+        elem = DMXElement(temp_id, 'DMETemplate')
+        elem['package'] = package.absolute().as_posix()
+        elem['path'] = path
+        elem['mtime'] = 0
+        template_list.append(elem)
+    with (bee2 / 'templates.lst').open('wb') as f:
+        templates.export_binary(f, fmt_name='bee_templates', fmt_ver=2, unicode='format')
+    with (bee2 / 'editor.bin').open('wb') as f:
+        editoritems_db.write(f, make_items())
+
+    corridors = {
+        (GameMode.SP, direction, orient): [Corridor(
+            CORR_ENTRY if direction is Direction.ENTRY else CORR_EXIT,
+            {}, 1, False,
+        )]
+        for direction in Direction
+        for orient in [Orient.HORIZONTAL, Orient.UP, Orient.DN]
+    }
+    with (bee2 / 'corridors.bin').open('wb') as f:
+        pickle.dump(corridors, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    map_path = folder / 'maps' / f'{spec.name}.vmf'
+    vmf = make_map(spec)
+    with map_path.open('w') as f:
+        vmf.export(f)
+    return map_path
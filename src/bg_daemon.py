@@ -137,9 +137,9 @@ class BaseLoadScreen:
             self.values[stage] = 0
         self.reset_stages()
 
-    def op_step(self, stage: str) -> None:
+    def op_step(self, stage: str, count: int = 1) -> None:
         """Increment the specified value."""
-        self.values[stage] += 1
+        self.values[stage] += count
         self.update_stage(stage)
 
     def op_set_length(self, stage: str, num: int) -> None:
@@ -0,0 +1,122 @@
+"""A binary form of vbsp_config, allowing the compiler to only load the sections it needs.
+
+The file consists of a header, then each top-level block individually pickled.
+The header records the size and modification time of the text config it
+was produced from, so if that is edited the binary version is ignored.
+"""
+from __future__ import annotations
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+import os
+import pickle
+import struct
+
+from srctools import Property
+import srctools.logger
+
+import utils  # noqa - registers Property in the pickle extension registry.
+
+
+LOGGER = srctools.logger.get_logger(__name__)
+MAGIC = b'BEE2CONF'
+VERSION = 1
+# Magic, version, header size.
+HEADER = struct.Struct('<8sII')
+# Section name -> list of (offset, size) pairs, in the original order.
+Index = Dict[Optional[str], List[Tuple[int, int]]]
+
+
+def write(file: IO[bytes], conf: Property, source: str | os.PathLike[str]) -> None:
+    """Write a binary copy of the config, which was exported to the source text file."""
+    stat = os.stat(source)
+    index: Index = {}
+    blocks: list[bytes] = []
+    offset = 0
+    for prop in conf:
+        data = pickle.dumps(prop, protocol=pickle.HIGHEST_PROTOCOL)
+        index.setdefault(prop.name, []).append((offset, len(data)))
+        blocks.append(data)
+        offset += len(data)
+    header = pickle.dumps(
+        (stat.st_size, stat.st_mtime_ns, index),
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    file.write(HEADER.pack(MAGIC, VERSION, len(header)))
+    file.write(header)
+    for data in blocks:
+        file.write(data)
+
+
+class ConfSections:
+    """Provides access to the top-level blocks of the config, loading each only when requested.
+
+    This implements the search methods of Property that are used on the root.
+    """
+    def __init__(self, data: memoryview, index: Index) -> None:
+        self._data = data
+        self._index = index
+        self._loaded: dict[Optional[str], list[Property]] = {}
+
+    @classmethod
+    def from_property(cls, root: Property) -> ConfSections:
+        """Wrap an already parsed config."""
+        sections = cls(memoryview(b''), {})
+        for prop in root:
+            sections._loaded.setdefault(prop.name, []).append(prop)
+        return sections
+
+    def section(self, name: str) -> list[Property]:
+        """Return all top-level properties with this name."""
+        name = name.casefold()
+        try:
+            return self._loaded[name]
+        except KeyError:
+            pass
+        self._loaded[name] = blocks = [
+            pickle.loads(self._data[offset:offset + size])
+            for offset, size in self._index.get(name, ())
+        ]
+        return blocks
+
+    def as_root(self, *names: str) -> Property:
+        """Produce a root property containing the specified sections."""
+        return Property.root(*[
+            prop
+            for name in names
+            for prop in self.section(name)
+        ])
+
+    def find_all(self, *keys: str) -> Iterator[Property]:
+        """Search through the tree, yielding all properties that match a particular path."""
+        return self.as_root(keys[0]).find_all(*keys)
+
+    def find_children(self, *keys: str) -> Iterator[Property]:
+        """Search through the tree, yielding children of properties in a path."""
+        return self.as_root(keys[0]).find_children(*keys)
+
+    def find_block(self, key: str, or_blank: bool = False) -> Property:
+        """Obtain the last top-level block with a given name."""
+        return self.as_root(key).find_block(key, or_blank)
+
+
+def load(path: str | os.PathLike[str], source: str | os.PathLike[str]) -> Optional[ConfSections]:
+    """Load the binary config, returning None if it is missing or out of date with the text one."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        stat = os.stat(source)
+    except FileNotFoundError:
+        return None
+    try:
+        magic, version, header_size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            LOGGER.warning('Unknown binary config version, ignoring.')
+            return None
+        start = HEADER.size + header_size
+        src_size, src_mtime, index = pickle.loads(data[HEADER.size:start])
+    except Exception:
+        LOGGER.warning('Could not read binary config:', exc_info=True)
+        return None
+    if src_size != stat.st_size or src_mtime != stat.st_mtime_ns:
+        LOGGER.info('Binary config is out of date, ignoring.')
+        return None
+    return ConfSections(memoryview(data)[start:], index)
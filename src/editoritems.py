@@ -724,11 +724,8 @@ class SubType:
     def __setstate__(self, state: tuple) -> None:
         self.name, mdls, snds, anims, self.pal_name, x, y, self.pal_icon = state
         self.models = list(map(FSPath, mdls))
-        self.sounds = {
-            snd: sndscript
-            for snd, sndscript in zip(Sound, snds)
-            if sndscript
-        }
+        # Parsing always produces every sound, keep blank ones so this round-trips.
+        self.sounds = dict(zip(Sound, snds))
         self.anims = {
             anim: ind
             for anim, ind in zip(Anim, anims)
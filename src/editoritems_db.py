@@ -0,0 +1,140 @@
+"""A binary database of editoritems, allowing the compiler to only load the items it uses.
+
+The file consists of a header, then each item individually pickled. The header
+contains a summary of every item with the few values needed for all of them,
+along with the position of each item in the file.
+"""
+from __future__ import annotations
+from typing import IO, Dict, Iterable, Iterator, Mapping, NoReturn, Tuple
+import os
+import pickle
+import pickletools
+import struct
+import sys
+
+import attrs
+import srctools.logger
+
+from connections import Config as ConnConfig
+from editoritems import Item, FSPath
+import utils  # Also registers classes in the pickle extension registry.
+
+
+LOGGER = srctools.logger.get_logger(__name__)
+MAGIC = b'BEE2ITEM'
+VERSION = 1
+# Magic, version, header size.
+HEADER = struct.Struct('<8sII')
+# Folded item ID -> (offset, size).
+Index = Dict[str, Tuple[int, int]]
+EMPTY_INST = FSPath()
+
+
+@attrs.define(eq=False)
+class ItemSummary:
+    """The values from an item which are always needed by the compiler."""
+    id: str
+    # The folded instance filename for each index, or '' if blank.
+    instances: list[str]
+    # Custom instance name -> folded filename.
+    cust_instances: dict[str, str]
+    conn_config: ConnConfig | None
+    force_input: bool
+    force_output: bool
+
+    @classmethod
+    def from_item(cls, item: Item) -> ItemSummary:
+        """Summarise an item."""
+        return cls(
+            item.id,
+            [
+                '' if inst.inst == EMPTY_INST else str(inst.inst).casefold()
+                for inst in item.instances
+            ],
+            {
+                name: str(file).casefold()
+                for name, file in item.cust_instances.items()
+            },
+            item.conn_config,
+            item.force_input,
+            item.force_output,
+        )
+
+
+def write(file: IO[bytes], items: Iterable[Item]) -> None:
+    """Write the database of items."""
+    index: Index = {}
+    summaries: list[ItemSummary] = []
+    blocks: list[bytes] = []
+    offset = 0
+    for item in items:
+        data = pickletools.optimize(pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL))
+        index[item.id.casefold()] = (offset, len(data))
+        summaries.append(ItemSummary.from_item(item))
+        blocks.append(data)
+        offset += len(data)
+    header = pickle.dumps((summaries, index), protocol=pickle.HIGHEST_PROTOCOL)
+    file.write(HEADER.pack(MAGIC, VERSION, len(header)))
+    file.write(header)
+    for data in blocks:
+        file.write(data)
+
+
+class ItemDatabase(Mapping[str, Item]):
+    """Maps folded item IDs to items, only unpickling each when first accessed.
+
+    If an item is invalid, that is reported and the compile quits then.
+    """
+    def __init__(self, data: memoryview, summaries: list[ItemSummary], index: Index) -> None:
+        self._data = data
+        self._index = index
+        self._loaded: dict[str, Item] = {}
+        self.summaries = summaries
+
+    def __getitem__(self, item_id: str) -> Item:
+        try:
+            return self._loaded[item_id]
+        except KeyError:
+            pass
+        offset, size = self._index[item_id]
+        try:
+            item = pickle.loads(self._data[offset:offset + size])
+        except Exception:  # Anything from __setstate__ etc.
+            parse_failed()
+        self._loaded[item_id] = item
+        return item
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._index
+
+
+def parse_failed() -> NoReturn:
+    """Log that the database could not be read, then quit the compile.
+
+    This must be called from an exception handler.
+    """
+    LOGGER.exception(
+        'Failed to parse editoritems dump. Recompile the compiler '
+        'and/or export the palette.'
+        if utils.DEV_MODE else
+        'Failed to parse editoritems dump. Re-export BEE2.'
+    )
+    sys.exit(1)
+
+
+def load(path: str | os.PathLike[str]) -> ItemDatabase:
+    """Load the database. Only the header is parsed, items are loaded when used."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, header_size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'Unknown editoritems database version {magic!r} {version}!')
+    start = HEADER.size + header_size
+    summaries, index = pickle.loads(data[HEADER.size:start])
+    return ItemDatabase(memoryview(data)[start:], summaries, index)
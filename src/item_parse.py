@@ -0,0 +1,96 @@
+"""Parses the files inside item folders in packages.
+
+This is kept separate from packages.item so that it can be run in worker
+processes, without them needing to import the UI.
+"""
+from __future__ import annotations
+from typing import Dict, Tuple, Type
+
+from srctools import Property, VMF, logger
+from srctools.filesys import FileSystem
+from srctools.tokenizer import Tokenizer, Token
+
+from editoritems import Item as EditorItem
+import editoritems_vmf
+
+
+LOGGER = logger.get_logger(__name__)
+# In worker processes, filesystems we've already opened.
+_WORKER_FSYS: Dict[Tuple[Type[FileSystem], str], FileSystem] = {}
+
+
+def parse_item_files(
+    filesystem: FileSystem,
+    fold: str,
+    pak_id: str,
+) -> tuple[Property, EditorItem, list[EditorItem]]:
+    """Parse the properties and editoritems files in an item folder."""
+    prop_path = f'items/{fold}/properties.txt'
+    editor_path = f'items/{fold}/editoritems.txt'
+
+    first_item: EditorItem | None = None
+    extra_items: list[EditorItem] = []
+    try:
+        props = filesystem.read_prop(prop_path)
+        props = props.find_key('Properties')
+        f = filesystem[editor_path].open_str()
+    except FileNotFoundError as err:
+        raise IOError(f'"{pak_id}:items/{fold}" not valid! Folder likely missing! ') from err
+    with f:
+        tok = Tokenizer(f, editor_path)
+        for tok_type, tok_value in tok:
+            if tok_type is Token.STRING:
+                if tok_value.casefold() != 'item':
+                    raise tok.error('Unknown item option "{}"!', tok_value)
+                if first_item is None:
+                    first_item = EditorItem.parse_one(tok)
+                else:
+                    extra_items.append(EditorItem.parse_one(tok))
+            elif tok_type is not Token.NEWLINE:
+                raise tok.error(tok_type)
+
+    if first_item is None:
+        raise ValueError(
+            f'"{pak_id}:items/{fold}/editoritems.txt has no '
+            '"Item" block!'
+        )
+
+    try:
+        editor_props = filesystem.read_prop(f'{editor_path[:-3]}vmf')
+    except FileNotFoundError:
+        pass
+    else:
+        editoritems_vmf.load(first_item, VMF.parse(editor_props))
+        del editor_props
+    first_item.generate_collisions()
+
+    # extra_items is any extra blocks (offset catchers, extent items).
+    # These must not have a palette section - it'll override any the user
+    # chooses.
+    for extra_item in extra_items:
+        extra_item.generate_collisions()
+        for subtype in extra_item.subtypes:
+            if subtype.pal_pos is not None:
+                LOGGER.warning(
+                    f'"{pak_id}:items/{fold}/editoritems.txt has '
+                    f'palette set for extra item blocks. Deleting.'
+                )
+                subtype.pal_icon = subtype.pal_pos = subtype.pal_name = None
+    return props, first_item, extra_items
+
+
+def parse_in_worker(
+    fsys_type: Type[FileSystem],
+    fsys_path: str,
+    fold: str,
+    pak_id: str,
+) -> tuple[Property, EditorItem, list[EditorItem]]:
+    """Parse an item folder inside a worker process.
+
+    Filesystems can't be sent between processes, so they are reopened here.
+    """
+    try:
+        filesystem = _WORKER_FSYS[fsys_type, fsys_path]
+    except KeyError:
+        filesystem = _WORKER_FSYS[fsys_type, fsys_path] = fsys_type(fsys_path)
+    return parse_item_files(filesystem, fold, pak_id)
@@ -19,7 +19,7 @@ from app import config, logWindow
 from localisation import gettext
 import utils
 
-from typing import Set, Tuple, cast, Any, Type
+from typing import Dict, Set, Tuple, cast, Any, Type
 
 
 # Keep a reference to all loading screens, so we can close them globally.
@@ -34,6 +34,9 @@ _SCREEN_CANCEL_FLAG: Set[int] = set()
 _PIPE_MAIN_REC, _PIPE_DAEMON_SEND = multiprocessing.Pipe(duplex=False)
 _PIPE_DAEMON_REC, _PIPE_MAIN_SEND = multiprocessing.Pipe(duplex=False)
 
+# Steps are batched up, and only sent to the daemon this often.
+STEP_INTERVAL = 1 / 30
+
 
 class Cancelled(SystemExit):
     """Raised when the user cancels the loadscreen."""
@@ -101,6 +104,12 @@ class LoadScreen:
         self.active = False
         self._time = 0.0
         self.stage_ids = {st_id for st_id, title in stages}
+        # Steps not yet sent to the daemon, and when we last sent them.
+        self._pending: Dict[str, int] = {}
+        self._flush_time = 0.0
+        # The progress and length of each stage, so we can flush when one finishes.
+        self._values: Dict[str, int] = {}
+        self._maxes: Dict[str, int] = {}
         # active determines whether the screen is on, and if False stops most
         # functions from doing anything
 
@@ -130,8 +139,21 @@ class LoadScreen:
 
     def _send_msg(self, command: str, *args: Any) -> None:
         """Send a message to the daemon."""
+        if self._pending:
+            self._flush_steps()
         _PIPE_MAIN_SEND.send((command, id(self), args))
-        # Check the messages coming back as well.
+        self._check_replies()
+
+    def _flush_steps(self) -> None:
+        """Send any batched up steps to the daemon."""
+        pending = list(self._pending.items())
+        self._pending.clear()
+        self._flush_time = time.perf_counter()
+        for stage, count in pending:
+            _PIPE_MAIN_SEND.send(('step', id(self), (stage, count)))
+
+    def _check_replies(self) -> None:
+        """Check the messages coming back from the daemon."""
         while _PIPE_MAIN_REC.poll():
             arg: Any
             command, arg = _PIPE_MAIN_REC.recv()
@@ -156,6 +178,7 @@ class LoadScreen:
         """Set the maximum value for the specified stage."""
         if stage not in self.stage_ids:
             raise KeyError(f'"{stage}" not valid for {self.stage_ids}!')
+        self._maxes[stage] = num
         self._send_msg('set_length', stage, num)
 
     def step(self, stage: str, disp_name: str='') -> None:
@@ -167,7 +190,12 @@ class LoadScreen:
         if diff > 0.1:
             LOGGER.debug('{}: "{}" = {:.3}s', stage, disp_name, diff)
         self._time = cur
-        self._send_msg('step', stage)
+        self._pending[stage] = self._pending.get(stage, 0) + 1
+        self._values[stage] = value = self._values.get(stage, 0) + 1
+        # Only send these periodically, or when the stage finishes.
+        if cur - self._flush_time >= STEP_INTERVAL or value == self._maxes.get(stage):
+            self._flush_steps()
+            self._check_replies()
 
     def skip_stage(self, stage: str) -> None:
         """Skip over this stage of the loading process."""
@@ -185,6 +213,8 @@ class LoadScreen:
     def reset(self) -> None:
         """Hide the loading screen and reset all the progress bars."""
         self.active = False
+        self._pending.clear()
+        self._values.clear()
         self._send_msg('reset')
 
     def destroy(self):
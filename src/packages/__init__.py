@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import warnings
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import attrs
@@ -12,6 +13,7 @@ import trio
 
 import srctools
 from app import tkMarkdown, img, lazy_conf, background_run
+from packages import parse_cache
 import utils
 import consts
 from app.packageMan import PACK_CONFIG
@@ -24,7 +26,7 @@ import srctools.logger
 
 from typing import (
     NoReturn, ClassVar, Optional, Any, TYPE_CHECKING, TypeVar, Type,
-    Collection, Iterable, cast,
+    Callable, Collection, Iterable, cast,
 )
 if TYPE_CHECKING:  # Prevent circular import
     from app.gameMan import Game
@@ -35,6 +37,8 @@ LOGGER = srctools.logger.get_logger(__name__, alias='packages')
 OBJ_TYPES: dict[str, Type[PakObject]] = {}
 # Maps a package ID to the matching filesystem for reading files easily.
 PACKAGE_SYS: dict[str, FileSystem] = {}
+# If enabled, worker processes used to parse files while loading packages.
+PARSE_POOL: Optional[ProcessPoolExecutor] = None
 
 
 @attrs.define
@@ -438,18 +442,27 @@ async def find_packages(nursery: trio.Nursery, packset: PackagesSet, pak_dir: Pa
 
         LOGGER.debug('Reading package "{}"', name)
 
-        # Valid packages must have an info.txt file!
+        # Matches Package.get_modtime().
+        cache = parse_cache.for_package(
+            name,
+            0 if isinstance(filesys, RawFileSystem) else int(name.stat().st_mtime),
+        )
         try:
-            info = await trio.to_thread.run_sync(filesys.read_prop, 'info.txt', cancellable=True)
-        except FileNotFoundError:
-            if name.is_dir():
-                # This isn't a package, so check the subfolders too...
-                LOGGER.debug('Checking subdir "{}" for packages...', name)
-                nursery.start_soon(find_packages, nursery, packset, name)
-            else:
-                LOGGER.warning('ERROR: package "{}" has no info.txt!', name)
-            # Don't continue to parse this "package"
-            continue
+            info = cache.get('info.txt')
+        except KeyError:
+            # Valid packages must have an info.txt file!
+            try:
+                info = await trio.to_thread.run_sync(filesys.read_prop, 'info.txt', cancellable=True)
+            except FileNotFoundError:
+                if name.is_dir():
+                    # This isn't a package, so check the subfolders too...
+                    LOGGER.debug('Checking subdir "{}" for packages...', name)
+                    nursery.start_soon(find_packages, nursery, packset, name)
+                else:
+                    LOGGER.warning('ERROR: package "{}" has no info.txt!', name)
+                # Don't continue to parse this "package"
+                continue
+            cache.set('info.txt', info)
         pak_id = info['ID']
 
         if pak_id.casefold() in packset.packages:
@@ -459,6 +472,7 @@ async def find_packages(nursery: trio.Nursery, packset: PackagesSet, pak_dir: Pa
             ) from None
 
         PACKAGE_SYS[pak_id.casefold()] = filesys
+        parse_cache.register(pak_id, cache)
 
         packset.packages[pak_id.casefold()] = Package(
             pak_id,
@@ -472,6 +486,26 @@ async def find_packages(nursery: trio.Nursery, packset: PackagesSet, pak_dir: Pa
         LOGGER.info('No packages in folder {}!', pak_dir)
 
 
+async def run_in_process(func: Callable[..., T], *args: Any) -> T:
+    """Run a function in the parsing process pool, and wait for the result.
+
+    The function and arguments must be picklable.
+    """
+    if PARSE_POOL is None:
+        raise ValueError('Process pool is not running!')
+    future = PARSE_POOL.submit(func, *args)
+    token = trio.lowlevel.current_trio_token()
+    done = trio.Event()
+    # This is called from the pool's thread.
+    future.add_done_callback(lambda fut: token.run_sync_soon(done.set))
+    try:
+        await done.wait()
+    except trio.Cancelled:
+        future.cancel()
+        raise
+    return future.result()
+
+
 def no_packages_err(pak_dirs: list[Path], msg: str) -> NoReturn:
     """Show an error message indicating no packages are present."""
     from tkinter import messagebox
@@ -503,8 +537,14 @@ async def load_packages(
     loader: LoadScreen,
     has_mel_music: bool=False,
     has_tag_music: bool=False,
+    use_processes: bool=False,
 ) -> None:
-    """Scan and read in all packages."""
+    """Scan and read in all packages.
+
+    If use_processes is set, item files are parsed in a pool of worker processes.
+    """
+    global PARSE_POOL
+    await trio.to_thread.run_sync(parse_cache.load)
     async with trio.open_nursery() as find_nurs:
         for pak_dir in pak_dirs:
             find_nurs.start_soon(find_packages, find_nurs, packset, pak_dir)
@@ -554,19 +594,29 @@ async def load_packages(
         packset.unparsed.items()
     ))
 
+    if use_processes:
+        PARSE_POOL = ProcessPoolExecutor()
     # Load either now, or in background.
-    async with trio.open_nursery() as nursery:
-        for obj_class, objs in packset.unparsed.items():
-            if obj_class.needs_foreground:
-                nursery.start_soon(
-                    parse_type,
-                    packset, obj_class, objs, loader,
-                )
-            else:
-                background_run(
-                    parse_type,
-                    packset, obj_class, objs, None,
-                )
+    try:
+        async with trio.open_nursery() as nursery:
+            for obj_class, objs in packset.unparsed.items():
+                if obj_class.needs_foreground:
+                    nursery.start_soon(
+                        parse_type,
+                        packset, obj_class, objs, loader,
+                    )
+                else:
+                    background_run(
+                        parse_type,
+                        packset, obj_class, objs, None,
+                    )
+    finally:
+        # Only items use the pool, and those are parsed in the foreground.
+        if PARSE_POOL is not None:
+            PARSE_POOL.shutdown(wait=False)
+            PARSE_POOL = None
+    # Only foreground objects use the cache, so it's complete now.
+    await trio.to_thread.run_sync(parse_cache.save)
 
 
 async def parse_type(packset: PackagesSet, obj_class: Type[PakT], objs: Iterable[str], loader: Optional[LoadScreen]) -> None:
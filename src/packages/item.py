@@ -12,17 +12,17 @@ from pathlib import PurePosixPath as FSPath
 
 import attrs
 import trio
-from srctools import FileSystem, Property, VMF, Vec, logger
-from srctools.tokenizer import Tokenizer, Token
+from srctools import FileSystem, Property, Vec, logger
 
 from app import tkMarkdown, img, lazy_conf, DEV_MODE, config
+import packages
 from packages import (
     PackagesSet, PakObject, ParseData, ExportData, Style,
-    sep_values, desc_parse, get_config,
+    sep_values, desc_parse, get_config, parse_cache,
 )
 from editoritems import Item as EditorItem, InstCount
 from connections import Config as ConnConfig
-import editoritems_vmf
+import item_parse
 import collisions
 import utils
 
@@ -791,35 +791,24 @@ async def parse_item_folder(
     folders is a dict, which we fill in ItemVariants as required.
     """
     prop_path = f'items/{fold}/properties.txt'
-    editor_path = f'items/{fold}/editoritems.txt'
     config_path = f'items/{fold}/vbsp_config.cfg'
 
-    first_item: EditorItem | None = None
-    extra_items: list[EditorItem] = []
+    # Parsing these is slow, so the results are cached for unchanged packages.
+    cache = parse_cache.get(pak_id)
     try:
-        props = await trio.to_thread.run_sync(filesystem.read_prop, prop_path)
-        props = props.find_key('Properties')
-        f = filesystem[editor_path].open_str()
-    except FileNotFoundError as err:
-        raise IOError(f'"{pak_id}:items/{fold}" not valid! Folder likely missing! ') from err
-    with f:
-        tok = Tokenizer(f, editor_path)
-        for tok_type, tok_value in tok:
-            if tok_type is Token.STRING:
-                if tok_value.casefold() != 'item':
-                    raise tok.error('Unknown item option "{}"!', tok_value)
-                if first_item is None:
-                    first_item = await trio.to_thread.run_sync(EditorItem.parse_one, tok)
-                else:
-                    extra_items.append(await trio.to_thread.run_sync(EditorItem.parse_one, tok))
-            elif tok_type is not Token.NEWLINE:
-                raise tok.error(tok_type)
-
-    if first_item is None:
-        raise ValueError(
-            f'"{pak_id}:items/{fold}/editoritems.txt has no '
-            '"Item" block!'
-        )
+        props, first_item, extra_items = cache.get(f'items/{fold}')
+    except KeyError:
+        if packages.PARSE_POOL is not None:
+            props, first_item, extra_items = await packages.run_in_process(
+                item_parse.parse_in_worker,
+                type(filesystem), str(filesystem.path), fold, pak_id,
+            )
+        else:
+            props, first_item, extra_items = await trio.to_thread.run_sync(
+                item_parse.parse_item_files,
+                filesystem, fold, pak_id,
+            )
+        cache.set(f'items/{fold}', (props, first_item, extra_items))
 
     if first_item.id.casefold() != item_id.casefold():
         LOGGER.warning(
@@ -828,29 +817,6 @@ async def parse_item_folder(
             item_id, first_item.id, pak_id, fold,
         )
 
-    try:
-        editor_props = await trio.to_thread.run_sync(filesystem.read_prop, f'{editor_path[:-3]}vmf')
-        editor_vmf = await trio.to_thread.run_sync(VMF.parse, editor_props)
-    except FileNotFoundError:
-        pass
-    else:
-        editoritems_vmf.load(first_item, editor_vmf)
-        del editor_props, editor_vmf
-    first_item.generate_collisions()
-
-    # extra_items is any extra blocks (offset catchers, extent items).
-    # These must not have a palette section - it'll override any the user
-    # chooses.
-    for extra_item in extra_items:
-        extra_item.generate_collisions()
-        for subtype in extra_item.subtypes:
-            if subtype.pal_pos is not None:
-                LOGGER.warning(
-                    f'"{pak_id}:items/{fold}/editoritems.txt has '
-                    f'palette set for extra item blocks. Deleting.'
-                )
-                subtype.pal_icon = subtype.pal_pos = subtype.pal_name = None
-
     # In files this is specified as PNG, but it's always really VTF.
     try:
         all_icon = FSPath(props['all_icon']).with_suffix('.vtf')
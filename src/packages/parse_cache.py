@@ -0,0 +1,122 @@
+"""Caches the results of parsing files inside packages, so unchanged packages load faster.
+
+Entries are stored per package file along with its modification time, so any
+modified package is discarded and reparsed. Unzipped packages are never cached,
+since they're being edited.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Any
+import pickle
+
+import attrs
+from atomicwrites import atomic_write
+import srctools.logger
+
+import utils
+
+
+LOGGER = srctools.logger.get_logger(__name__)
+# Parsing may change between versions, so discard the cache if the app is updated.
+CACHE_VERSION = (1, utils.BEE_VERSION)
+FILENAME = 'cache/packages.bin'
+
+
+@attrs.define(eq=False)
+class PackageCache:
+    """The cached data for a single package."""
+    # Modification time of the package, or zero if it can't be cached.
+    mtime: int
+    # Values are stored pickled, so modifying the results doesn't alter the cache.
+    entries: dict[str, bytes] = attrs.Factory(dict)
+
+    def get(self, key: str) -> Any:
+        """Return the value stored under this key, or raise KeyError."""
+        return pickle.loads(self.entries[key])
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value under this key."""
+        global _CHANGED
+        if self.mtime:
+            self.entries[key] = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            _CHANGED = True
+
+
+# Package filename -> cache, loaded from disk.
+_CACHE: dict[str, PackageCache] = {}
+# Package ID -> cache, for packages found this session.
+_BY_ID: dict[str, PackageCache] = {}
+_CHANGED = False
+
+
+def for_package(filename: Path, mtime: int) -> PackageCache:
+    """Fetch the cache for a package file, discarding it if the package was modified."""
+    global _CHANGED
+    key = str(filename)
+    try:
+        cache = _CACHE[key]
+    except KeyError:
+        pass
+    else:
+        if mtime and cache.mtime == mtime:
+            return cache
+        LOGGER.debug('Package "{}" modified, reparsing.', filename)
+        _CHANGED = True
+    _CACHE[key] = cache = PackageCache(mtime)
+    return cache
+
+
+def register(pak_id: str, cache: PackageCache) -> None:
+    """Record the ID of a package, once that has been read."""
+    _BY_ID[pak_id.casefold()] = cache
+
+
+def get(pak_id: str) -> PackageCache:
+    """Return the cache for a package ID, or a blank one if it's unknown."""
+    try:
+        return _BY_ID[pak_id.casefold()]
+    except KeyError:
+        return PackageCache(0)
+
+
+def load() -> None:
+    """Load the cache from disk."""
+    global _CHANGED
+    _CACHE.clear()
+    _BY_ID.clear()
+    _CHANGED = False
+    try:
+        with open(utils.conf_location(FILENAME), 'rb') as f:
+            version, data = pickle.load(f)
+    except FileNotFoundError:
+        return
+    except Exception:
+        LOGGER.warning('Could not read package cache:', exc_info=True)
+        return
+    if version != CACHE_VERSION:
+        LOGGER.info('Package cache is from a different version, discarding.')
+        return
+    for filename, (mtime, entries) in data.items():
+        _CACHE[filename] = PackageCache(mtime, entries)
+
+
+def save() -> None:
+    """Write the cache back to disk, removing packages which weren't found."""
+    global _CHANGED
+    used = {id(cache) for cache in _BY_ID.values()}
+    data = {
+        filename: (cache.mtime, cache.entries)
+        for filename, cache in _CACHE.items()
+        if cache.mtime and id(cache) in used
+    }
+    if not _CHANGED and len(data) == sum(1 for cache in _CACHE.values() if cache.mtime):
+        return
+    LOGGER.info('Writing package cache for {} packages...', len(data))
+    try:
+        with atomic_write(utils.conf_location(FILENAME), mode='wb', overwrite=True) as f:
+            pickle.dump((CACHE_VERSION, data), f, pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # The cache is optional, so this shouldn't prevent loading packages.
+        LOGGER.warning('Could not write package cache:', exc_info=True)
+    else:
+        _CHANGED = False
@@ -94,7 +94,16 @@ def write_templates(game: gameMan.Game) -> None:
         temp_el = DMXElement(temp_id, 'DMETemplate')
         temp_el['package'] = os.path.abspath(pack_path).replace('\\', '/')
         temp_el['path'] = path.path
+        # The compiler caches parsed templates, use this to detect changes.
+        # Folders don't have a useful modification time, use the file instead.
+        try:
+            if os.path.isdir(pack_path):
+                temp_el['mtime'] = int(os.stat(os.path.join(pack_path, path.path)).st_mtime)
+            else:
+                temp_el['mtime'] = int(os.stat(pack_path).st_mtime)
+        except OSError:
+            temp_el['mtime'] = 0
         template_list.append(temp_el)
 
     with atomic_write(game.abs_path('bin/bee2/templates.lst'), mode='wb', overwrite=True) as f:
-        root.export_binary(f, fmt_name='bee_templates', unicode='format')
+        root.export_binary(f, fmt_name='bee_templates', fmt_ver=2, unicode='format')
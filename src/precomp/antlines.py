@@ -3,6 +3,7 @@ from __future__ import annotations
 from collections import defaultdict
 from collections.abc import Iterator
 from enum import Enum
+from typing import Tuple
 import math
 
 import attrs
@@ -14,6 +15,8 @@ import consts
 
 
 LOGGER = logger.get_logger(__name__)
+# An antline targetname, then a position snapped to the grid.
+JoinKey = Tuple[str, int, int, int]
 
 
 class SegType(Enum):
@@ -362,8 +365,9 @@ def parse_antlines(vmf: VMF) -> tuple[
 
     # Points on antlines where two can connect. For corners that's each side,
     # for straight it's each end. Combine that with the targetname
-    # so we only join related antlines.
-    join_points: dict[tuple[str, float, float, float], Segment] = {}
+    # so we only join related antlines. This is a spatial hash - points are
+    # snapped to the grid, so slightly misaligned overlays still join.
+    join_points: dict[JoinKey, Segment] = {}
 
     mat_straight = consts.Antlines.STRAIGHT
     mat_corner = consts.Antlines.CORNER
@@ -431,7 +435,7 @@ def parse_antlines(vmf: VMF) -> tuple[
             # Lookup the point to see if we've already checked it.
             # If not, write us into that spot.
             neighbour = join_points.setdefault(
-                (over_name, ) + point.as_tuple(),
+                join_key(over_name, point),
                 seg,
             )
             if neighbour is seg:
@@ -459,12 +463,14 @@ def parse_antlines(vmf: VMF) -> tuple[
             continue
         # Found a start point!
         segments = [start_seg]
+        visited = {start_seg}
 
         for segment in segments:
             neighbours = overlay_joins.pop(segment)
             # Except KeyError: this segment's already done??
             for neighbour in neighbours:
-                if neighbour not in segments:
+                if neighbour not in visited:
+                    visited.add(neighbour)
                     segments.append(neighbour)
 
         antlines.setdefault(over_name, []).append(Antline(over_name, segments))
@@ -473,10 +479,19 @@ def parse_antlines(vmf: VMF) -> tuple[
     return antlines, side_to_seg
 
 
+def join_key(over_name: str, point: Vec) -> JoinKey:
+    """Compute the key used to find antline segments meeting at a point.
+
+    Join points are at least 8 units apart, so snapping to the nearest unit
+    allows for overlays which are slightly off without ambiguity.
+    """
+    return over_name, round(point.x), round(point.y), round(point.z)
+
+
 def fix_single_straight(
     seg: Segment,
     over_name: str,
-    join_points: dict[tuple[str, float, float, float], Segment],
+    join_points: dict[JoinKey, Segment],
     overlay_joins: dict[Segment, set[Segment]],
 ) -> None:
     """Figure out the correct rotation for 1-long straight antlines."""
@@ -493,7 +508,7 @@ def fix_single_straight(
         orient.up(+8.0),
     ]:
         try:
-            neigh = join_points[(over_name, ) + (center + off).as_tuple()]
+            neigh = join_points[join_key(over_name, center + off)]
         except KeyError:
             continue
 
@@ -513,7 +528,7 @@ def fix_single_straight(
         elif seg.start != off_min or seg.end != off_max:
             # The other side is also present. Only override if we are on both
             # sides.
-            if (over_name, ) + (center - off).as_tuple() in join_points:
+            if join_key(over_name, center - off) in join_points:
                 seg.start = off_min
                 seg.end = off_max
         # Else: Both equal, we're fine.
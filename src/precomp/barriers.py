@@ -11,11 +11,11 @@ import srctools.logger
 from plane import Plane
 from precomp import (
     texturing, options, packing,
-    template_brush, conditions, collisions,
+    template_brush, conditions, collisions, instance_transform,
 )
 import consts
 from precomp.grid_optim import optimise as grid_optimise
-from precomp.instanceLocs import resolve_one, resolve
+from precomp.instanceLocs import resolve_one, resolve_filter
 
 
 LOGGER = srctools.logger.get_logger(__name__)
@@ -56,7 +56,7 @@ def parse_map(vmf: VMF, has_attr: dict[str, bool]) -> None:
     This removes the per-tile instances, and all original brushwork.
     The frames are updated with a fixup var, as appropriate.
     """
-    frame_inst = resolve('[glass_frames]', silent=True)
+    frame_inst = resolve_filter('[glass_frames]', silent=True)
     glass_inst = resolve_one('[glass_128]')
 
     pos = None
@@ -90,15 +90,15 @@ def parse_map(vmf: VMF, has_attr: dict[str, bool]) -> None:
             inst.remove()
         elif filename in frame_inst:
             # Add a fixup to allow distinguishing the type.
-            pos = Vec.from_str(inst['origin']) // 128 * 128 + (64, 64, 64)
-            norm = Vec(z=-1) @ Angle.from_str(inst['angles'])
+            pos = instance_transform.grid_pos(inst) * 128 + (64, 64, 64)
+            norm = Vec(z=-1) @ instance_transform.orient(inst)
             try:
                 inst.fixup[consts.FixupVars.BEE_GLS_TYPE] = BARRIERS[pos.as_tuple(), norm.as_tuple()].value
             except KeyError:
                 LOGGER.warning('No glass/grating for frame at {}, {}?', pos, norm)
 
     if options.get(str, 'glass_pack') and has_attr['glass']:
-        packing.pack_list(vmf, options.get(str, 'glass_pack'))
+        packing.pack_list(options.get(str, 'glass_pack'))
 
 
 def test_hole_spot(origin: Vec, normal: Vec, hole_type: HoleType):
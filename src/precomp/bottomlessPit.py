@@ -160,10 +160,8 @@ def make_bottomless_pit(vmf: VMF, max_height):
     tele_trig = None
     hurt_trig = None
 
-    for grid_pos, block_type in brushLoc.POS.items():  # type: Vec, brushLoc.Block
+    for grid_pos, block_type in brushLoc.POS.iter_blocks(*brushLoc.PIT_BLOCKS):
         pos = brushLoc.grid_to_world(grid_pos)
-        if not block_type.is_pit:
-            continue
 
         # Physics objects teleport when they hit the bottom of a pit.
         if block_type.is_bottom and use_skybox:
@@ -3,12 +3,13 @@
 """
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator
+from collections.abc import Iterable, Iterator, Mapping
 from collections import deque
 from typing import Union, Any, Tuple, ItemsView, MutableMapping
 from enum import Enum
+import itertools
 
-from srctools import Vec, Matrix, Angle, VMF
+from srctools import Vec, VMF
 
 import srctools.logger
 import utils
@@ -111,18 +112,20 @@ BLOCK_LOOKUP = {
     block.name.casefold(): {block}
     for block in Block
 }
-BLOCK_LOOKUP['goo'] = {
+GOO_BLOCKS = (
     Block.GOO_SINGLE,
     Block.GOO_TOP,
     Block.GOO_MID,
     Block.GOO_BOTTOM,
-}
-BLOCK_LOOKUP['pit'] = {
+)
+PIT_BLOCKS = (
     Block.PIT_SINGLE,
     Block.PIT_TOP,
     Block.PIT_MID,
     Block.PIT_BOTTOM,
-}
+)
+BLOCK_LOOKUP['goo'] = set(GOO_BLOCKS)
+BLOCK_LOOKUP['pit'] = set(PIT_BLOCKS)
 
 
 _grid_keys = Union[Vec, Tuple[float, float, float], slice]
@@ -141,23 +144,52 @@ def _conv_key(pos: _grid_keys) -> tuple[float, float, float]:
     return x, y, z
 
 
+# The dense array covers this range of grid positions on each axis. That's the
+# whole PeTI area (0-25), plus a buffer for the edges and embedded spaces.
+GRID_MIN = -16
+GRID_SIZE = 64
+_GRID_MAX = GRID_MIN + GRID_SIZE - 1
+# Each block is stored as a code in a bytearray, 0 is unset. NumPy isn't a
+# dependency of the compiler, so this is used instead of an array.
+_BLOCK_TO_CODE: dict[Block, int] = {block: ind for ind, block in enumerate(Block, 1)}
+_CODE_TO_BLOCK: list[Block] = [Block.VOID, *Block]
+
+
+def _grid_index(x: float, y: float, z: float) -> int:
+    """Return the index in the dense array for this position, or -1 if outside."""
+    if (
+        GRID_MIN <= x <= _GRID_MAX and GRID_MIN <= y <= _GRID_MAX
+        and GRID_MIN <= z <= _GRID_MAX
+    ):
+        ix, iy, iz = int(x), int(y), int(z)
+        if ix == x and iy == y and iz == z:
+            return ((ix - GRID_MIN) * GRID_SIZE + iy - GRID_MIN) * GRID_SIZE + iz - GRID_MIN
+    return -1
+
+
+def _index_pos(index: int) -> Vec:
+    """Convert an index in the dense array back into a position."""
+    xy, z = divmod(index, GRID_SIZE)
+    x, y = divmod(xy, GRID_SIZE)
+    return Vec(x + GRID_MIN, y + GRID_MIN, z + GRID_MIN)
+
+
 class _GridItemsView(ItemsView[Vec, Block]):
     """Implements the Grid.items() view, providing a view over the pos, block pairs."""
     # Initialised by superclass.
-    _mapping: dict[tuple[float, float, float], Block]
-    def __init__(self, grid: dict[tuple[float, float, float], Block]):
+    _mapping: Grid
+    def __init__(self, grid: Grid):
         super().__init__(grid)
 
     def __contains__(self, item: Any) -> bool:
         pos, block = item
         try:
-            return block is self._mapping[_conv_key(pos)]
-        except KeyError:
+            return pos in self._mapping and block is self._mapping[pos]
+        except (TypeError, ValueError):
             return False
 
     def __iter__(self) -> Iterator[tuple[Vec, Block]]:
-        for pos, block in self._mapping.items():
-            yield (Vec(pos), block)
+        return self._mapping.iter_blocks()
 
 
 class Grid(MutableMapping[_grid_keys, Block]):
@@ -165,9 +197,25 @@ class Grid(MutableMapping[_grid_keys, Block]):
 
     When doing lookups, the key can be prefixed with 'world': to treat
     as a world position.
+
+    Positions near the map are stored in a dense array, anything further away
+    in a dictionary. Iteration produces positions in the order they were first set.
     """
     def __init__(self) -> None:
-        self._grid: dict[tuple[float, float, float], Block] = {}
+        self._blocks = bytearray(GRID_SIZE ** 3)
+        self._outside: dict[tuple[float, float, float], Block] = {}
+        # The dense index or position tuple for each set location, in insertion order.
+        self._order: list[int | tuple[float, float, float]] = []
+
+    def _get_code(self, x: float, y: float, z: float) -> int:
+        """Return the code for the block at this position, or 0 if unset."""
+        index = _grid_index(x, y, z)
+        if index >= 0:
+            return self._blocks[index]
+        try:
+            return _BLOCK_TO_CODE[self._outside[x, y, z]]
+        except KeyError:
+            return 0
 
     def raycast(
         self,
@@ -190,24 +238,25 @@ class Grid(MutableMapping[_grid_keys, Block]):
         ValueError is raised if VOID is encountered, or this moves outside the
         map.
         """
-        start_pos = pos = Vec(*_conv_key(pos))
-        direction = Vec(direction)
-        collide_set = frozenset(collide)
+        x, y, z = _conv_key(pos)
+        dx, dy, dz = direction
+        void = _BLOCK_TO_CODE[Block.VOID]
+        collide_codes = {_BLOCK_TO_CODE[block] for block in collide}
         # 50x50x50 diagonal = 86, so that's the largest distance
         # you could possibly move.
         for i in range(90):
-            next_pos = pos + direction
-            block = super().get(next_pos.as_tuple(), Block.VOID)
-            if block is Block.VOID:
+            next_x, next_y, next_z = x + dx, y + dy, z + dz
+            code = self._get_code(next_x, next_y, next_z)
+            if code == 0 or code == void:
                 raise ValueError(
                     'Reached VOID at ({}) when '
                     'raycasting from {} with direction {}!'.format(
-                        next_pos, start_pos, direction
+                        Vec(next_x, next_y, next_z), Vec(_conv_key(pos)), Vec(direction),
                     )
                 )
-            if block in collide_set:
-                return pos
-            pos = next_pos
+            if code in collide_codes:
+                return Vec(x, y, z)
+            x, y, z = next_x, next_y, next_z
         else:
             raise ValueError('Moved too far! (> 90)')
 
@@ -224,40 +273,110 @@ class Grid(MutableMapping[_grid_keys, Block]):
         return g2w(self.raycast(w2g(pos), direction, collide))
 
     def __getitem__(self, pos: _grid_keys) -> Block:
-        return self._grid.get(_conv_key(pos), Block.VOID)
+        return _CODE_TO_BLOCK[self._get_code(*_conv_key(pos))]
 
     def __setitem__(self, pos: _grid_keys, value: Block) -> None:
         if type(value) is not Block:
             raise ValueError('Must be set to a Block item, not "{}"!'.format(
                 type(value).__name__,
             ))
-
-        self._grid[_conv_key(pos)] = value
+        coords = _conv_key(pos)
+        index = _grid_index(*coords)
+        if index >= 0:
+            if not self._blocks[index]:
+                self._order.append(index)
+            self._blocks[index] = _BLOCK_TO_CODE[value]
+        else:
+            if coords not in self._outside:
+                self._order.append(coords)
+            self._outside[coords] = value
 
     def __delitem__(self, pos: _grid_keys) -> None:
-        del self._grid[_conv_key(pos)]
+        coords = _conv_key(pos)
+        index = _grid_index(*coords)
+        if index >= 0:
+            if not self._blocks[index]:
+                raise KeyError(pos)
+            self._blocks[index] = 0
+            self._order.remove(index)
+        else:
+            del self._outside[coords]
+            self._order.remove(coords)
 
     def __contains__(self, pos: object) -> bool:
         try:
             coords = _conv_key(pos)  # type: ignore
         except (TypeError, ValueError):
             return False
-        return coords in self._grid
+        return self._get_code(*coords) != 0
 
     def __iter__(self) -> Iterator[Vec]:
-        yield from map(Vec, self._grid)
+        for key in self._order:
+            if type(key) is int:
+                yield _index_pos(key)
+            else:
+                yield Vec(key)
 
     def __len__(self) -> int:
-        return len(self._grid)
+        return len(self._order)
 
     def items(self) -> _GridItemsView:
         """Return a view over the grid items."""
-        return _GridItemsView(self._grid)
+        return _GridItemsView(self)
 
-    def read_from_map(self, vmf: VMF, has_attr: dict[str, bool], items: dict[str, editoritems.Item]) -> None:
+    def iter_blocks(self, *blocks: Block) -> Iterator[tuple[Vec, Block]]:
+        """Iterate over positions and blocks, in the order they were set.
+
+        If any blocks are specified, only those types are produced.
+        """
+        grid = self._blocks
+        outside = self._outside
+        codes = {_BLOCK_TO_CODE[block] for block in blocks} if blocks else None
+        for key in self._order:
+            if type(key) is int:
+                code = grid[key]
+                if codes is None or code in codes:
+                    yield _index_pos(key), _CODE_TO_BLOCK[code]
+            else:
+                block = outside[key]
+                if codes is None or _BLOCK_TO_CODE[block] in codes:
+                    yield Vec(key), block
+
+    def slab(self, axis: str, pos: float) -> dict[tuple[float, float], Block]:
+        """Return all blocks set in the layer perpendicular to the given axis.
+
+        The keys are the positions along the other two axes, in xyz order.
+        """
+        other = [ax for ax in 'xyz' if ax != axis]
+        if len(other) != 2:
+            raise ValueError(f'Invalid axis "{axis}"!')
+        u_ax, v_ax = other
+        result: dict[tuple[float, float], Block] = {}
+        index = int(pos) - GRID_MIN
+        if int(pos) == pos and 0 <= index < GRID_SIZE:
+            # Use a strided slice to pull out the layer.
+            if axis == 'x':
+                layer = self._blocks[index * GRID_SIZE ** 2:(index + 1) * GRID_SIZE ** 2]
+            elif axis == 'y':
+                layer = b''.join([
+                    self._blocks[start:start + GRID_SIZE]
+                    for start in range(index * GRID_SIZE, GRID_SIZE ** 3, GRID_SIZE ** 2)
+                ])
+            else:
+                layer = self._blocks[index::GRID_SIZE]
+            for ind in itertools.compress(range(len(layer)), layer):
+                u, v = divmod(ind, GRID_SIZE)
+                result[u + GRID_MIN, v + GRID_MIN] = _CODE_TO_BLOCK[layer[ind]]
+        for (x, y, z), block in self._outside.items():
+            coords = {'x': x, 'y': y, 'z': z}
+            if coords[axis] == pos:
+                result[coords[u_ax], coords[v_ax]] = block
+        return result
+
+    def read_from_map(self, vmf: VMF, has_attr: dict[str, bool], items: Mapping[str, editoritems.Item]) -> None:
         """Given the map file, set blocks."""
         from precomp.instance_traits import get_item_id
-        from precomp import bottomlessPit
+        from precomp import bottomlessPit, instance_transform
 
         # Starting points to fill air and goo.
         # We want to fill goo first...
@@ -265,11 +384,10 @@ class Grid(MutableMapping[_grid_keys, Block]):
         goo_search_locs: list[tuple[Vec, bool]] = []
 
         for ent in vmf.entities:
-            str_pos = ent['origin', None]
-            if str_pos is None:
+            if ent['origin', None] is None:
                 continue
 
-            pos = world_to_grid(Vec.from_str(str_pos))
+            pos = instance_transform.grid_pos(ent)
 
             # Exclude entities outside the main area - elevators mainly.
             # The border should never be set to air!
@@ -289,7 +407,7 @@ class Grid(MutableMapping[_grid_keys, Block]):
                 except KeyError:
                     pass
                 else:
-                    orient = Matrix.from_angle(Angle.from_str(ent['angles']))
+                    orient = instance_transform.orient(ent)
                     for local_pos in item.embed_voxels:
                         # Offset down because 0 0 0 is the floor voxel.
                         world_pos = (Vec(local_pos) - (0, 0, 1)) @ orient + pos
@@ -380,68 +498,85 @@ class Grid(MutableMapping[_grid_keys, Block]):
 
         This will also fill the submerged tunnels with goo.
         """
-        queue: deque[tuple[Vec, bool]] = deque(search_locs)
-
-        def iterdel() -> Iterator[tuple[Vec, bool]]:
-            """Iterate as FIFO queue, deleting as we go."""
-            try:
-                while True:
-                    yield queue.popleft()
-            except IndexError:  # We're empty!
-                return
+        # This works directly on the dense array, the bounds are entirely
+        # inside it.
+        queue: deque[tuple[int, int, int, bool]] = deque()
+        for pos, is_goo in search_locs:
+            x, y, z = _conv_key(pos)
+            if int(x) == x and int(y) == y and int(z) == z:
+                queue.append((int(x), int(y), int(z), is_goo))
+            else:
+                LOGGER.warning('Non-integer air search position {}', pos)
 
+        grid = self._blocks
+        order = self._order
         # Air pockets need to be filled, and bottomless pits.
         # Otherwise we could have those appearing next to real goo pits,
         # with complicated room heights.
-        goo_fillable = [
-            Block.AIR,
-            Block.OCCUPIED,
-            Block.PIT_BOTTOM,
-            Block.PIT_MID,
-            Block.PIT_TOP,
-            Block.PIT_SINGLE,
-        ]
-
-        # This will iterate every item we add to the queue..
-        for pos, is_goo in iterdel():
-            # Already set. But allow the goo to fill certain types.
-            if pos in self and not (is_goo and self[pos] in goo_fillable):
-                continue
+        goo_fillable = {
+            _BLOCK_TO_CODE[block] for block in [
+                Block.AIR,
+                Block.OCCUPIED,
+                Block.PIT_BOTTOM,
+                Block.PIT_MID,
+                Block.PIT_TOP,
+                Block.PIT_SINGLE,
+            ]
+        }
+        code_air = _BLOCK_TO_CODE[Block.AIR]
+        code_goo_bottom = _BLOCK_TO_CODE[Block.GOO_BOTTOM]
+        code_goo_mid = _BLOCK_TO_CODE[Block.GOO_MID]
+        solid_codes = {_BLOCK_TO_CODE[Block.SOLID], _BLOCK_TO_CODE[Block.EMBED]}
 
+        while queue:
+            x, y, z, is_goo = queue.popleft()
             # We got outside the map somehow?
             # There's a buffer region since large embedded areas may
             # be interpreted as small air pockets, that's fine.
-            if not ((-15, -15, -15) <= pos <= (40, 40, 40)):
-                LOGGER.warning('Attempted leak at {}', pos)
+            in_bounds = -15 <= x <= 40 and -15 <= y <= 40 and -15 <= z <= 40
+            if in_bounds:
+                index = ((x - GRID_MIN) * GRID_SIZE + y - GRID_MIN) * GRID_SIZE + z - GRID_MIN
+                code = grid[index]
+            else:
+                index = -1
+                code = self._get_code(x, y, z)
+            # Already set. But allow the goo to fill certain types.
+            if code and not (is_goo and code in goo_fillable):
+                continue
+
+            if not in_bounds:
+                LOGGER.warning('Attempted leak at {}', Vec(x, y, z))
                 continue
 
             # For go we need to determine which kind to use.
             # We only fill from underneath the surface, so
             # use "mid" even for toplevel pits.
+            if not code:
+                order.append(index)
             if is_goo:
-                if self[pos].is_pit:
-                    self[pos] = Block.from_pitgoo_attr(
+                block = _CODE_TO_BLOCK[code]
+                if block.is_pit:
+                    grid[index] = _BLOCK_TO_CODE[Block.from_pitgoo_attr(
                         False,
-                        self[pos].is_top,
-                        self[pos].is_bottom,
-                    )
-                elif self[pos.x, pos.y - 1, pos.z].is_solid:
-                    self[pos] = Block.GOO_BOTTOM
+                        block.is_top,
+                        block.is_bottom,
+                    )]
+                elif grid[index - GRID_SIZE] in solid_codes:  # y - 1
+                    grid[index] = code_goo_bottom
                 else:
-                    self[pos] = Block.GOO_MID
+                    grid[index] = code_goo_mid
             else:
-                self[pos] = Block.AIR
+                grid[index] = code_air
 
-            x, y, z = pos
             # Continue filling in each other direction.
             # But not up for goo.
             if not is_goo:
-                queue.append((Vec(x, y, z + 1), is_goo))
-            queue.append((Vec(x, y + 1, z), is_goo))
-            queue.append((Vec(x, y - 1, z), is_goo))
-            queue.append((Vec(x + 1, y, z), is_goo))
-            queue.append((Vec(x - 1, y, z), is_goo))
-            queue.append((Vec(x, y, z - 1), is_goo))
+                queue.append((x, y, z + 1, is_goo))
+            queue.append((x, y + 1, z, is_goo))
+            queue.append((x, y - 1, z, is_goo))
+            queue.append((x + 1, y, z, is_goo))
+            queue.append((x - 1, y, z, is_goo))
+            queue.append((x, y, z - 1, is_goo))
 
     def dump_to_map(self, vmf: VMF) -> None:
         """Debug purposes: Dump the info as entities in the map.
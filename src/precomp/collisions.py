@@ -1,16 +1,74 @@
 """Records the collisions for each item."""
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import attrs
-from srctools import Angle, Entity, Matrix, VMF, Vec
+from srctools import Entity, VMF, Vec
 from srctools.vmf import EntityGroup
 
 from collisions import CollideType as CollideType, BBox as BBox  # re-export.
 from editoritems import Item
+from precomp import instance_transform
 from tree import RTree
 
 
-__all__ = ['CollideType', 'BBox', 'Collisions']
+__all__ = ['CollideType', 'BBox', 'Collisions', 'Hit']
+# The furthest distance a ray can travel.
+MAX_DIST = 65536.0
+# min_x, min_y, min_z, max_x, max_y, max_z
+Bounds = Tuple[float, float, float, float, float, float]
+
+
+@attrs.frozen
+class Hit:
+    """A bounding box a ray or swept box passed through.
+
+    If the ray started inside the box, the distance is zero and the normal is a zero vector.
+    """
+    distance: float
+    point: Vec  # Where the ray hit, or the center of the swept box.
+    normal: Vec  # The face the ray entered, pointing back towards the start.
+    bbox: BBox
+
+
+def _slab_test(
+    bounds: Bounds,
+    start: Tuple[float, float, float],
+    inv_dir: Tuple[Optional[float], Optional[float], Optional[float]],
+    max_dist: float,
+) -> Optional[Tuple[float, float, int, float]]:
+    """Intersect a ray with a bounding box.
+
+    inv_dir is the reciprocal of the direction, or None for axes it's parallel to.
+    If hit, this returns the entry and exit distances, the entry axis (or -1 if inside)
+    and the sign of the direction along that axis.
+    """
+    near = float('-inf')
+    far = max_dist
+    axis = -1
+    sign = 0.0
+    for ind, pos, inv, low, high in zip(range(3), start, inv_dir, bounds[:3], bounds[3:]):
+        if inv is None:
+            # Parallel, so we must be inside the slab.
+            if pos < low or pos > high:
+                return None
+            continue
+        t1 = (low - pos) * inv
+        t2 = (high - pos) * inv
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > near:
+            near = t1
+            axis = ind
+            sign = 1.0 if inv > 0 else -1.0
+        if t2 < far:
+            far = t2
+        if near > far:
+            return None
+    if far < 0.0:
+        return None
+    if near <= 0.0:  # Started inside.
+        return 0.0, far, -1, 0.0
+    return near, far, axis, sign
 
 
 @attrs.define
@@ -30,6 +88,18 @@ class Collisions:
         if bbox not in lst:
             lst.append(bbox)
 
+    def add_many(self, bboxes: Iterable[BBox]) -> None:
+        """Add many bounding boxes at once, bulk-loading the tree if possible."""
+        bboxes = list(bboxes)
+        for bbox in bboxes:
+            if not bbox.name:
+                raise ValueError(f'Collision {bbox!r} must have a name to be inserted!')
+        self._by_bbox.insert_many([(bbox.mins, bbox.maxes, bbox) for bbox in bboxes])
+        for bbox in bboxes:
+            lst = self._by_name.setdefault(bbox.name.casefold(), [])
+            if bbox not in lst:
+                lst.append(bbox)
+
     def remove_bbox(self, bbox: BBox) -> None:
         """Remove the given bounding box from the map."""
         if not bbox.name:
@@ -48,12 +118,146 @@ class Collisions:
         except KeyError:
             return []
 
+    def find_overlapping(
+        self, bbox: BBox,
+        mask: CollideType = CollideType.EVERYTHING,
+    ) -> List[BBox]:
+        """Find all bounding boxes overlapping this one, with any of the specified contents.
+
+        Boxes which only share an edge or corner do not count.
+        """
+        query = bbox.with_attrs(contents=mask)
+        return [
+            found for found in self._by_bbox.find_bbox(query.mins, query.maxes)
+            if found.intersect(query) is not None
+        ]
+
+    def find_overlapping_many(
+        self, bboxes: Iterable[BBox],
+        mask: CollideType = CollideType.EVERYTHING,
+    ) -> List[List[BBox]]:
+        """Call find_overlapping() for each bounding box."""
+        return [self.find_overlapping(bbox, mask) for bbox in bboxes]
+
+    def raycast(
+        self, start: Vec, direction: Vec,
+        mask: CollideType = CollideType.EVERYTHING,
+        max_dist: Optional[float] = None,
+    ) -> List[Hit]:
+        """Find all bounding boxes with the specified contents hit by a ray, sorted by distance.
+
+        Distances are in units, independent of the magnitude of the direction. If max_dist
+        is not specified, the ray extends until it leaves the collisions in the map.
+        """
+        return self.raycast_many([(start, direction)], mask, max_dist)[0]
+
+    def raycast_many(
+        self, rays: Iterable[Tuple[Vec, Vec]],
+        mask: CollideType = CollideType.EVERYTHING,
+        max_dist: Optional[float] = None,
+    ) -> List[List[Hit]]:
+        """Perform raycast() with multiple (start, direction) pairs at once."""
+        return [
+            self._cast(start, direction, (0.0, 0.0, 0.0), mask, max_dist)
+            for start, direction in rays
+        ]
+
+    def sweep(
+        self, bbox: BBox, direction: Vec,
+        mask: CollideType = CollideType.EVERYTHING,
+        max_dist: Optional[float] = None,
+    ) -> List[Hit]:
+        """Move a bounding box along a direction, finding all the boxes it touches.
+
+        This otherwise behaves like raycast(). The point of each hit is the center of
+        the moved box when it first touches. Boxes the bounding box already touches are
+        hit at zero distance.
+        """
+        size = bbox.size
+        return self._cast(bbox.center, direction, (size.x / 2, size.y / 2, size.z / 2), mask, max_dist)
+
+    def _cast(
+        self, start: Vec, direction: Vec,
+        extent: Tuple[float, float, float],
+        mask: CollideType,
+        max_dist: Optional[float],
+    ) -> List[Hit]:
+        """Find the boxes hit by a box with these half-sizes, moving along a ray.
+
+        The moving box is equivalent to a ray against each box expanded by its size.
+        """
+        direction = direction.norm()
+        if not direction:
+            raise ValueError(f'Ray direction {direction} is zero!')
+        start_t = start.as_tuple()
+        inv_dir = tuple([1.0 / d if abs(d) > 1e-9 else None for d in direction])
+        ext_x, ext_y, ext_z = extent
+        if max_dist is None:
+            # Stop when the ray leaves the bounds of the whole tree.
+            if not self._by_bbox:
+                return []
+            min_x, min_y, min_z, max_x, max_y, max_z = self._by_bbox.bounds()
+            clip = _slab_test(
+                (min_x - ext_x, min_y - ext_y, min_z - ext_z, max_x + ext_x, max_y + ext_y, max_z + ext_z),
+                start_t, inv_dir, MAX_DIST,  # type: ignore[arg-type]
+            )
+            if clip is None:
+                return []
+            max_dist = clip[1]
+
+        search_min, search_max = Vec.bbox(start, start + direction * max_dist)
+        hits: List[Hit] = []
+        for bbox in self._by_bbox.find_bbox(search_min - extent, search_max + extent):
+            if not (bbox.contents & mask):
+                continue
+            res = _slab_test(
+                (
+                    bbox.min_x - ext_x, bbox.min_y - ext_y, bbox.min_z - ext_z,
+                    bbox.max_x + ext_x, bbox.max_y + ext_y, bbox.max_z + ext_z,
+                ),
+                start_t, inv_dir, max_dist,  # type: ignore[arg-type]
+            )
+            if res is None:
+                continue
+            dist, _, axis, sign = res
+            normal = Vec()
+            if axis != -1:
+                normal[axis] = -sign
+            hits.append(Hit(dist, start + direction * dist, normal, bbox))
+        hits.sort(key=lambda hit: hit.distance)
+        return hits
+
     def add_item_coll(self, item: Item, inst: Entity) -> None:
         """Add the default collisions from an item definition for this instance."""
-        origin = Vec.from_str(inst['origin'])
-        orient = Matrix.from_angle(Angle.from_str(inst['angles']))
-        for coll in item.collisions:
-            self.add((coll @ orient + origin).with_attrs(name=inst['targetname']))
+        self.add_item_colls([(item, inst)])
+
+    def add_item_colls(self, instances: Iterable[Tuple[Item, Entity]]) -> None:
+        """Add the default collisions for many instances at once.
+
+        Instances of the same item with the same orientation share the rotated boxes,
+        so only a translation needs to be done for each.
+        """
+        rotated: Dict[Tuple[str, float, float, float], List[BBox]] = {}
+        bboxes: List[BBox] = []
+        for item, inst in instances:
+            angles = instance_transform.angles(inst)
+            key = (item.id, angles.pitch, angles.yaw, angles.roll)
+            try:
+                local = rotated[key]
+            except KeyError:
+                orient = instance_transform.orient(inst)
+                local = rotated[key] = [coll @ orient for coll in item.collisions]
+            off_x, off_y, off_z = instance_transform.origin(inst)
+            name = inst['targetname']
+            for coll in local:
+                bboxes.append(BBox(
+                    coll.min_x + off_x, coll.min_y + off_y, coll.min_z + off_z,
+                    coll.max_x + off_x, coll.max_y + off_y, coll.max_z + off_z,
+                    contents=coll.contents,
+                    tags=coll.tags,
+                    name=name,
+                ))
+        self.add_many(bboxes)
 
     def dump(self, vmf: VMF, vis_name: str = 'Collisions') -> None:
         """Dump all the bounding boxes as a set of brushes."""
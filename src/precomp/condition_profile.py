@@ -0,0 +1,119 @@
+"""Records how long each condition, flag and result takes to run.
+
+This is opt-in, since timing every call slows down the compile. It is enabled
+by setting "profile_conditions" in compile.cfg, or the BEE2_PROFILE_CONDITIONS
+environment variable.
+"""
+from __future__ import annotations
+from typing import Callable, TypeVar
+from time import perf_counter
+import json
+import os
+
+import attrs
+from atomicwrites import atomic_write
+from srctools.vmf import Entity
+import srctools.logger
+
+from BEE2_config import ConfigFile
+
+
+LOGGER = srctools.logger.get_logger(__name__)
+ENV_VAR = 'BEE2_PROFILE_CONDITIONS'
+T = TypeVar('T')
+
+
+def is_enabled(config: ConfigFile) -> bool:
+    """Check if profiling was requested."""
+    return (
+        config.get_bool('General', 'profile_conditions', False)
+        or srctools.conv_bool(os.environ.get(ENV_VAR, ''))
+    )
+
+
+@attrs.define(eq=False)
+class Stats:
+    """Timing information for a single condition, flag or result."""
+    kind: str
+    name: str
+    calls: int = 0
+    # Time including any nested conditions, flags and results.
+    total: float = 0.0
+    # Time excluding those.
+    self_time: float = 0.0
+    instances: set[Entity] = attrs.Factory(set)
+
+    def as_dict(self) -> dict[str, object]:
+        """Convert to the JSON representation."""
+        return {
+            'kind': self.kind,
+            'name': self.name,
+            'calls': self.calls,
+            'total': self.total,
+            'self': self.self_time,
+            'instances': len(self.instances),
+        }
+
+
+class Profiler:
+    """Accumulates timings for conditions, flags and results.
+
+    Nested calls are tracked, so self time doesn't include time spent in the
+    flags and results executed by a condition, or conditions run by a result.
+    """
+    def __init__(self) -> None:
+        self.stats: dict[tuple[str, str], Stats] = {}
+        # For each call in progress, the time spent in nested calls.
+        self._child_time: list[float] = []
+
+    def call(
+        self, kind: str, name: str, inst: Entity,
+        func: Callable[..., T], *args: object,
+    ) -> T:
+        """Call func(*args), recording the time taken."""
+        try:
+            stat = self.stats[kind, name]
+        except KeyError:
+            stat = self.stats[kind, name] = Stats(kind, name)
+        stat.calls += 1
+        stat.instances.add(inst)
+        child_time = self._child_time
+        child_time.append(0.0)
+        start = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = perf_counter() - start
+            stat.total += elapsed
+            stat.self_time += elapsed - child_time.pop()
+            if child_time:
+                child_time[-1] += elapsed
+
+    def sorted_stats(self) -> list[Stats]:
+        """Return all stats, most expensive first."""
+        return sorted(
+            self.stats.values(),
+            key=lambda stat: (stat.self_time, stat.total),
+            reverse=True,
+        )
+
+    def write_report(self, filename: str) -> None:
+        """Write the report as filename.json and filename.txt."""
+        stats = self.sorted_stats()
+        LOGGER.info('Writing condition profile to "{}.json"...', filename)
+        with atomic_write(filename + '.json', overwrite=True) as f:
+            json.dump([stat.as_dict() for stat in stats], f, indent=1)
+
+        name_width = max([len(stat.name) for stat in stats], default=4)
+        header = (
+            f'{"Kind":<9} {"Name":<{name_width}} {"Calls":>8} '
+            f'{"Insts":>7} {"Self (s)":>10} {"Total (s)":>10}'
+        )
+        with atomic_write(filename + '.txt', overwrite=True) as f:
+            f.write(header + '\n')
+            f.write('-' * len(header) + '\n')
+            for stat in stats:
+                f.write(
+                    f'{stat.kind:<9} {stat.name:<{name_width}} {stat.calls:>8} '
+                    f'{len(stat.instances):>7} {stat.self_time:>10.4f} {stat.total:>10.4f}\n'
+                )
@@ -32,7 +32,9 @@ import functools
 import inspect
 import io
 import importlib
+import itertools
 import math
+import operator
 import pkgutil
 import sys
 import typing
@@ -40,7 +42,10 @@ import warnings
 from collections import defaultdict
 from decimal import Decimal
 from enum import Enum
-from typing import Generic, TypeVar, Any, Callable, TextIO, Tuple, Type, overload, cast
+from typing import (
+    Generic, TypeVar, Any, Callable, Iterable, Iterator, TextIO, Tuple, Type,
+    overload, cast,
+)
 
 import attrs
 import srctools.logger
@@ -50,7 +55,7 @@ from srctools import (
     VMF, Entity, Output, Solid, Angle, Matrix,
 )
 
-from precomp import instanceLocs, rand, collisions
+from precomp import instanceLocs, instance_transform, rand, collisions, condition_profile
 from precomp.corridor import Info as MapInfo
 import consts
 import utils
@@ -68,6 +73,10 @@ ALL_INST: set[str] = {''}
 
 conditions: list[Condition] = []
 FLAG_LOOKUP: dict[str, CondCall[bool]] = {}
+# For flags which can only succeed on specific instance filenames, a function
+# producing a predicate for (casefolded) filenames. This allows check_all() to
+# only visit instances those conditions could match.
+FLAG_FILE_FILTER: dict[str, Callable[[Property], Callable[[str], bool]]] = {}
 RESULT_LOOKUP: dict[str, CondCall[object]] = {}
 
 # For legacy setup functions.
@@ -77,12 +86,19 @@ RESULT_SETUP: dict[str, Callable[..., Any]] = {}
 ALL_FLAGS: list[tuple[str, tuple[str, ...], CondCall[bool]]] = []
 ALL_RESULTS: list[tuple[str, tuple[str, ...], CondCall[object]]] = []
 ALL_META: list[tuple[str, Decimal, CondCall[None]]] = []
+# If set, the profiler timing conditions as they execute.
+PROFILER: condition_profile.Profiler | None = None
+# The source of the condition currently executing, for diagnostics.
+CURRENT_SOURCE: str = ''
 
 
 CallableT = TypeVar('CallableT', bound=Callable)
+FileFilterT = TypeVar('FileFilterT', bound=Callable[[Property], Callable[[str], bool]])
 # The return values for 2-stage results and flags.
 FlagCallable = Callable[[Entity], bool]
 ResultCallable = Callable[[Entity], object]
+# A flag with the lookup and inversion already resolved - called with (coll, info, inst, can_skip).
+FlagPredicate = Callable[[collisions.Collisions, MapInfo, Entity, bool], bool]
 
 
 class SWITCH_TYPE(Enum):
@@ -193,6 +209,8 @@ class Condition:
     else_results: list[Property] = attrs.Factory(list)
     priority: Decimal = Decimal()
     source: str = None
+    # Compiled versions of flags, produced the first time this is tested.
+    _flag_checks: list[FlagPredicate] | None = attrs.field(default=None, init=False, repr=False)
 
     @classmethod
     def parse(cls, prop_block: Property) -> Condition:
@@ -254,27 +272,54 @@ class Condition:
                 # Delete this so it doesn't re-fire..
                 return RES_EXHAUSTED
         else:
+            if PROFILER is not None:
+                return PROFILER.call('result', res.name, inst, cond_call, coll, info, inst, res)
             return cond_call(coll, info, inst, res)
 
-    def test(self, coll: collisions.Collisions, info: MapInfo, inst: Entity) -> None:
+    def test(self, coll: collisions.Collisions, info: MapInfo, inst: Entity) -> bool:
         """Try to satisfy this condition on the given instance.
 
         If we find that no instance will succeed, raise Unsatisfiable.
+        This returns whether any results were executed.
         """
         success = True
+        flag_checks = self._flag_checks
+        if flag_checks is None:
+            flag_checks = self._flag_checks = list(map(compile_flag, self.flags))
         # Only the first one can cause this condition to be skipped.
         # We could have a situation where the first flag modifies the map
         # such that it becomes satisfiable later, so this would be premature.
         # If we have else results, we also can't skip because those could modify state.
-        for i, flag in enumerate(self.flags):
-            if not check_flag(flag, coll, info, inst, can_skip=i==0 and not self.else_results):
+        can_skip = not self.else_results
+        for check in flag_checks:
+            if not check(coll, info, inst, can_skip):
                 success = False
                 break
+            can_skip = False
         results = self.results if success else self.else_results
+        ran_results = bool(results)
         for res in results[:]:
             should_del = self.test_result(coll, info, inst, res)
             if should_del is RES_EXHAUSTED:
                 results.remove(res)
+        return ran_results
+
+    def file_filter(self) -> Callable[[str], bool] | None:
+        """If this can only succeed on specific instance filenames, return a predicate for those.
+
+        This is possible if the first flag only checks the filename, and there
+        are no else results which would run for other instances.
+        """
+        if not self.flags or self.else_results:
+            return None
+        flag = self.flags[0]
+        try:
+            filter_factory = FLAG_FILE_FILTER[flag.name]
+        except KeyError:  # Including inverted flags.
+            return None
+        if flag.has_children():
+            return None
+        return filter_factory(flag)
 
 
 AnnResT = TypeVar('AnnResT')
@@ -594,6 +639,20 @@ def make_flag(orig_name: str, *aliases: str) -> Callable[[CallableT], CallableT]
     return x
 
 
+def make_flag_filter(*names: str) -> Callable[[FileFilterT], FileFilterT]:
+    """Decorator to add a filename filter for flags.
+
+    The function is passed the flag configuration, and should return a
+    predicate which is false for every instance filename the flag will fail on.
+    This allows conditions starting with the flag to skip other instances entirely.
+    """
+    def x(func: FileFilterT) -> FileFilterT:
+        for name in names:
+            FLAG_FILE_FILTER[name.casefold()] = func
+        return func
+    return x
+
+
 def make_result(orig_name: str, *aliases: str) -> Callable[[CallableT], CallableT]:
     """Decorator to add results to the lookup."""
     folded_name = orig_name.casefold()
@@ -666,19 +725,152 @@ def init(vmf: VMF) -> None:
         ]))
 
 
-def check_all(vmf: VMF, coll: collisions.Collisions, info: MapInfo) -> None:
-    """Check all conditions."""
+_get_keys = operator.attrgetter('keys')
+
+
+def _inst_files(insts: list[Entity]) -> list[str | None]:
+    """Fetch the raw filename of each instance, or None if not present.
+
+    The common case of a lowercase key is fetched without going through Entity.__getitem__.
+    """
+    files: list[str | None] = list(map(dict.get, map(_get_keys, insts), itertools.repeat('file')))
+    if None in files:
+        for i, file in enumerate(files):
+            if file is None:
+                files[i] = insts[i]['file', None]
+    return files
+
+
+class InstanceIndex:
+    """Tracks the filenames of all instances, so conditions only visit ones they could match.
+
+    Instances are produced in exactly the same order as iterating over
+    VMF.by_class directly. Whenever results are executed, changes should be
+    incremented - the filenames are then reread before they're used.
+    """
+    def __init__(self, vmf: VMF) -> None:
+        self.vmf = vmf
+        self.changes = 0
+        self._built_at = -1
+        self._snapshot: frozenset[Entity] = frozenset()
+        self._order: list[Entity] = []
+        self._files: list[str | None] = []
+        # Raw filename -> positions in _order.
+        self._by_file: dict[str | None, list[int]] = {}
+
+    def _rebuild(self) -> None:
+        """Reread all the instances in the map."""
+        # This matches the iteration order used by CopySet.
+        self._snapshot = frozenset(self.vmf.by_class['func_instance'])
+        self._order = list(self._snapshot)
+        self._files = _inst_files(self._order)
+        self._by_file = by_file = {}
+        for pos, file in enumerate(self._files):
+            try:
+                by_file[file].append(pos)
+            except KeyError:
+                by_file[file] = [pos]
+        self._built_at = self.changes
+
+    def matching(self, file_filter: Callable[[str], bool]) -> Iterator[Entity]:
+        """Iterate over instances which could currently pass the filter.
+
+        Instances without a filename are always produced, so flags can report the error.
+        """
+        if self._built_at != self.changes:
+            self._rebuild()
+        snapshot = self._snapshot
+        order = self._order
+        files = self._files
+        matched: dict[str | None, bool] = {}
+
+        def check(file: str | None) -> bool:
+            """Check (and cache) if this raw filename passes the filter."""
+            try:
+                return matched[file]
+            except KeyError:
+                res = matched[file] = file is None or file_filter(file.casefold())
+                return res
+
+        pending = sorted(itertools.chain.from_iterable([
+            positions
+            for file, positions in self._by_file.items()
+            if check(file)
+        ]))
+        seen = self.changes
+        i = 0
+        while i < len(pending):
+            pos = pending[i]
+            i += 1
+            yield order[pos]
+            if self.changes != seen:
+                # Results might have renamed instances we have yet to visit.
+                seen = self.changes
+                tail_files = _inst_files(order[pos + 1:])
+                if tail_files != files[pos + 1:]:
+                    files[pos + 1:] = tail_files
+                    pending = [
+                        ind for ind in range(pos + 1, len(order))
+                        if check(files[ind])
+                    ]
+                    i = 0
+        # Then any instances added while we were iterating.
+        for inst in self.vmf.by_class['func_instance'] - snapshot:
+            if check(inst['file', None]):
+                yield inst
+
+
+def check_all(
+    vmf: VMF, coll: collisions.Collisions, info: MapInfo,
+    profiler: condition_profile.Profiler | None = None,
+) -> None:
+    """Check all conditions.
+
+    If a profiler is passed, the time taken by each condition, flag and result is recorded.
+    """
+    global PROFILER, CURRENT_SOURCE
     LOGGER.info('Checking Conditions...')
     LOGGER.info('-----------------------')
+    PROFILER = profiler
+    try:
+        _check_all(vmf, coll, info, profiler)
+    finally:
+        PROFILER = None
+        CURRENT_SOURCE = ''
+
+
+def _check_all(
+    vmf: VMF, coll: collisions.Collisions, info: MapInfo,
+    profiler: condition_profile.Profiler | None,
+) -> None:
+    """Implements check_all()."""
+    global CURRENT_SOURCE
     skipped_cond = 0
-    for condition in conditions:
+    inst_index = InstanceIndex(vmf)
+    for cond_ind, condition in enumerate(conditions):
+        cond_name = CURRENT_SOURCE = condition.source or f'<Condition {cond_ind}>'
         with srctools.logger.context(condition.source or ''):
-            for inst in vmf.by_class['func_instance']:
+            file_filter = condition.file_filter()
+            insts: Iterable[Entity]
+            if file_filter is None:
+                insts = vmf.by_class['func_instance']
+            else:
+                insts = inst_index.matching(file_filter)
+            for inst in insts:
                 try:
-                    condition.test(coll, info, inst)
+                    if profiler is not None:
+                        ran_results = profiler.call(
+                            'condition', cond_name, inst,
+                            condition.test, coll, info, inst,
+                        )
+                    else:
+                        ran_results = condition.test(coll, info, inst)
+                    if ran_results:
+                        inst_index.changes += 1
                 except NextInstance:
                     # NextInstance is raised to immediately stop running
                     # this condition, and skip to the next instance.
+                    inst_index.changes += 1
                     continue
                 except Unsatisfiable:
                     # Unsatisfiable indicates this condition's flags will
@@ -688,6 +880,7 @@ def check_all(vmf: VMF, coll: collisions.Collisions, info: MapInfo) -> None:
                 except EndCondition:
                     # EndCondition is raised to immediately stop running
                     # this condition, and skip to the next condition.
+                    inst_index.changes += 1
                     break
                 except Exception:
                     # Print the source of the condition if it fails...
@@ -729,8 +922,6 @@ def check_all(vmf: VMF, coll: collisions.Collisions, info: MapInfo) -> None:
     ])
     # '' is always present, which sorts first, conveniently adding a \n at the start.
     LOGGER.debug('All instances referenced:{}', '\n'.join(sorted(ALL_INST)))
-    # Dynamically added by lru_cache()
-    # noinspection PyUnresolvedReferences
     LOGGER.info('instanceLocs cache: {}', instanceLocs.resolve_cache_info())
     LOGGER.info('Style Vars: {}', dict(vbsp.settings['style_vars']))
     LOGGER.info('Global instances: {}', GLOBAL_INSTANCES)
@@ -744,12 +935,21 @@ def check_flag(
     """Determine the result for a condition flag.
 
     If can_skip is true, flags raising Unsatifiable will pass the exception through.
+    If the flag will be checked repeatedly, use compile_flag() instead.
+    """
+    return compile_flag(flag)(coll, info, inst, can_skip)
+
+
+def compile_flag(flag: Property) -> FlagPredicate:
+    """Resolve a condition flag into a function which can be called for each instance.
+
+    This does the lookup and handles inversion once, instead of each time the flag is checked.
+    The predicate is called with the same arguments as check_flag().
     """
     name = flag.name
     # If starting with '!', invert the result.
     if name[:1] == '!':
         desired_result = False
-        can_skip = False  # This doesn't work.
         name = name[1:]
     else:
         desired_result = True
@@ -762,18 +962,34 @@ def check_flag(
             raise ValueError(err_msg) from None
         else:
             LOGGER.warning(err_msg)
-            # Skip these conditions..
-            return False
 
-    try:
-        res = func(coll, info, inst, flag)
-    except Unsatisfiable:
-        if can_skip:
-            raise
+            def check_invalid(
+                coll: collisions.Collisions, info: MapInfo,
+                inst: Entity, can_skip: bool = False,
+            ) -> bool:
+                """Skip these conditions.."""
+                return False
+            return check_invalid
+
+    def check(
+        coll: collisions.Collisions, info: MapInfo,
+        inst: Entity, can_skip: bool = False,
+    ) -> bool:
+        """Check the flag against this instance."""
+        try:
+            if PROFILER is not None:
+                res = PROFILER.call('flag', name, inst, func, coll, info, inst, flag)
+            else:
+                res = func(coll, info, inst, flag)
+        except Unsatisfiable:
+            # Inverted flags can't skip.
+            if can_skip and desired_result:
+                raise
+            else:
+                return False
         else:
-            return False
-    else:
-        return res is desired_result
+            return res is desired_result
+    return check
 
 
 def import_conditions() -> None:
@@ -1103,8 +1319,8 @@ def resolve_offset(inst, value: str, scale: float=1, zoff: float=0) -> Vec:
     offset.z += zoff
 
     offset.localise(
-        Vec.from_str(inst['origin']),
-        Angle.from_str(inst['angles']),
+        instance_transform.origin(inst),
+        instance_transform.orient(inst),
     )
 
     return offset
@@ -1436,8 +1652,7 @@ def res_goo_debris(vmf: VMF, res: Property) -> object:
     goo_top_locs = {
         pos.as_tuple()
         for pos, block in
-        brushLoc.POS.items()
-        if block.is_goo and block.is_top
+        brushLoc.POS.iter_blocks(brushLoc.Block.GOO_TOP, brushLoc.Block.GOO_SINGLE)
     }
 
     if space == 0:
@@ -888,7 +888,7 @@ def res_set_tile(inst: Entity, res: Property) -> None:
                 # If forcing, make it black. Otherwise no need to change.
                 tile[u, v] = tiling.TileType.with_color_and_size(
                     size,
-                    tiling.Portalable.BLACK
+                    texturing.Portalable.BLACK
                 )
 
 
@@ -132,7 +132,7 @@ def res_make_catwalk(vmf: VMF, res: Property):
         * `single_wall`: A section connecting to an East wall.
     """
     LOGGER.info("Starting catwalk generator...")
-    marker = instanceLocs.resolve(res['markerInst'])
+    marker = instanceLocs.resolve_filter(res['markerInst'])
 
     instances = {
         name: instanceLocs.resolve_one(res[name, ''], error=True)
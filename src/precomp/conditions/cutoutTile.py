@@ -1,7 +1,8 @@
 """Generate random quarter tiles, like in Destroyed or Retro maps."""
+import itertools
 import random
 from collections import defaultdict, namedtuple
-from typing import Tuple, Set, Dict, List
+from typing import Iterable, Tuple, Set, Dict, List
 
 import srctools.logger
 import utils
@@ -80,7 +81,7 @@ def res_cutout_tile(vmf: srctools.VMF, res: Property):
             (This allows customising the surfaceprop.)
 
     """
-    marker_filenames = instanceLocs.resolve(res['markeritem'])
+    marker_filenames = instanceLocs.resolve_filter(res['markeritem'])
 
     # TODO: Reimplement cutout tiles.
     for inst in vmf.by_class['func_instance']:
@@ -361,6 +362,14 @@ def res_cutout_tile(vmf: srctools.VMF, res: Property):
             classname='func_detail',
         )
 
+        # Compute the noise for every tile on this level at once.
+        floor_noise = get_noise((
+            (Vec(x - 48 + 32 * tile_x, y - 48 + 32 * tile_y, z) // 32)
+            for x, y in xy_dict
+            for tile_x in range(4)
+            for tile_y in range(4)
+        ), noise)
+
         for x, y in xy_dict:
             convert_floor(
                 vmf,
@@ -371,7 +380,7 @@ def res_cutout_tile(vmf: srctools.VMF, res: Property):
                 sign_locs,
                 detail_ent,
                 noise_weight=weights[x, y],
-                noise_func=noise,
+                noise=floor_noise,
             )
 
     add_floor_sides(vmf, floor_edges)
@@ -379,18 +388,30 @@ def res_cutout_tile(vmf: srctools.VMF, res: Property):
     return conditions.RES_EXHAUSTED
 
 
-def get_noise(loc: Vec, noise_func: SimplexNoise):
-    """Generate a number between 0 and 1.
+def get_noise(locs: Iterable[Vec], noise_func: SimplexNoise) -> Dict[Vec_tuple, float]:
+    """Generate a number between 0 and 1 for each location.
 
     This is used to determine where tiles are placed.
     """
     # Average between the neighbouring locations, to smooth out changes.
-    return sum(
-        # + 1 / 2 fixes the value range (originally -1,1 -> 0,1)
-        (noise_func.noise3(loc.x + x, loc.y + y, loc.z) + 1) / 2
-        for x in (-1, 0, 1)
-        for y in (-1, 0, 1)
-    ) / 9
+    # Neighbouring locations share most of these, so compute each point once.
+    locs = {loc.as_tuple() for loc in locs}
+    points = list({
+        (x + off_x, y + off_y, z)
+        for x, y, z in locs
+        for off_x in (-1, 0, 1)
+        for off_y in (-1, 0, 1)
+    })
+    values = dict(zip(points, noise_func.noise3_array(points)))
+    return {
+        (x, y, z): sum(
+            # + 1 / 2 fixes the value range (originally -1,1 -> 0,1)
+            (values[x + off_x, y + off_y, z] + 1) / 2
+            for off_x in (-1, 0, 1)
+            for off_y in (-1, 0, 1)
+        ) / 9
+        for x, y, z in locs
+    }
 
 
 def convert_floor(
@@ -402,7 +423,7 @@ def convert_floor(
     signage_loc,
     detail,
     noise_weight,
-    noise_func: SimplexNoise,
+    noise: Dict[Vec_tuple, float],
 ):
     """Cut out tiles at the specified location."""
     # We pop it, so the face isn't detected by other logic - otherwise it'll
@@ -456,7 +477,7 @@ def convert_floor(
             signage_loc.remove(tile_loc.as_tuple())
         else:
             # Create a number between 0-100
-            rand = 100 * get_noise(tile_loc // 32, noise_func) + 10
+            rand = 100 * noise[(tile_loc // 32).as_tuple()] + 10
 
             # Adjust based on the noise_weight value, so boundries have more tiles
             rand *= 0.1 + 0.9 * (1 - noise_weight)
@@ -757,21 +778,27 @@ def make_displacement(
         # We can duplicate immutable strings fine..
         face.disp_data[key] = [val * grid_size] * grid_size
 
-    face.disp_data['alphas'] = [
-        ' '.join(
-            str(512 * get_noise(
-                Vec(
-                    bbox_min.x + x * x_vert,
-                    bbox_min.y + y * y_vert,
-                    bbox_min.z,
-                ) // max(x_vert, y_vert),
-                noise,
-            ))
+    alpha_locs = [
+        [
+            Vec(
+                bbox_min.x + x * x_vert,
+                bbox_min.y + y * y_vert,
+                bbox_min.z,
+            ) // max(x_vert, y_vert)
             for x in
             range(grid_size)
-        )
+        ]
         for y in range(grid_size)
     ]
+    alpha_noise = get_noise(itertools.chain.from_iterable(alpha_locs), noise)
+
+    face.disp_data['alphas'] = [
+        ' '.join(
+            str(512 * alpha_noise[loc.as_tuple()])
+            for loc in row
+        )
+        for row in alpha_locs
+    ]
 
 
 def add_floor_sides(vmf: VMF, locs):
@@ -6,7 +6,7 @@ from typing import Any, Union, Callable, Tuple, Dict
 import operator
 
 import srctools.logger
-from precomp.conditions import make_flag, make_result, make_result_setup
+from precomp.conditions import make_flag, make_flag_filter, make_result, make_result_setup
 from precomp import instance_traits, instanceLocs, conditions, options
 from srctools import Property, Angle, Vec, Entity, Output, VMF, conv_bool
 
@@ -17,7 +17,7 @@ COND_MOD_NAME = 'Instances'
 @make_flag('instance')
 def flag_file_equal(flag: Property) -> Callable[[Entity], bool]:
     """Evaluates True if the instance matches the given file."""
-    inst_list = set(instanceLocs.resolve(flag.value))
+    inst_list = instanceLocs.resolve_filter(flag.value)
 
     def check_inst(inst: Entity) -> bool:
         """Each time, check if no matching instances exist, so we can skip conditions."""
@@ -27,16 +27,29 @@ def flag_file_equal(flag: Property) -> Callable[[Entity], bool]:
     return check_inst
 
 
+@make_flag_filter('instance')
+def filter_file_equal(flag: Property) -> Callable[[str], bool]:
+    """The instance flag can only match the given files."""
+    return instanceLocs.resolve_filter(flag.value).__contains__
+
+
 @make_flag('instFlag', 'InstPart')
 def flag_file_cont(inst: Entity, flag: Property) -> bool:
     """Evaluates True if the instance contains the given portion."""
     return flag.value in inst['file'].casefold()
 
 
+@make_flag_filter('instFlag', 'InstPart')
+def filter_file_cont(flag: Property) -> Callable[[str], bool]:
+    """The instFlag flag can only match files containing the portion."""
+    part = flag.value
+    return lambda filename: part in filename
+
+
 @make_flag('hasInst')
 def flag_has_inst(flag: Property) -> Callable[[Entity], bool]:
     """Checks if the given instance is present anywhere in the map."""
-    flags = set(instanceLocs.resolve(flag.value))
+    flags = instanceLocs.resolve_filter(flag.value)
     return lambda inst: flags.isdisjoint(conditions.ALL_INST)
 
 
@@ -121,7 +134,7 @@ INSTVAR_COMP: dict[str, Callable[[Any, Any], Any]] = {
 
 
 @make_flag('instVar')
-def flag_instvar(inst: Entity, flag: Property) -> bool:
+def flag_instvar(flag: Property) -> Callable[[Entity], bool]:
     """Checks if the $replace value matches the given value.
 
     The flag value follows the form `A == B`, with any of the three permitted
@@ -133,15 +146,13 @@ def flag_instvar(inst: Entity, flag: Property) -> bool:
     values = flag.value.split(' ', 3)
     if len(values) == 3:
         val_a, op, val_b = values
-        op = inst.fixup.substitute(op)
-        comp_func = INSTVAR_COMP.get(op, operator.eq)
     elif len(values) == 2:
         val_a, val_b = values
         op = '=='
-        comp_func = operator.eq
     else:
         # For just a name.
-        return conv_bool(inst.fixup.substitute(values[0]))
+        name = values[0]
+        return lambda inst: conv_bool(inst.fixup.substitute(name))
     if '$' not in val_a and '$' not in val_b:
         # Handle pre-substitute behaviour, where val_a is always a var.
         LOGGER.warning(
@@ -151,21 +162,45 @@ def flag_instvar(inst: Entity, flag: Property) -> bool:
         )
         val_a = '$' + val_a
 
-    val_a = inst.fixup.substitute(val_a, default='')
-    val_b = inst.fixup.substitute(val_b, default='')
-    comp_a: str | float
-    comp_b: str | float
-    try:
+    # Anything without a variable only needs to be parsed once.
+    const_op = '$' not in op
+    const_func = INSTVAR_COMP.get(op, operator.eq)
+    const_b = '$' not in val_b
+    float_b: float | None = None
+    if const_b:
+        try:
+            float_b = float(val_b)
+        except ValueError:
+            pass
+
+    def check_instvar(inst: Entity) -> bool:
+        """Compare the values for this instance."""
+        if const_op:
+            comp_func = const_func
+            inst_op = op
+        else:
+            inst_op = inst.fixup.substitute(op)
+            comp_func = INSTVAR_COMP.get(inst_op, operator.eq)
+        inst_a = inst.fixup.substitute(val_a, default='')
+        inst_b = val_b if const_b else inst.fixup.substitute(val_b, default='')
+        comp_a: str | float
+        comp_b: str | float
         # Convert to floats if possible, otherwise handle both as strings.
         # That ensures we normalise different number formats (1 vs 1.0)
-        comp_a, comp_b = float(val_a), float(val_b)
-    except ValueError:
-        comp_a, comp_b = val_a, val_b
-    try:
-        return bool(comp_func(comp_a, comp_b))
-    except (TypeError, ValueError) as e:
-        LOGGER.warning('InstVar comparison failed: {} {} {}', val_a, op, val_b, exc_info=e)
-        return False
+        if const_b and float_b is None:
+            comp_a, comp_b = inst_a, inst_b
+        else:
+            try:
+                comp_a = float(inst_a)
+                comp_b = float(inst_b) if float_b is None else float_b
+            except ValueError:
+                comp_a, comp_b = inst_a, inst_b
+        try:
+            return bool(comp_func(comp_a, comp_b))
+        except (TypeError, ValueError) as e:
+            LOGGER.warning('InstVar comparison failed: {} {} {}', inst_a, inst_op, inst_b, exc_info=e)
+            return False
+    return check_instvar
 
 
 @make_flag('offsetDist')
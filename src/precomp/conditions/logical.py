@@ -1,6 +1,12 @@
-"""Logical flags used to combine others (AND, OR, NOT, etc)."""
+"""Logical flags used to combine others (AND, OR, NOT, etc).
+
+The sub-flags are compiled once when the flag is first used, instead of being
+looked up again for every instance.
+"""
+from typing import Callable
+
 from precomp.collisions import Collisions
-from precomp.conditions import make_flag, check_flag, MapInfo, Unsatisfiable
+from precomp.conditions import make_flag, compile_flag, MapInfo, Unsatisfiable
 from srctools import Entity, Property
 
 
@@ -8,62 +14,84 @@ COND_MOD_NAME = 'Logic'
 
 
 @make_flag('AND')
-def flag_and(inst: Entity, coll: Collisions, info: MapInfo, flag: Property):
+def flag_and(coll: Collisions, info: MapInfo, flag: Property) -> Callable[[Entity], bool]:
     """The AND group evaluates True if all sub-flags are True."""
-    for i, sub_flag in enumerate(flag):
-        if not check_flag(sub_flag, coll, info, inst, can_skip=i == 0):
-            return False
-    return True
+    checks = list(map(compile_flag, flag))
+
+    def check_and(inst: Entity) -> bool:
+        """Check the sub-flags."""
+        for i, check in enumerate(checks):
+            if not check(coll, info, inst, i == 0):
+                return False
+        return True
+    return check_and
 
 
 @make_flag('OR')
-def flag_or(inst: Entity, coll: Collisions, info: MapInfo, flag: Property):
+def flag_or(coll: Collisions, info: MapInfo, flag: Property) -> Callable[[Entity], bool]:
     """The OR group evaluates True if any sub-flags are True."""
-    satisfiable = False
-    for sub_flag in flag:
-        try:
-            res = check_flag(sub_flag, coll, info, inst, can_skip=True)
-        except Unsatisfiable:
-            pass
-        else:
-            satisfiable = True
-            if res:
-                return True
-    if not satisfiable:
-        # All raised, we raise too.
-        raise Unsatisfiable
-    return False
+    checks = list(map(compile_flag, flag))
+
+    def check_or(inst: Entity) -> bool:
+        """Check the sub-flags."""
+        satisfiable = False
+        for check in checks:
+            try:
+                res = check(coll, info, inst, True)
+            except Unsatisfiable:
+                pass
+            else:
+                satisfiable = True
+                if res:
+                    return True
+        if not satisfiable:
+            # All raised, we raise too.
+            raise Unsatisfiable
+        return False
+    return check_or
 
 
 @make_flag('NOT')
-def flag_not(inst: Entity, coll: Collisions, info: MapInfo, flag: Property) -> bool:
+def flag_not(coll: Collisions, info: MapInfo, flag: Property) -> Callable[[Entity], bool]:
     """The NOT group inverts the value of it's one sub-flag."""
     try:
         [subflag] = flag
     except ValueError:
-        return False
-    return not check_flag(subflag, coll, info, inst)
+        return lambda inst: False
+    check = compile_flag(subflag)
+    return lambda inst: not check(coll, info, inst, False)
 
 
 @make_flag('XOR')
-def flag_xor(inst: Entity, coll: Collisions, info: MapInfo, flag: Property) -> bool:
+def flag_xor(coll: Collisions, info: MapInfo, flag: Property) -> Callable[[Entity], bool]:
     """The XOR group returns True if the number of true sub-flags is odd."""
-    return sum([check_flag(sub_flag, coll, info, inst) for sub_flag in flag]) % 2 == 1
+    checks = list(map(compile_flag, flag))
+    return lambda inst: sum([check(coll, info, inst, False) for check in checks]) % 2 == 1
 
 
 @make_flag('NOR')
-def flag_nor(inst: Entity, coll: Collisions, info: MapInfo, flag: Property) -> bool:
+def flag_nor(coll: Collisions, info: MapInfo, flag: Property) -> Callable[[Entity], bool]:
     """The NOR group evaluates True if any sub-flags are False."""
-    for sub_flag in flag:
-        if check_flag(sub_flag, coll, info, inst):
-            return True
-    return False
+    checks = list(map(compile_flag, flag))
+
+    def check_nor(inst: Entity) -> bool:
+        """Check the sub-flags."""
+        for check in checks:
+            if check(coll, info, inst, False):
+                return True
+        return False
+    return check_nor
 
 
 @make_flag('NAND')
-def flag_nand(inst: Entity, coll: Collisions, info: MapInfo, flag: Property) -> bool:
+def flag_nand(coll: Collisions, info: MapInfo, flag: Property) -> Callable[[Entity], bool]:
     """The NAND group evaluates True if all sub-flags are False."""
-    for sub_flag in flag:
-        if not check_flag(sub_flag, coll, info, inst):
-            return True
-    return False
+    checks = list(map(compile_flag, flag))
+
+    def check_nand(inst: Entity) -> bool:
+        """Check the sub-flags."""
+        for check in checks:
+            if not check(coll, info, inst, False):
+                return True
+        return False
+    return check_nand
@@ -105,13 +105,13 @@ def res_piston_plat(vmf: VMF, res: Property) -> conditions.ResultCallable:
         init_script = 'SPAWN_UP <- {}'.format('true' if start_up else 'false')
 
         if snd_start and snd_stop:
-            packing.pack_files(vmf, snd_start, snd_stop, file_type='sound')
+            packing.pack_files(snd_start, snd_stop, file_type='sound')
             init_script += '; START_SND <- `{}`; STOP_SND <- `{}`'.format(snd_start, snd_stop)
         elif snd_start:
-            packing.pack_files(vmf, snd_start, file_type='sound')
+            packing.pack_files(snd_start, file_type='sound')
             init_script += '; START_SND <- `{}`'.format(snd_start)
         elif snd_stop:
-            packing.pack_files(vmf, snd_stop, file_type='sound')
+            packing.pack_files(snd_stop, file_type='sound')
             init_script += '; STOP_SND <- `{}`'.format(snd_stop)
 
         script_ent = vmf.create_ent(
@@ -8,7 +8,7 @@ from precomp.conditions import (
     make_flag, make_result, resolve_offset,
     DIRECTIONS,
 )
-from precomp import tiling, brushLoc
+from precomp import tiling, texturing, brushLoc, instance_transform
 from srctools import (
     Vec, Angle, Matrix, conv_float,
     NoKeyError, Property, Entity,
@@ -66,7 +66,7 @@ def flag_angles(flag: Property) -> Callable[[Entity], bool]:
 
     def check_orient(inst: Entity) -> bool:
         """Check the orientation against the instance."""
-        inst_normal = from_dir @ Angle.from_str(inst['angles'])
+        inst_normal = from_dir @ instance_transform.orient(inst)
 
         if normal == 'WALL':
             # Special case - it's not on the floor or ceiling
@@ -87,16 +87,16 @@ def brush_at_loc(
     This returns the average tiletype, if both colors were found,
     and a set of all types found.
     """
-    origin = Vec.from_str(inst['origin'])
-    angles = Angle.from_str(inst['angles'])
+    origin = instance_transform.origin(inst)
+    orient = instance_transform.orient(inst)
 
     # Allow using pos1 instead, to match pos2.
     pos = props.vec('pos1' if 'pos1' in props else 'pos')
     pos.z -= 64  # Subtract so origin is the floor-position
 
-    pos.localise(origin, angles)
+    pos.localise(origin, orient)
 
-    norm: Vec = round(props.vec('dir', 0, 0, 1) @ angles, 6)
+    norm: Vec = round(props.vec('dir', 0, 0, 1) @ orient, 6)
 
     if props.bool('gridpos') and norm is not None:
         for axis in 'xyz':
@@ -128,7 +128,7 @@ def brush_at_loc(
     if 'pos2' in props:
         pos2 = props.vec('pos2')
         pos2.z -= 64  # Subtract so origin is the floor-position
-        pos2.localise(origin, angles)
+        pos2.localise(origin, orient)
 
         if visgroup is not None and first_trace is not None:
             # Place a second for the bounding box, grouped with the first.
@@ -155,7 +155,7 @@ def brush_at_loc(
             if should_remove:
                 tiledef[u, v] = tiling.TileType.VOID
             if tile_type.is_tile:
-                if tile_type.color is tiling.Portalable.WHITE:
+                if tile_type.color is texturing.Portalable.WHITE:
                     white_count += 1
                 else:
                     black_count += 1
@@ -279,8 +279,8 @@ def flag_brush_at_loc(inst: Entity, flag: Property):
 
 def _fill_predicates() -> None:
     """Set TILE_PREDICATES."""
-    WHITE = tiling.Portalable.WHITE
-    BLACK = tiling.Portalable.BLACK
+    WHITE = texturing.Portalable.WHITE
+    BLACK = texturing.Portalable.BLACK
     TILE_4x4 = tiling.TileSize.TILE_4x4
     TILE_1x1 = tiling.TileSize.TILE_1x1
 
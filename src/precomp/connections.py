@@ -15,7 +15,7 @@ from precomp import (
     packing,
     conditions,
 )
-import editoritems
+import editoritems_db
 import consts
 import srctools.logger
 
@@ -422,7 +422,7 @@ def collapse_item(item: Item) -> None:
     item.inst.remove()
 
 
-def read_configs(all_items: Iterable[editoritems.Item]) -> None:
+def read_configs(all_items: Iterable[editoritems_db.ItemSummary]) -> None:
     """Load our connection configuration from the config files."""
     for item in all_items:
         if item.id.casefold() in ITEM_TYPES:
@@ -959,7 +959,7 @@ def add_timer_relay(item: Item, has_sounds: bool) -> None:
             f'self.EmitSound(`{timer_sound}`)'
             '}'
         )
-        packing.pack_files(item.inst.map, timer_sound, file_type='sound')
+        packing.pack_files(timer_sound, file_type='sound')
 
         for delay in range(item.timer):
             relay.add_out(Output(
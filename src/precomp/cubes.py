@@ -8,11 +8,11 @@ from weakref import WeakKeyDictionary
 from enum import Enum
 from typing import NamedTuple, MutableMapping
 
-from precomp import brushLoc, options, packing, conditions
+from precomp import brushLoc, instance_transform, options, packing, conditions
 from precomp.conditions.globals import precache_model
 from precomp.instanceLocs import resolve as resolve_inst
 from srctools.vmf import VMF, Entity, EntityFixup, Output
-from srctools import EmptyMapping, Property, Vec, Matrix, Angle
+from srctools import EmptyMapping, Property, Vec, Angle
 import srctools.logger
 
 
@@ -1157,7 +1157,7 @@ def link_cubes(vmf: VMF, info: conditions.MapInfo) -> None:
                 else:
                     dropper_timer[timer] = inst, inst_type
             # For setup later.
-            dropper_pos[Vec.from_str(inst['origin']).as_tuple()] = inst, inst_type
+            dropper_pos[instance_transform.origin(inst).as_tuple()] = inst, inst_type
             used_droppers[inst] = False
 
         # A cube.
@@ -1277,8 +1277,8 @@ def link_cubes(vmf: VMF, info: conditions.MapInfo) -> None:
 
         pairs: list[CubePair] = []
 
-        origin = Vec.from_str(inst['origin'])
-        orient = Matrix.from_angle(Angle.from_str(inst['angles']))
+        origin = instance_transform.origin(inst)
+        orient = instance_transform.orient(inst)
 
         with suppress(KeyError):
             pairs.append(CUBE_POS[(origin // 128).as_tuple()])
@@ -1550,7 +1550,7 @@ def make_cube(
                         inst.fixup[fixup_var] = pair.cube_fixup.substitute(fixup_src, allow_invert=True)
             else:
                 inst.fixup.update(pair.cube_fixup)
-        packing.pack_list(vmf, addon.pack)
+        packing.pack_list(addon.pack)
         if addon.vscript:
             vscripts.append(addon.vscript.strip())
 
@@ -1614,9 +1614,9 @@ def make_cube(
                 precache_model(vmf, cust_model, skinset)
 
             if isinstance(pack, list):
-                packing.pack_files(vmf, *pack)
+                packing.pack_files(*pack)
             elif isinstance(pack, str):
-                packing.pack_list(vmf, pack)
+                packing.pack_list(pack)
         else:
             # The model is unused, but set it so it looks nicer.
             ent['model'] = DEFAULT_MODELS[cube_type.type]
@@ -9,11 +9,11 @@ import attrs
 import srctools.logger
 import srctools.vmf
 from srctools.vmf import VMF, Solid, Entity, Side, Output
-from srctools import Property, NoKeyError, Vec, Matrix, Angle
+from srctools import Property, NoKeyError, Vec, Matrix
 
 import utils
 from precomp import (
-    instance_traits, tiling, instanceLocs,
+    instance_traits, tiling, instanceLocs, instance_transform,
     texturing,
     connections,
     options,
@@ -1031,13 +1031,13 @@ def parse_map(vmf: VMF, voice_attrs: dict[str, bool]) -> None:
             LOGGER.warning('Fizzler "{}" has non-base, non-model instance?', name)
             continue
 
-        origin = Vec.from_str(inst['origin'])
-        normal = Vec(z=1) @ Angle.from_str(inst['angles'])
+        origin = instance_transform.origin(inst)
+        normal = Vec(z=1) @ instance_transform.orient(inst)
         fizz_pos[origin.as_tuple(), normal.as_tuple()] = name
 
     for name, base_inst in fizz_bases.items():
         models = fizz_models[name]
-        orient = Matrix.from_angle(Angle.from_str(base_inst['angles']))
+        orient = instance_transform.orient(base_inst)
         up_axis = orient.left()
 
         # If upside-down, make it face upright.
@@ -1105,7 +1105,7 @@ def parse_map(vmf: VMF, voice_attrs: dict[str, bool]) -> None:
             brush.remove()
 
     # Check for fizzler output relays.
-    relay_file = instanceLocs.resolve('<ITEM_BEE2_FIZZLER_OUT_RELAY>', silent=True)
+    relay_file = instanceLocs.resolve_filter('<ITEM_BEE2_FIZZLER_OUT_RELAY>', silent=True)
     if not relay_file:
         # No relay item - deactivated most likely.
         return
@@ -1120,8 +1120,8 @@ def parse_map(vmf: VMF, voice_attrs: dict[str, bool]) -> None:
 
         try:
             fizz_name = fizz_pos[
-                Vec.from_str(inst['origin']).as_tuple(),
-                (Vec(0, 0, 1) @ Angle.from_str(inst['angles'])).as_tuple()
+                instance_transform.origin(inst).as_tuple(),
+                (Vec(0, 0, 1) @ instance_transform.orient(inst)).as_tuple()
             ]
             fizz_item = connections.ITEMS[fizz_name]
         except KeyError:
@@ -1184,7 +1184,7 @@ def generate_fizzlers(vmf: VMF) -> None:
             fizz.fizz_type.pack_lists
         )
         for pack in pack_list:
-            packing.pack_list(vmf, pack)
+            packing.pack_list(pack)
 
         if fizz_type.inst[FizzInst.BASE, is_static]:
             rng = rand.seed(b'fizz_base', fizz_name)
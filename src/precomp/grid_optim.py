@@ -2,8 +2,14 @@
 
 Given a grid of positions, produce a set of rectangular boxes that efficiently cover all
 set positions.
+
+The default greedy method is fast, but can produce more boxes than necessary.
+The exact method partitions each region into the minimum possible number of rectangles,
+using the matching-based method for rectilinear polygons: the maximum set of
+non-intersecting chords between concave corners is cut first, then each remaining
+concave corner is cut from.
 """
-from typing import Mapping, Tuple, Iterator, TypeVar, Union, Any
+from typing import Dict, List, Mapping, Set, Tuple, Iterator, TypeVar, Union, Any
 
 from plane import Plane
 
@@ -15,14 +21,19 @@ VOID: Any = object()  # Sentinel
 
 def optimise(
     grid: Union[Mapping[Tuple[int, int], T], Plane[T]],
+    exact: bool = False,
 ) -> Iterator[Tuple[int, int, int, int, T]]:
     """Given a grid, produce an efficient set of bounding boxes for each value.
 
     The grid should be a (x, y): T dict.
     This yields (min_x, min_y, max_x, max_y, T) tuples, where this region has the same value.
     The values are compared by identity.
+    If exact is set, the minimum number of boxes is produced, at the cost of more computation.
     """
     full_grid: Plane[T] = Plane(grid, default=VOID)
+    if exact:
+        yield from _optimise_exact(full_grid)
+        return
     x_min, y_min = full_grid.mins
     x_max, y_max = full_grid.maxes
     x_max += 1
@@ -80,3 +91,193 @@ def _do_cell(
             del grid[x, y]
 
     return min_x, min_y, max_x - 1, max_y - 1, value
+
+
+# The cells around a grid point (x, y), in the order SW, SE, NW, NE.
+# Cell (x, y) covers the square from point (x, y) to (x+1, y+1).
+_CORNER_CELLS = [(-1, -1), (0, -1), (-1, 0), (0, 0)]
+# For a concave corner, the missing cell -> the directions chords extend in.
+# These point away from the missing cell, along the two interior edges.
+_CONCAVE_DIRS = [
+    ((1, 0), (0, 1)),  # SW missing, extend east and north.
+    ((-1, 0), (0, 1)),  # SE missing, extend west and north.
+    ((1, 0), (0, -1)),  # NW missing, extend east and south.
+    ((-1, 0), (0, -1)),  # NE missing, extend west and south.
+]
+# A chord or cut, as the start point, direction and length.
+Chord = Tuple[int, int, int, int, int]
+
+
+def _optimise_exact(grid: Plane[T]) -> Iterator[Tuple[int, int, int, int, T]]:
+    """Produce the minimum number of rectangles for each value."""
+    by_value: Dict[int, Tuple[T, Set[Tuple[int, int]]]] = {}
+    for pos, value in grid.items():
+        if value is VOID:
+            continue
+        try:
+            by_value[id(value)][1].add(pos)
+        except KeyError:
+            by_value[id(value)] = (value, {pos})
+    rects: List[Tuple[int, int, int, int, T]] = []
+    for value, cells in by_value.values():
+        for min_x, min_y, max_x, max_y in _partition(cells):
+            rects.append((min_x, min_y, max_x, max_y, value))
+    # Produce in the same order the greedy method does.
+    rects.sort(key=lambda rect: (rect[0], rect[1]))
+    return iter(rects)
+
+
+def _edge_key(x: int, y: int, dx: int, dy: int) -> Tuple[int, int, bool]:
+    """Produce a key for the unit edge leaving point (x, y) in the given direction."""
+    if dx:
+        return min(x, x + dx), y, True
+    else:
+        return x, min(y, y + dy), False
+
+
+def _partition(cells: Set[Tuple[int, int]]) -> List[Tuple[int, int, int, int]]:
+    """Split a set of cells into the minimum number of rectangles."""
+    def interior(x: int, y: int, dx: int, dy: int) -> bool:
+        """Check if the unit edge leaving this point has cells on both sides."""
+        if dx:
+            ex = min(x, x + dx)
+            return (ex, y - 1) in cells and (ex, y) in cells
+        else:
+            ey = min(y, y + dy)
+            return (x - 1, ey) in cells and (x, ey) in cells
+
+    # Find concave corners - points with exactly three cells around them.
+    concave: Dict[Tuple[int, int], Tuple[Tuple[int, int], Tuple[int, int]]] = {}
+    points = {
+        (x + px, y + py)
+        for x, y in cells
+        for px in (0, 1) for py in (0, 1)
+    }
+    for x, y in points:
+        missing = [
+            i for i, (ox, oy) in enumerate(_CORNER_CELLS)
+            if (x + ox, y + oy) not in cells
+        ]
+        if len(missing) == 1:
+            concave[x, y] = _CONCAVE_DIRS[missing[0]]
+
+    if not concave:
+        return _rectangles(cells, set())
+
+    # Find chords - interior lines directly joining two concave corners.
+    horiz: List[Chord] = []
+    vert: List[Chord] = []
+    for (x, y), directions in concave.items():
+        for dx, dy in directions:
+            if dx + dy < 0:
+                continue  # Find each chord only once, from the lower end.
+            length = 0
+            px, py = x, y
+            while interior(px, py, dx, dy):
+                px += dx
+                py += dy
+                length += 1
+            if length and (px, py) in concave:
+                (horiz if dx else vert).append((x, y, dx, dy, length))
+
+    # Chords which cross or share an endpoint can't both be used.
+    # The maximum set which don't is the complement of a minimum vertex cover,
+    # found from the maximum matching of this bipartite graph.
+    crossing: List[List[int]] = [
+        [
+            j for j, (vx, vy, _, _, v_len) in enumerate(vert)
+            if hx <= vx <= hx + h_len and vy <= hy <= vy + v_len
+        ]
+        for hx, hy, _, _, h_len in horiz
+    ]
+    match_vert: List[int] = [-1] * len(vert)
+
+    def augment(h: int, visited: Set[int]) -> bool:
+        """Try to find an augmenting path from this horizontal chord."""
+        for v in crossing[h]:
+            if v not in visited:
+                visited.add(v)
+                if match_vert[v] == -1 or augment(match_vert[v], visited):
+                    match_vert[v] = h
+                    return True
+        return False
+
+    for h in range(len(horiz)):
+        augment(h, set())
+
+    # König's theorem - from unmatched horizontal chords, follow alternating paths.
+    matched_horiz = {h for h in match_vert if h != -1}
+    reached_horiz = set(range(len(horiz))) - matched_horiz
+    reached_vert: Set[int] = set()
+    todo = list(reached_horiz)
+    while todo:
+        h = todo.pop()
+        for v in crossing[h]:
+            if v not in reached_vert:
+                reached_vert.add(v)
+                h2 = match_vert[v]
+                if h2 != -1 and h2 not in reached_horiz:
+                    reached_horiz.add(h2)
+                    todo.append(h2)
+
+    cuts: Set[Tuple[int, int, bool]] = set()
+    chords = [horiz[h] for h in sorted(reached_horiz)]
+    chords += [vert[v] for v in range(len(vert)) if v not in reached_vert]
+    for x, y, dx, dy, length in chords:
+        for i in range(length):
+            cuts.add(_edge_key(x + i * dx, y + i * dy, dx, dy))
+
+    # Then every concave corner not already split needs a cut from it.
+    for (x, y), directions in sorted(concave.items()):
+        if any(_edge_key(x, y, dx, dy) in cuts for dx, dy in directions):
+            continue
+        dx, dy = directions[0]
+        px, py = x, y
+        while interior(px, py, dx, dy):
+            key = _edge_key(px, py, dx, dy)
+            if key in cuts:
+                break
+            cuts.add(key)
+            px += dx
+            py += dy
+            # Stop when we hit a perpendicular cut.
+            if (
+                _edge_key(px, py, dy, dx) in cuts
+                or _edge_key(px, py, -dy, -dx) in cuts
+            ):
+                break
+
+    return _rectangles(cells, cuts)
+
+
+def _rectangles(
+    cells: Set[Tuple[int, int]],
+    cuts: Set[Tuple[int, int, bool]],
+) -> List[Tuple[int, int, int, int]]:
+    """Flood-fill the cells not separated by cuts, producing the rectangles."""
+    rects: List[Tuple[int, int, int, int]] = []
+    remaining = set(cells)
+    while remaining:
+        start = remaining.pop()
+        todo = [start]
+        min_x, min_y = max_x, max_y = start
+        count = 1
+        while todo:
+            x, y = todo.pop()
+            for nx, ny, key in [
+                (x - 1, y, (x, y, False)),
+                (x + 1, y, (x + 1, y, False)),
+                (x, y - 1, (x, y, True)),
+                (x, y + 1, (x, y + 1, True)),
+            ]:
+                if (nx, ny) in remaining and key not in cuts:
+                    remaining.remove((nx, ny))
+                    todo.append((nx, ny))
+                    count += 1
+                    min_x = min(min_x, nx)
+                    min_y = min(min_y, ny)
+                    max_x = max(max_x, nx)
+                    max_y = max(max_y, ny)
+        assert (max_x - min_x + 1) * (max_y - min_y + 1) == count, (min_x, min_y, max_x, max_y)
+        rects.append((min_x, min_y, max_x, max_y))
+    return rects
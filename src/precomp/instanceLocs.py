@@ -6,14 +6,13 @@ multiple styles.
 import logging
 import re
 from collections import defaultdict
-from functools import lru_cache
 
-import editoritems
+import editoritems_db
 import srctools.logger
 
 from typing import (
-    Callable, Optional, Union,
-    List, Dict, Tuple, TypeVar, Iterable,
+    Optional, Union,
+    List, Dict, Tuple, TypeVar, Iterable, FrozenSet,
 )
 import corridor
 
@@ -127,6 +126,12 @@ SPECIAL_INST: Dict[str, str] = {
 # The resolved versions of SPECIAL_INST
 INST_SPECIAL: Dict[str, List[str]] = {}
 
+# Every selector resolved so far -> the instances in order, and as a set.
+# This is rebuilt whenever the item definitions change.
+_SELECTOR_INDEX: Dict[str, Tuple[Tuple[str, ...], FrozenSet[str]]] = {}
+# The reverse - filename -> all selectors in the index which match it.
+_FILE_SELECTORS: Dict[str, FrozenSet[str]] = {}
+
 # Categories and prefixes for the corridors, so can update the values after
 CORR_SPECIALS = [
     (corridor.GameMode.SP, corridor.Direction.ENTRY, 'spentrycorr'),
@@ -217,37 +222,32 @@ SPECIAL_INST_FOLDED = {
 }
 
 
-def load_conf(items: Iterable[editoritems.Item]) -> None:
+def load_conf(items: Iterable[editoritems_db.ItemSummary]) -> None:
     """Read the config and build our dictionaries."""
-    cust_instances: dict[str, str]
-    EMPTY = editoritems.FSPath()
     for item in items:
         # Extra definitions: key -> filename.
         # Make sure to do this first, so numbered instances are set in
         # ITEM_FOR_FILE.
         if item.cust_instances:
-            CUST_INST_FILES[item.id.casefold()] = cust_instances = {}
-            for name, file in item.cust_instances.items():
-                cust_instances[name] = folded = str(file).casefold()
+            CUST_INST_FILES[item.id.casefold()] = dict(item.cust_instances)
+            for name, folded in item.cust_instances.items():
                 ITEM_FOR_FILE[folded] = (item.id, name)
 
         # Normal instances: index -> filename
-        INSTANCE_FILES[item.id.casefold()] = [
-            '' if inst.inst == EMPTY else str(inst.inst).casefold()
-            for inst in item.instances
-        ]
-        for ind, inst in enumerate(item.instances):
-            fname = str(inst.inst).casefold()
+        INSTANCE_FILES[item.id.casefold()] = list(item.instances)
+        for ind, fname in enumerate(item.instances):
             # Not real instances.
-            if fname != '.' and not fname.startswith('instances/bee2_corridor/'):
+            if fname and not fname.startswith('instances/bee2_corridor/'):
                 ITEM_FOR_FILE[fname] = (item.id, ind)
 
+    _clear_index()
     INST_SPECIAL.clear()
     INST_SPECIAL.update({
         key.casefold(): resolve(val_string, silent=True)
         for key, val_string in
         SPECIAL_INST.items()
     })
+    _build_index()
 
 
 def set_chosen_corridor(
@@ -276,8 +276,56 @@ def set_chosen_corridor(
             for i in range(1, count + 1):
                 INST_SPECIAL[f'{prefix}{i}'] = []
             INSTANCE_FILES[item_id.casefold()][:count] = [''] * count
-    # Clear since these were evaluated before.
-    _resolve.cache_clear()
+    # Rebuild since these were evaluated before.
+    _clear_index()
+    _build_index()
+
+
+def _clear_index() -> None:
+    """Discard all resolved selectors."""
+    _SELECTOR_INDEX.clear()
+    _FILE_SELECTORS.clear()
+
+
+def _build_index() -> None:
+    """Resolve all the selectors which can be produced from the item definitions.
+
+    This lets selectors_for() find the common selectors for a file, even if
+    they haven't been used yet.
+    """
+    for item_id, files in INSTANCE_FILES.items():
+        _lookup(f'<{item_id}>', True)
+        for ind in range(len(files)):
+            _lookup(f'<{item_id}:{ind}>', True)
+    for item_id, cust_instances in CUST_INST_FILES.items():
+        for name in cust_instances:
+            if ',' in name or '>' in name:
+                continue  # Can't be selected individually.
+            _lookup(f'<{item_id}:bee2_{name}>', True)
+    for name in INST_SPECIAL:
+        _lookup(f'[{name}]', True)
+
+
+def _lookup(path: str, silent: bool) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+    """Fetch a selector from the index, resolving and adding it if required."""
+    try:
+        return _SELECTOR_INDEX[path]
+    except KeyError:
+        pass
+    if silent:
+        # Ignore messages < ERROR (warning and info)
+        log_level = LOGGER.level
+        LOGGER.setLevel(logging.ERROR)
+        try:
+            files = _resolve(path)
+        finally:
+            LOGGER.setLevel(log_level)
+    else:
+        files = _resolve(path)
+    _SELECTOR_INDEX[path] = result = (tuple(files), frozenset(files))
+    for file in result[1]:
+        _FILE_SELECTORS[file] = _FILE_SELECTORS.get(file, frozenset()) | {path}
+    return result
 
 
 def resolve(path: str, silent: bool=False) -> List[str]:
@@ -302,17 +350,26 @@ def resolve(path: str, silent: bool=False) -> List[str]:
 
     If silent is True, no error messages will be output (for use with hardcoded
     names).
+    If the order is not important, use resolve_filter() instead.
     """
-    if silent:
-        # Ignore messages < ERROR (warning and info)
-        log_level = LOGGER.level
-        LOGGER.setLevel(logging.ERROR)
-        try:
-            return _resolve(path)
-        finally:
-            LOGGER.setLevel(log_level)
-    else:
-        return _resolve(path)
+    return list(_lookup(path, silent)[0])
+
+
+def resolve_filter(path: str, silent: bool=False) -> FrozenSet[str]:
+    """Resolve an instance path into the set of filenames it refers to.
+
+    This is the same as resolve(), but the result is shared so doesn't need to
+    be copied for each call.
+    """
+    return _lookup(path, silent)[1]
+
+
+def selectors_for(filename: str) -> FrozenSet[str]:
+    """Return all the selectors which have been resolved that match this filename.
+
+    This includes the <ITEM_ID>, <ITEM_ID:index> and [special] forms for all items.
+    """
+    return _FILE_SELECTORS.get(filename.casefold(), frozenset())
 
 Default_T = TypeVar('Default_T')
 
@@ -336,12 +393,8 @@ def resolve_one(path, default: Union[str, Default_T]='', error=False) -> Union[s
     return instances[0]
 
 
-# Cache the return values, since they're constant.
-@lru_cache(maxsize=100)
 def _resolve(path: str) -> List[str]:
-    """Use a secondary function to allow caching values, while ignoring the
-    'silent' parameter.
-    """
+    """Compute the value for a selector, which _lookup() then stores in the index."""
     groups = _RE_DEFS.findall(path)
     if groups:
         out = []
@@ -443,8 +496,9 @@ def get_subitems(comma_list: str, item_inst: List[str], item_id: str) -> List[st
     return inst_out
 
 
-# Make this publicly accessible.
-resolve_cache_info: Callable[[], object] = _resolve.cache_info
+def resolve_cache_info() -> str:
+    """Describe the size of the selector index, for logging."""
+    return f'{len(_SELECTOR_INDEX)} selectors, {len(_FILE_SELECTORS)} files'
 
 
 def get_cust_inst(item_id: str, inst: str) -> Optional[str]:
@@ -1,5 +1,5 @@
 """Adds various traits to instances, based on item classes."""
-from typing import List, MutableMapping, Optional, Dict, Set, Union
+from typing import List, Mapping, MutableMapping, Optional, Dict, Set, Tuple, Union
 from weakref import WeakKeyDictionary
 
 import attrs
@@ -184,8 +184,10 @@ def get_item_id(inst: Entity) -> Optional[str]:
         return None
 
 
-def set_traits(vmf: VMF, id_to_item: Dict[str, Item], coll: Collisions) -> None:
+def set_traits(vmf: VMF, id_to_item: Mapping[str, Item], coll: Collisions) -> None:
     """Scan through the map, apply traits to instances, and set initial collisions."""
+    # Collisions are added all at once, so the tree can be bulk-loaded.
+    coll_insts: List[Tuple[Item, Entity]] = []
     for inst in vmf.by_class['func_instance']:
         inst_file = inst['file'].casefold()
         if not inst_file:
@@ -235,4 +237,5 @@ def set_traits(vmf: VMF, id_to_item: Dict[str, Item], coll: Collisions) -> None:
             info.traits.remove(SKIP_COLL)
             # Also skip if no name is set.
         elif item is not None and inst['targetname'] != '':
-            coll.add_item_coll(item, inst)
+            coll_insts.append((item, inst))
+    coll.add_item_colls(coll_insts)
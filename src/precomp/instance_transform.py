@@ -0,0 +1,76 @@
+"""Caches the parsed position and orientation of instances.
+
+Most passes need the origin and angles of the same instances, so parse them
+only once. Each entry remembers the keyvalues it was parsed from, so moving or
+rotating an instance automatically invalidates it.
+"""
+from __future__ import annotations
+from weakref import WeakKeyDictionary
+
+import attrs
+from srctools import Angle, Entity, Matrix, Vec
+
+
+__all__ = ['origin', 'angles', 'orient', 'grid_pos']
+
+
+@attrs.frozen
+class _Transform:
+    """The parsed values, these must not be modified."""
+    origin_str: str
+    angles_str: str
+    origin: Vec
+    angles: Angle
+    orient: Matrix
+    grid_pos: Vec
+
+
+_CACHE: WeakKeyDictionary[Entity, _Transform] = WeakKeyDictionary()
+
+
+def _lookup(inst: Entity) -> _Transform:
+    """Fetch the transform for this instance, parsing if required."""
+    # Skip the case-insensitive search in Entity.__getitem__ if possible.
+    keys = inst.keys
+    origin_str = keys.get('origin')
+    if origin_str is None:
+        origin_str = inst['origin']
+    angles_str = keys.get('angles')
+    if angles_str is None:
+        angles_str = inst['angles']
+    try:
+        trans = _CACHE[inst]
+    except KeyError:
+        pass
+    else:
+        if trans.origin_str == origin_str and trans.angles_str == angles_str:
+            return trans
+    pos = Vec.from_str(origin_str)
+    ang = Angle.from_str(angles_str)
+    _CACHE[inst] = trans = _Transform(
+        origin_str, angles_str,
+        pos, ang, Matrix.from_angle(ang),
+        pos // 128,
+    )
+    return trans
+
+
+def origin(inst: Entity) -> Vec:
+    """Return the origin of an instance."""
+    return _lookup(inst).origin.copy()
+
+
+def angles(inst: Entity) -> Angle:
+    """Return the angles of an instance."""
+    return _lookup(inst).angles.copy()
+
+
+def orient(inst: Entity) -> Matrix:
+    """Return the orientation of an instance, as a matrix."""
+    return _lookup(inst).orient.copy()
+
+
+def grid_pos(inst: Entity) -> Vec:
+    """Return the position of the voxel containing the instance's origin."""
+    return _lookup(inst).grid_pos.copy()
+
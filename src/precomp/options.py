@@ -323,6 +323,12 @@ DEFAULTS = [
 
         This makes EmbedFace textures contiguous, for irregular textures.
         """),
+    Opt('tile_exact_optimise', False,
+        """Merge tiles into the minimum possible number of brushes.
+
+        This takes longer than the default method, but reduces the brush
+        count for complex shapes. Textures and bevels are unaffected.
+        """),
 
     Opt('fizz_border_vertical', False,
         """For fizzler borders, indicate that the texture is vertical.
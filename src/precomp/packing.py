@@ -1,6 +1,12 @@
-"""Conditions related to packing."""
+"""Conditions related to packing.
+
+Files to pack are collected in a registry while the map is compiled, then
+written out as a few comp_pack entities just before the map is saved.
+"""
+from __future__ import annotations
 from typing import Dict, Set
 
+import attrs
 import srctools.logger
 from precomp import options, conditions
 from srctools import VMF, Property, Vec
@@ -8,9 +14,21 @@ from srctools import VMF, Property, Vec
 
 LOGGER = srctools.logger.get_logger(__name__)
 COND_MOD_NAME = 'Packing'
+# The maximum number of files to put in each comp_pack, to keep entities a sane size.
+FILES_PER_ENT = 64
+
+
+@attrs.define(eq=False)
+class PackRequest:
+    """A file which is to be packed."""
+    filename: str
+    file_type: str
+    # The conditions which requested this file.
+    sources: set[str] = attrs.Factory(set)
+
 
-# Filenames we've packed, so we can avoid adding duplicate ents.
-_PACKED_FILES = set()  # type: Set[str]
+# Folded filenames we've packed -> the request, so we can avoid adding duplicates.
+_PACKED_FILES: dict[str, PackRequest] = {}
 
 PACKLISTS = {}  # type: Dict[str, Set[str]]
 
@@ -22,7 +40,6 @@ def parse_packlists(props: Property) -> None:
 
 
 def pack_list(
-    vmf: VMF,
     packlist_name: str,
     file_type: str='generic',
 ) -> None:
@@ -34,40 +51,62 @@ def pack_list(
     except KeyError:
         LOGGER.warning('Packlist "{}" does not exist!', packlist_name)
     else:
-        pack_files(vmf, *packlist, file_type=file_type)
+        pack_files(*packlist, file_type=file_type)
 
 
 def pack_files(
-    vmf: VMF,
     *files: str,
     file_type: str='generic',
 ) -> None:
-    """Add the given files to the packing list."""
-
-    packlist = set(files) - _PACKED_FILES
-
-    if not packlist:
+    """Add the given files to the packing list.
+
+    The entities are only produced once write_ents() is called.
+    """
+    source = conditions.CURRENT_SOURCE or '<compiler>'
+    for file in files:
+        try:
+            req = _PACKED_FILES[file.casefold()]
+        except KeyError:
+            req = _PACKED_FILES[file.casefold()] = PackRequest(file, file_type)
+        else:
+            # A specific type is more useful to the packer than generic.
+            if req.file_type == 'generic':
+                req.file_type = file_type
+        req.sources.add(source)
+
+
+def write_ents(vmf: VMF) -> None:
+    """Add comp_pack entities for all the files requested."""
+    by_type: dict[str, list[PackRequest]] = {}
+    for req in _PACKED_FILES.values():
+        by_type.setdefault(req.file_type, []).append(req)
+        LOGGER.debug('Packing "{}" ({}), for {}', req.filename, req.file_type, sorted(req.sources))
+    if not by_type:
         return
 
-    ent = vmf.create_ent(
-        classname='comp_pack',
-        origin=options.get(Vec, 'global_ents_loc'),
-    )
-
-    for i, file in enumerate(packlist, start=1):
-        ent[file_type + str(i)] = file
+    origin = options.get(Vec, 'global_ents_loc')
+    ent = None
+    count = 0
+    for file_type, requests in sorted(by_type.items()):
+        for req in requests:
+            if ent is None or count == FILES_PER_ENT:
+                ent = vmf.create_ent(classname='comp_pack', origin=origin)
+                count = 0
+            count += 1
+            ent[f'{file_type}{count}'] = req.filename
+    LOGGER.info('Packing {} files.', len(_PACKED_FILES))
 
 
 @conditions.make_result('Pack')
-def res_packlist(vmf: VMF, res: Property):
+def res_packlist(res: Property):
     """Pack files from a packing list."""
-    pack_list(vmf, res.value)
+    pack_list(res.value)
     return conditions.RES_EXHAUSTED
 
 
 @conditions.make_result('PackFile')
-def pack_file_cond(vmf: VMF, res: Property):
+def pack_file_cond(res: Property):
     """Adda single file to the map."""
-    pack_files(vmf, res.value)
+    pack_files(res.value)
     return conditions.RES_EXHAUSTED
 
@@ -4,7 +4,7 @@ from random import Random
 from struct import Struct
 import hashlib
 
-from precomp import instanceLocs
+from precomp import instanceLocs, instance_transform
 from srctools import VMF, Vec, Angle, Entity, logger, Matrix
 
 
@@ -64,7 +64,7 @@ def init_seed(vmf: VMF) -> str:
     light_names = []
     for inst in vmf.by_class['func_instance']:
         if inst['file'].casefold() == amb_light:
-            pos = Vec.from_str(inst['origin']) / 64
+            pos = instance_transform.origin(inst) / 64
             light_names.append(THREE_INTS.pack(round(pos.x), round(pos.y), round(pos.z)))
     light_names.sort()  # Ensure consistent order!
     for name in light_names:
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import itertools
 import os
+import pickle
 from collections import defaultdict
 from typing import Callable, Union, Optional, Tuple, Mapping, Iterable, Iterator
 
@@ -16,12 +17,14 @@ from srctools.filesys import FileSystem, ZipFileSystem, RawFileSystem, VPKFileSy
 from srctools.math import Vec, Angle, Matrix, to_matrix
 from srctools.vmf import EntityFixup, Entity, EntityGroup, Solid, Side, VMF, UVAxis, VisGroup
 from srctools.dmx import Element as DMElement
+from atomicwrites import atomic_write
 import srctools.logger
 
 from .texturing import Portalable, GenCat, TileSize
 from .tiling import TileType
 from . import tiling, texturing, options, rand, collisions
 import consts
+import utils
 
 
 LOGGER = srctools.logger.get_logger(__name__, alias='template')
@@ -33,6 +36,15 @@ LOGGER = srctools.logger.get_logger(__name__, alias='template')
 _TEMPLATES: dict[str, Union[UnparsedTemplate, Template]] = {}
 _SCALE_TEMP: dict[tuple[str, frozenset[str]], ScalingTemplate] = {}
 
+# Previously parsed templates, saved between compiles. This maps template IDs
+# to the location they were parsed from, and the pickled Template.
+# The pickles are only loaded when the template is actually used.
+_CACHE: dict[str, tuple[CacheKey, bytes]] = {}
+# Set if a template was parsed, so the cache needs to be rewritten.
+_CACHE_CHANGED = False
+# Changing the Template classes will break the cache, so include the version.
+CACHE_VERSION = (1, utils.BEE_VERSION)
+
 
 class InvalidTemplateName(LookupError):
     """Raised if a template ID is invalid."""
@@ -66,12 +78,24 @@ class AfterPickMode(Enum):
     NODRAW = '2'  # Convert to nodraw.
 
 
+# Package path, file path and modification time of a template.
+CacheKey = Tuple[str, str, int]
+
+
 @attrs.define
 class UnparsedTemplate:
     """Holds the location of a template that hasn't been parsed yet."""
     id: str
     pak_path: str
     path: str
+    mtime: int = 0  # The modification time, or 0 if unknown.
+
+    @property
+    def cache_key(self) -> Optional[CacheKey]:
+        """The key used to store this in the cache, if it can be cached."""
+        if self.mtime:
+            return self.pak_path, self.path, self.mtime
+        return None
 
 
 @attrs.define
@@ -440,7 +464,7 @@ def load_templates(path: str) -> None:
     """Load in the template file, used for import_template()."""
     with open(path, 'rb') as f:
         dmx, fmt_name, fmt_ver = DMElement.parse(f, unicode=True)
-    if fmt_name != 'bee_templates' or fmt_ver not in [1]:
+    if fmt_name != 'bee_templates' or fmt_ver not in [1, 2]:
         raise ValueError(f'Invalid template file format "{fmt_name}" v{fmt_ver}')
     for template in dmx['temp'].iter_elem():
         if template is None:
@@ -449,9 +473,48 @@ def load_templates(path: str) -> None:
             template.name.upper(),
             template['package'].val_str,
             template['path'].val_str,
+            template['mtime'].val_int if 'mtime' in template else 0,
         )
 
 
+def load_cache(path: str) -> None:
+    """Load previously parsed templates, saved by save_cache()."""
+    try:
+        with open(path, 'rb') as f:
+            version, cache = pickle.load(f)
+    except FileNotFoundError:
+        return
+    except Exception:
+        LOGGER.warning('Could not read template cache:', exc_info=True)
+        return
+    if version != CACHE_VERSION:
+        LOGGER.info('Template cache is from a different version, discarding.')
+        return
+    _CACHE.update(cache)
+    LOGGER.info('{} templates in cache', len(_CACHE))
+
+
+def save_cache(path: str) -> None:
+    """Write out templates parsed in this compile, so future compiles can skip parsing.
+
+    Templates which no longer exist are discarded. Failing to write the cache
+    only logs a warning.
+    """
+    if not _CACHE_CHANGED:
+        return
+    cache = {
+        temp_id: data
+        for temp_id, data in _CACHE.items()
+        if temp_id in _TEMPLATES
+    }
+    try:
+        with atomic_write(path, mode='wb', overwrite=True) as f:
+            pickle.dump((CACHE_VERSION, cache), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # The cache is optional, don't fail the compile.
+        LOGGER.warning('Could not write template cache:', exc_info=True)
+
+
 def _parse_template(loc: UnparsedTemplate) -> Template:
     """Parse a template VMF."""
     filesys: FileSystem
@@ -651,6 +714,31 @@ def _parse_template(loc: UnparsedTemplate) -> Template:
     )
 
 
+def _load_template(loc: UnparsedTemplate) -> Template:
+    """Retrieve a template from the cache, or parse it if not present."""
+    global _CACHE_CHANGED
+    key = loc.cache_key
+    temp_id = loc.id.casefold()
+    try:
+        cache_key, data = _CACHE[temp_id]
+    except KeyError:
+        pass
+    else:
+        if key is not None and cache_key == key:
+            try:
+                return pickle.loads(data)
+            except Exception:
+                LOGGER.warning('Could not load cached template {}:', loc.id, exc_info=True)
+
+    LOGGER.debug('Parsing template {}', loc.id)
+    temp = _parse_template(loc)
+    if key is not None:
+        # Pickle immediately, in case the template is modified later.
+        _CACHE[temp_id] = key, pickle.dumps(temp, protocol=pickle.HIGHEST_PROTOCOL)
+        _CACHE_CHANGED = True
+    return temp
+
+
 def get_template(temp_name: str) -> Template:
     """Get the data associated with a given template."""
     try:
@@ -659,8 +747,7 @@ def get_template(temp_name: str) -> Template:
         raise InvalidTemplateName(temp_name) from None
 
     if isinstance(temp, UnparsedTemplate):
-        LOGGER.debug('Parsing template {}', temp_name.upper())
-        temp = _TEMPLATES[temp_name.casefold()] = _parse_template(temp)
+        temp = _TEMPLATES[temp_name.casefold()] = _load_template(temp)
         if temp.debug:
             LOGGER.info('Template {} in debug mode.', temp_name.upper())
 
@@ -1068,11 +1155,7 @@ def retexture_template(
             except KeyError:
                 pattern = pattern_cache[tiledef] = {}
                 tiledef.gen_multitile_pattern(
-                    VMF(), {
-                        (u, v): tiledef[u, v]
-                        for u in (0, 1, 2, 3)
-                        for v in (0, 1, 2, 3)
-                    },
+                    VMF(), tiledef.copy_subtiles(),
                     is_wall=abs(tiledef.normal.z) > 0.01,
                     bevels=set(),
                     normal=tiledef.normal,
@@ -874,6 +874,8 @@ class GenClump(Generator):
         # A seed only unique to this generator.
         self.gen_seed = b''
         self._clump_locs: list[Clump] = []
+        # Each 128-unit voxel -> clumps overlapping it, in the order they were made.
+        self._clump_grid: dict[tuple[int, int, int], list[Clump]] = {}
 
     def setup(self, vmf: VMF, tiles: List['TileDef']) -> None:
         """Build the list of clump locations."""
@@ -943,13 +945,23 @@ class GenClump(Generator):
                 Vec.iter_grid(pos_min, pos_max, 128)
             ))
 
-            self._clump_locs.append(Clump(
+            clump = Clump(
                 pos_min.x, pos_min.y, pos_min.z,
                 pos_max.x, pos_max.y, pos_max.z,
                 # We use this to reseed an RNG, giving us the same textures
                 # each time for the same clump.
                 clump_rand.getrandbits(64).to_bytes(8, 'little'),
-            ))
+            )
+            self._clump_locs.append(clump)
+            for voxel in itertools.product(
+                range(int(pos_min.x // 128), int(pos_max.x // 128) + 1),
+                range(int(pos_min.y // 128), int(pos_max.y // 128) + 1),
+                range(int(pos_min.z // 128), int(pos_max.z // 128) + 1),
+            ):
+                try:
+                    self._clump_grid[voxel].append(clump)
+                except KeyError:
+                    self._clump_grid[voxel] = [clump]
             if debug_visgroup is not None:
                 # noinspection PyUnboundLocalVariable
                 debug_brush: Solid = vmf.make_prism(
@@ -991,8 +1003,17 @@ class GenClump(Generator):
         return rng.choice(self.textures[tex_name])
 
     def _find_clump(self, loc: Vec) -> Optional[bytes]:
-        """Return the clump seed matching a location."""
-        for clump in self._clump_locs:
+        """Return the clump seed matching a location.
+
+        If multiple overlap, the first clump generated wins.
+        """
+        try:
+            clumps = self._clump_grid[
+                int(loc.x // 128), int(loc.y // 128), int(loc.z // 128),
+            ]
+        except KeyError:
+            return None
+        for clump in clumps:
             if (
                 clump.x1 <= loc.x <= clump.x2 and
                 clump.y1 <= loc.y <= clump.y2 and
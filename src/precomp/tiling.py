@@ -8,11 +8,11 @@ they were attached to the original brushes.
 """
 from __future__ import annotations
 
-from collections.abc import Iterator, MutableMapping
+from collections.abc import Iterable, Iterator, MutableMapping, ValuesView
 from collections import defaultdict, Counter
 import math
 from enum import Enum
-from typing import Optional, Union, cast, Tuple
+from typing import Optional, Union, Tuple
 from weakref import WeakKeyDictionary
 
 import attrs
@@ -22,8 +22,8 @@ import srctools.logger
 import srctools.vmf
 
 from plane import Plane
-from precomp.brushLoc import POS as BLOCK_POS, Block, grid_to_world
-from precomp.texturing import TileSize, Portalable
+from precomp.brushLoc import POS as BLOCK_POS, Block, GOO_BLOCKS, grid_to_world
+from precomp.texturing import TileSize
 from . import (
     grid_optim,
     instanceLocs,
@@ -64,14 +64,115 @@ NORMAL_NAMES = dict(zip(
     map(Vec.as_tuple, NORMALS),
     ['east', 'west', 'north', 'south', 'up', 'down'],
 ))
-# All the tiledefs in the map.
-# Maps a block center, normal -> the tiledef on the side of that block.
-TILES: dict[tuple[tuple[float, float, float], tuple[float, float, float]], TileDef] = {}
+# Looks up the index of each normal in NORMALS.
+_NORMAL_INDEX: dict[tuple[float, float, float], int] = {
+    norm.as_tuple(): ind for ind, norm in enumerate(NORMALS)
+}
+# A block center rounded to integers, then the index of the normal.
+TileKey = Tuple[int, int, int, int]
+_TileKeyArg = Tuple[Union[Vec, Tuple[float, float, float]], Union[Vec, Tuple[float, float, float]]]
+
+
+def _tile_key(pos: Iterable[float], normal: Iterable[float]) -> TileKey:
+    """Compute the key used to store a tile. ValueError is raised if the normal isn't axis-aligned."""
+    x, y, z = pos
+    nx, ny, nz = normal
+    try:
+        norm_ind = _NORMAL_INDEX[nx, ny, nz]
+    except KeyError:
+        # Allow slight inaccuracy from rotations.
+        try:
+            norm_ind = _NORMAL_INDEX[round(nx), round(ny), round(nz)]
+        except KeyError:
+            raise ValueError(f'Invalid normal ({nx}, {ny}, {nz})!') from None
+        if abs(nx - round(nx)) + abs(ny - round(ny)) + abs(nz - round(nz)) > 1e-6:
+            raise ValueError(f'Invalid normal ({nx}, {ny}, {nz})!')
+    return round(x), round(y), round(z), norm_ind
+
+
+class TileStore(MutableMapping[_TileKeyArg, 'TileDef']):
+    """Stores all the tiledefs in the map.
+
+    This maps a block center and normal to the tiledef on that side of the
+    block. Keys can be Vecs or tuples, they are converted to integers internally.
+    Tiles are additionally indexed by the plane their surface lies on.
+    """
+    def __init__(self) -> None:
+        self._tiles: dict[TileKey, TileDef] = {}
+        # (normal index, surface distance) -> tiles on that plane.
+        self._planes: dict[tuple[int, int], dict[TileKey, TileDef]] = defaultdict(dict)
+
+    @staticmethod
+    def _plane_key(key: TileKey) -> tuple[int, int]:
+        """Compute the plane a tile's surface is on, from its key."""
+        x, y, z, norm_ind = key
+        axis_pos = (x, y, z)[norm_ind // 2]
+        return norm_ind, (-axis_pos if norm_ind % 2 else axis_pos) + 64
+
+    def __getitem__(self, key: _TileKeyArg) -> TileDef:
+        pos, normal = key
+        try:
+            return self._tiles[_tile_key(pos, normal)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def get_key(self, key: TileKey) -> Optional[TileDef]:
+        """Lookup a tile using a precomputed key, returning None if not present."""
+        return self._tiles.get(key)
 
-# Special key for TileDef.subtile - this is set to 'u' or 'v' to
-# indicate the center section should be nodrawed.
-# This isn't a U,V tuple, but pretend it is so we can use it as a key.
-SUBTILE_FIZZ_KEY: tuple[int, int] = cast(Tuple[int, int], object())
+    def __setitem__(self, key: _TileKeyArg, tile: TileDef) -> None:
+        pos, normal = key
+        tile_key = _tile_key(pos, normal)
+        self._tiles[tile_key] = tile
+        self._planes[self._plane_key(tile_key)][tile_key] = tile
+
+    def __delitem__(self, key: _TileKeyArg) -> None:
+        pos, normal = key
+        try:
+            tile_key = _tile_key(pos, normal)
+        except ValueError:
+            raise KeyError(key) from None
+        del self._tiles[tile_key]
+        del self._planes[self._plane_key(tile_key)][tile_key]
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            pos, normal = key  # type: ignore
+            return _tile_key(pos, normal) in self._tiles
+        except (TypeError, ValueError):
+            return False
+
+    def __iter__(self) -> Iterator[tuple[tuple[float, float, float], tuple[float, float, float]]]:
+        for x, y, z, norm_ind in self._tiles:
+            yield (x, y, z), NORMALS[norm_ind].as_tuple()
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def values(self) -> ValuesView[TileDef]:
+        """Return a view over all the tiles."""
+        return self._tiles.values()
+
+    def clear(self) -> None:
+        """Remove all tiles."""
+        self._tiles.clear()
+        self._planes.clear()
+
+    def iter_plane(self, normal: Vec, dist: float) -> Iterator[TileDef]:
+        """Iterate over all the tiles facing in this direction, with a surface at this distance.
+
+        The distance is measured along the normal, so it is negative for tiles
+        facing away from the origin.
+        """
+        try:
+            norm_ind = _tile_key((0, 0, 0), normal)[3]
+        except ValueError:
+            return iter(())
+        return iter(list(self._planes.get((norm_ind, round(dist)), {}).values()))
+
+
+# All the tiledefs in the map.
+TILES = TileStore()
 
 # For each overlay, stores any tiledefs that they're affixed to. We then
 # add the front faces of those to the ent at the end.
@@ -244,6 +345,22 @@ TILETYPE_FROM_CHAR: dict[str, TileType] = {
     TILETYPE_TO_CHAR.items()
 }
 
+# Subtiles are stored as a bytearray of 16 TileType values, indexed by u * 4 + v.
+_CODE_TO_TILETYPE: list[TileType] = [TileType.VOID] * (max(TileType, key=lambda t: t.value).value + 1)
+for _tile_type in TileType:
+    _CODE_TO_TILETYPE[_tile_type.value] = _tile_type
+_VOID_CODE = TileType.VOID.value
+# Translation tables for flip panels, inverting every tile or only white tiles.
+_INVERT_ALL = bytes([
+    _CODE_TO_TILETYPE[code].inverted.value if code < len(_CODE_TO_TILETYPE) else code
+    for code in range(256)
+])
+_INVERT_WHITE = bytes([
+    _CODE_TO_TILETYPE[code].as_black.value if code < len(_CODE_TO_TILETYPE) else code
+    for code in range(256)
+])
+del _tile_type
+
 
 @utils.freeze_enum_props
 class PanelType(Enum):
@@ -316,6 +433,8 @@ class Pattern:
         self.tex = tex
         self.wall_only = wall_only
         self.tiles = list(tiles)
+        # For each tile, the subtile index of the first position, and a bitmask of positions.
+        self.masks: list[tuple[int, int]] = []
         tile_u, tile_v = tex.size
         # Do some sanity checks on values..
         for umin, vmin, umax, vmax in tiles:
@@ -324,6 +443,7 @@ class Pattern:
             assert 0 <= vmin < vmax <= 4, tile_tex
             assert (umax - umin) % tile_u == 0, tile_tex
             assert (vmax - vmin) % tile_v == 0, tile_tex
+            self.masks.append(_uv_mask(umin, vmin, umax, vmax))
 
     def __repr__(self) -> str:
         return 'Pattern({!r}, {}{}'.format(
@@ -333,6 +453,14 @@ class Pattern:
         )
 
 
+def _uv_mask(umin: int, vmin: int, umax: int, vmax: int) -> tuple[int, int]:
+    """Compute the index of the first subtile, and the bitmask of subtiles a pattern tile covers."""
+    mask = 0
+    for u, v in iter_uv(umin, umax-1, vmin, vmax-1):
+        mask |= 1 << (u * 4 + v)
+    return umin * 4 + vmin, mask
+
+
 def order_bbox(bbox: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
     """Used to sort 4x4 pattern positions.
 
@@ -411,8 +539,10 @@ def _make_patterns() -> None:
             umin, vmin, umax, vmax = tile
             if umin >= 2 or umax <= 2:
                 pat_u.tiles.append(tile)
+                pat_u.masks.append(_uv_mask(*tile))
             if vmin >= 2 or vmax <= 2:
                 pat_v.tiles.append(tile)
+                pat_v.masks.append(_uv_mask(*tile))
         if pat_u.tiles:
             fizz_u.append(pat_u)
         if pat_v.tiles:
@@ -479,14 +609,14 @@ class Panel:
         self,
         tile: TileDef,
         vmf: VMF,
-        sub_tiles: dict[tuple[int, int], TileType],
+        sub_tiles: bytearray,
         has_helper: bool,
         force_helper: bool,
     ) -> None:
         """Generate the panel brushes."""
         # We need to do the checks to handle multiple panels with shared
         # data.
-        if all(subtile is TileType.VOID for subtile in sub_tiles.values()):
+        if sub_tiles.count(_VOID_CODE) == 16:
             LOGGER.debug('Placing panel failed at {} @ {}: {} = {}', tile.pos, tile.normal, self, tile.format_tiles())
             # The brush entity isn't used.
             if self.brush_ent in vmf.entities:
@@ -523,14 +653,10 @@ class Panel:
 
         if self.pan_type.is_flip:
             # Two surfaces, forward and backward - each is 4 thick.
-            invert_black = self.pan_type is PanelType.FLIP_INVERT
-            back_subtiles = {
-                uv: (
-                    tile_type.inverted
-                    if invert_black or tile_type.color is Portalable.WHITE else
-                    tile_type
-                ) for uv, tile_type in sub_tiles.items()
-            }
+            if self.pan_type is PanelType.FLIP_INVERT:
+                back_subtiles = sub_tiles.translate(_INVERT_ALL)
+            else:
+                back_subtiles = sub_tiles.translate(_INVERT_WHITE)
             # If facing black first, use that side.
             if not self.inst.fixup.bool(consts.FixupVars.ST_DEPLOYED):
                 back_subtiles, sub_tiles = sub_tiles, back_subtiles
@@ -546,15 +672,15 @@ class Panel:
             else:
                 rot_axis = 'z'
             if rot_axis == v_ax:
-                back_subtiles = {
-                    (3-u, v): tile_type
-                    for (u, v), tile_type in back_subtiles.items()
-                }
+                back_subtiles = bytearray([
+                    back_subtiles[(3-u) * 4 + v]
+                    for u in range(4) for v in range(4)
+                ])
             elif rot_axis == u_ax:
-                back_subtiles = {
-                    (u, 3-v): tile_type
-                    for (u, v), tile_type in back_subtiles.items()
-                }
+                back_subtiles = bytearray([
+                    back_subtiles[u * 4 + 3-v]
+                    for u in range(4) for v in range(4)
+                ])
             else:
                 LOGGER.warning(
                     'Flip panel "{}" rotates on normal axis??',
@@ -780,9 +906,11 @@ class TileDef:
         base_type: TileSize this tile started with.
         override: If set, a specific texture to use and orientation.
           This only applies to .is_tile tiles.
-        _sub_tiles: None or a Dict[(u,v): TileSize]. u/v are either xz,
-        yz or xy.
+        _sub_tiles: None or a bytearray of the TileType values for each
+          (u,v), indexed by u * 4 + v. u/v are either xz, yz or xy.
           If None, it's the same as base_type.
+        _fizz_orient: '', or 'u'/'v' to indicate the center section should
+          be nodrawed for a centered fizzler.
         bullseye_count: The number of bullseye items on this surface. If > 0,
           we have some.
         _portal_helper: The number of portal placement helpers here. If > 0,
@@ -799,11 +927,13 @@ class TileDef:
         'brush_faces',
         'base_type',
         '_sub_tiles',
+        '_fizz_orient',
         'override',
         'bullseye_count',
         '_portal_helper',
         'panels',
         'is_antigel',
+        '_neighbours',
     ]
 
     pos: Vec
@@ -812,18 +942,24 @@ class TileDef:
 
     brush_faces: list[Side]
     panels: list[Panel]
-    _sub_tiles: Optional[dict[tuple[int, int], TileType]]
+    _sub_tiles: Optional[bytearray]
+    _fizz_orient: str
     override: Optional[tuple[str, template_brush.ScalingTemplate]]
 
     bullseye_count: int
     _portal_helper: Union[int, Vec]
+    # Positions checked by should_bevel(), computed when first needed.
+    _neighbours: Optional[dict[tuple[int, int], tuple[
+        tuple[float, float, float], TileKey,
+        tuple[float, float, float], TileKey,
+    ]]]
 
     def __init__(
         self,
         pos: Vec,
         normal: Vec,
         base_type: TileType,
-        subtiles: dict[tuple[int, int], TileType]=None,
+        subtiles: bytearray=None,
         has_helper: bool=False,
     ) -> None:
         self.pos = pos
@@ -832,10 +968,12 @@ class TileDef:
         self.override = None
         self.base_type = base_type
         self._sub_tiles = subtiles
+        self._fizz_orient = ''
         self.panels = []
         self.bullseye_count = 0
         self._portal_helper = 1 if has_helper else 0
         self.is_antigel = False
+        self._neighbours = None
 
     @property
     def has_portal_helper(self) -> bool:
@@ -884,26 +1022,30 @@ class TileDef:
     ) -> 'TileDef':
         """Return a tiledef at a position, creating it with a type if not present."""
         try:
-            tile = TILES[grid_pos.as_tuple(), norm.as_tuple()]
+            tile = TILES[grid_pos, norm]
         except KeyError:
-            tile = TILES[grid_pos.as_tuple(), norm.as_tuple()] = cls(
+            tile = TILES[grid_pos, norm] = cls(
                 grid_pos,
                 norm,
                 tile_type,
             )
         return tile
 
-    def _get_subtiles(self) -> dict[tuple[int, int], TileType]:
+    def _get_subtiles(self) -> bytearray:
         """Returns subtiles, creating it if not present."""
         if self._sub_tiles is None:
-            self._sub_tiles = tile = {
-                (x, y): self.base_type
-                for x in range(4) for y in range(4)
-            }
+            self._sub_tiles = tile = bytearray([self.base_type.value]) * 16
             return tile
         else:
             return self._sub_tiles
 
+    def copy_subtiles(self) -> bytearray:
+        """Return a copy of the TileType values for each subtile, indexed by u * 4 + v."""
+        if self._sub_tiles is None:
+            return bytearray([self.base_type.value]) * 16
+        else:
+            return self._sub_tiles.copy()
+
     def __getitem__(self, item: Tuple[int, int]) -> TileType:
         """Lookup the tile type at a particular sub-location."""
         u, v = item
@@ -913,7 +1055,7 @@ class TileDef:
         if self._sub_tiles is None:
             return self.base_type
         else:
-            return self._sub_tiles[u, v]
+            return _CODE_TO_TILETYPE[self._sub_tiles[u * 4 + v]]
 
     def __setitem__(self, item: tuple[int, int], value: TileType) -> None:
         """Lookup the tile type at a particular sub-location."""
@@ -922,23 +1064,18 @@ class TileDef:
             raise IndexError(u, v)
 
         if self._sub_tiles is None:
-            self._sub_tiles = {
-                (x, y): value if u == x and v == y else self.base_type
-                for x in range(4) for y in range(4)
-            }
+            self._sub_tiles = bytearray([self.base_type.value]) * 16
+            self._sub_tiles[u * 4 + v] = value.value
         else:
-            self._sub_tiles[u, v] = value
+            self._sub_tiles[u * 4 + v] = value.value
 
             # Check if we can merge this down to a single value.
-            # We can if we don't have the special fizzler key, and all
-            # the subtiles are the same.
-            if SUBTILE_FIZZ_KEY not in self._sub_tiles:
-                base_type = self._sub_tiles[0, 0]
-                for tile in self._sub_tiles.values():
-                    if tile is not base_type:
-                        return
-                self.base_type = base_type
-                self._sub_tiles = None
+            # We can if we don't have a fizzler, and all the subtiles are the same.
+            if not self._fizz_orient:
+                code = self._sub_tiles[0]
+                if self._sub_tiles.count(code) == 16:
+                    self.base_type = _CODE_TO_TILETYPE[code]
+                    self._sub_tiles = None
 
     def __iter__(self) -> Iterator[tuple[int, int, TileType]]:
         """Iterate over the axes and tile type."""
@@ -948,12 +1085,12 @@ class TileDef:
                 if self._sub_tiles is None:
                     yield u, v, self.base_type
                 else:
-                    yield u, v, self._sub_tiles[u, v]
+                    yield u, v, _CODE_TO_TILETYPE[self._sub_tiles[u * 4 + v]]
 
     def set_fizz_orient(self, axis: str) -> None:
         """Set the centered fizzler nodraw strip."""
-        # This violates the _sub_tiles type definition.
-        self._get_subtiles()[SUBTILE_FIZZ_KEY] = cast(TileType, axis)
+        self._get_subtiles()
+        self._fizz_orient = axis
 
     def uv_offset(self, u: float, v: float, norm: float) -> Vec:
         """Return a u/v offset from our position.
@@ -982,34 +1119,30 @@ class TileDef:
 
     def calc_patterns(
         self,
-        tiles: dict[tuple[int, int], TileType],
+        tiles: bytearray,
         is_wall: bool=False,
         _pattern: str=None,
+        fizz_orient: str='',
     ) -> Iterator[tuple[float, float, float, float, TileSize, TileType]]:
         """Figure out the brushes needed for a complex pattern.
 
+        Tiles is the TileType value for each subtile, indexed by u * 4 + v.
+        If fizz_orient is 'u' or 'v', the center is split for a fizzler.
         This yields (umin, umax, vmin, vmax, grid_size_, tile_type) tuples.
         """
-
-        # copy it, so we can overwrite positions with VOID = not a tile.
-        tiles = tiles.copy()
-
         # Don't check for special types if one is passed - that prevents
         # infinite recursion.
         if not _pattern:
             _pattern = 'clean'
-            if SUBTILE_FIZZ_KEY in tiles:
+            if fizz_orient:
                 # Output the split patterns for centered fizzlers.
-                # We need to remove it also so our iteration doesn't choke on it.
-                # 'u' or 'v'
-                split_type: str = tiles.pop(SUBTILE_FIZZ_KEY)
                 patterns = self.calc_patterns(
                     tiles,
                     is_wall,
-                    'fizzler_split_' + split_type,
+                    'fizzler_split_' + fizz_orient,
                 )
                 # Loop through our output and adjust the centerline outward.
-                if split_type == 'u':
+                if fizz_orient == 'u':
                     for umin, umax, vmin, vmax, grid_size, tile_type in patterns:
                         if umin == 2:
                             umin = 2.5
@@ -1018,7 +1151,7 @@ class TileDef:
                         yield umin, umax, vmin, vmax, grid_size, tile_type
                     # Now yield the nodraw-brush.
                     yield 1.5, 2.5, 0, 4, TileSize.TILE_4x4, TileType.NODRAW
-                elif split_type == 'v':
+                elif fizz_orient == 'v':
                     for umin, umax, vmin, vmax, grid_size, tile_type in patterns:
                         if vmin == 2:
                             vmin = 2.5
@@ -1029,51 +1162,49 @@ class TileDef:
                     yield 0, 4, 1.5, 2.5, TileSize.TILE_4x4, TileType.NODRAW
                 return  # Don't run our checks on the tiles.
 
+        # For each tile type, a bitmask of the subtiles with that type
+        # which haven't been used yet. VOID is never used.
+        masks = [0] * len(_CODE_TO_TILETYPE)
+        for ind, code in enumerate(tiles):
+            masks[code] |= 1 << ind
+        masks[_VOID_CODE] = 0
+
         for pattern in PATTERNS[_pattern]:
             if pattern.wall_only and not is_wall:
                 continue
-            for umin, vmin, umax, vmax in pattern.tiles:
-                tile_type = tiles[umin, vmin]
-                if tile_type is TileType.VOID:
-                    continue
-                for uv in iter_uv(umin, umax-1, vmin, vmax-1):
-                    if tiles[uv] is not tile_type:
-                        break
-                else:
-                    for uv in iter_uv(umin, umax-1, vmin, vmax-1):
-                        tiles[uv] = TileType.VOID
-                    yield umin, umax, vmin, vmax, pattern.tex, tile_type
+            for (umin, vmin, umax, vmax), (first, mask) in zip(pattern.tiles, pattern.masks):
+                code = tiles[first]
+                if masks[code] & mask == mask:
+                    masks[code] &= ~mask
+                    yield umin, umax, vmin, vmax, pattern.tex, _CODE_TO_TILETYPE[code]
 
         # All unfilled spots are single 4x4 tiles, or other objects.
-        for (u, v), tile_type in tiles.items():
-            if tile_type is not TileType.VOID:
-                yield u, u + 1, v, v + 1, TileSize.TILE_4x4, tile_type
+        for ind, code in enumerate(tiles):
+            if masks[code] & (1 << ind):
+                u, v = divmod(ind, 4)
+                yield u, u + 1, v, v + 1, TileSize.TILE_4x4, _CODE_TO_TILETYPE[code]
 
     def should_bevel(self, u: int, v: int) -> bool:
         """Check if this side of the TileDef should be bevelled.
 
         U and V should be 1 or -1.
         """
+        if self._neighbours is None:
+            self._neighbours = self._calc_neighbours()
+        solid_pos, side_key, embed_pos, adjacent_key = self._neighbours[u, v]
+
         # If there's a fully solid block on this side, we don't need to.
-        if BLOCK_POS['world': self.uv_offset(128*u, 128*v, 0)].inside_map:
+        if BLOCK_POS[solid_pos].inside_map:
             return True
 
         # Otherwise, check for another tile attached to our side.
-        u_ax, v_ax = Vec.INV_AXIS[self.normal.axis()]
-        side_norm = Vec.with_axes(u_ax, u, v_ax, v)
-
-        try:
-            tiledef = TILES[self.pos.as_tuple(), side_norm.as_tuple()]
-        except KeyError:
+        tiledef = TILES.get_key(side_key)
+        if tiledef is None:
             # No tile. As a special case, if we're an EMBED and this side is
             # empty then embed so the instance can fit.
-            if BLOCK_POS['world': self.pos] is Block.EMBED:
-                try:
-                    tiledef = TILES[
-                        (self.pos + 128 * side_norm).as_tuple(),
-                        self.normal.as_tuple()
-                    ]
-                except KeyError:
+            if BLOCK_POS[embed_pos] is Block.EMBED:
+                tiledef = TILES.get_key(adjacent_key)
+                if tiledef is None:
                     return True
                 else:
                     return tiledef.base_type is TileType.VOID
@@ -1081,6 +1212,29 @@ class TileDef:
 
         return tiledef.base_type is not TileType.VOID
 
+    def _calc_neighbours(self) -> dict[tuple[int, int], tuple[
+        tuple[float, float, float], TileKey,
+        tuple[float, float, float], TileKey,
+    ]]:
+        """Compute the positions should_bevel() checks for each side.
+
+        For each side this is the grid position of the block, the key for a tile
+        attached to our side, our own grid position, then the key for the tile
+        next to us.
+        """
+        u_ax, v_ax = Vec.INV_AXIS[self.normal.axis()]
+        embed_pos = (self.pos // 128).as_tuple()
+        neighbours = {}
+        for u, v in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            side_norm = Vec.with_axes(u_ax, u, v_ax, v)
+            neighbours[u, v] = (
+                (self.uv_offset(128*u, 128*v, 0) // 128).as_tuple(),
+                _tile_key(self.pos, side_norm),
+                embed_pos,
+                _tile_key(self.pos + 128 * side_norm, self.normal),
+            )
+        return neighbours
+
     def can_portal(self) -> bool:
         """Check if this tile could be portalled (in the center)."""
 
@@ -1148,13 +1302,13 @@ class TileDef:
         for panel in self.panels:
             # Compute a copy of subtiles with only the tiles the panel
             # has, and also without the fizzler key if present.
-            panel_tiles = {
-                (u, v): tile if (
+            panel_tiles = bytearray([
+                tile.value if (
                     (u, v) in panel.points
                     and (u, v) not in filled_tiles
-                ) else TileType.VOID
+                ) else _VOID_CODE
                 for u, v, tile in self
-            }
+            ])
             panel.export(self, vmf, panel_tiles, has_helper, force_helper)
             # Then mark these tiles so later panels or the main panel don't
             # use them. If seal is true, use nodraw.
@@ -1174,6 +1328,7 @@ class TileDef:
             is_wall,
             bevels,
             self.normal,
+            fizz_orient=self._fizz_orient,
         )
         self.brush_faces.extend(faces)
         vmf.add_brushes(brushes)
@@ -1204,7 +1359,7 @@ class TileDef:
     def gen_multitile_pattern(
         self,
         vmf: VMF,
-        pattern: dict[tuple[int, int], TileType],
+        pattern: bytearray,
         is_wall: bool,
         bevels: set[tuple[int, int]],
         normal: Vec,
@@ -1215,11 +1370,13 @@ class TileDef:
         add_bullseye: bool=False,
         face_output: Optional[dict[tuple[int, int], Side]]=None,
         interior_bevel: bool=True,
+        fizz_orient: str='',
     ) -> tuple[list[Side], list[Solid]]:
         """Generate a bunch of tiles, and return the front faces.
 
         This does the complex job of generating a surface with multiple
-        tile types.
+        tile types. The pattern is the TileType value for each subtile,
+        indexed by u * 4 + v.
 
         The specified bevels are a set of UV points around the tile. If a tile
         neighbours one of these points, it will be bevelled. If interior_bevel
@@ -1232,13 +1389,13 @@ class TileDef:
 
         if interior_bevel:
             bevels = set(bevels)
-            for uv, tile in pattern.items():
-                if tile is TileType.VOID:
-                    bevels.add(uv)
+            for ind, code in enumerate(pattern):
+                if code == _VOID_CODE:
+                    bevels.add(divmod(ind, 4))
 
         # NOTE: calc_patterns can produce 0, 1, 1.5, 2, 2.5, 3, 4!
         # Half-values are for nodrawing fizzlers which are center-aligned.
-        for umin, umax, vmin, vmax, grid_size, tile_type in self.calc_patterns(pattern, is_wall):
+        for umin, umax, vmin, vmax, grid_size, tile_type in self.calc_patterns(pattern, is_wall, fizz_orient=fizz_orient):
             u_range = range(max(int(umin), 0), min(int(umax), 4))
             v_range = range(max(int(vmin), 0), min(int(vmax), 4))
 
@@ -1435,7 +1592,7 @@ def find_tile(origin: Vec, normal: Vec, force: bool=False) -> tuple[TileDef, int
     if force:
         tile = TileDef.ensure(grid_pos, normal)
     else:
-        tile = TILES[grid_pos.as_tuple(), normal.as_tuple()]
+        tile = TILES[grid_pos, normal]
         # except KeyError: raise
 
     return tile, int(u), int(v)
@@ -1705,9 +1862,9 @@ def analyse_map(vmf_file: VMF, side_to_ant_seg: dict[int, list[antlines.Segment]
 
     # Look for Angled and Flip Panels, to link the tiledef to the instance.
     # First grab the instances.
-    panel_fname = instanceLocs.resolve('<ITEM_PANEL_ANGLED>, <ITEM_PANEL_FLIP>')
+    panel_fname = instanceLocs.resolve_filter('<ITEM_PANEL_ANGLED>, <ITEM_PANEL_FLIP>')
     # Also find PeTI-placed placement helpers, and move them into the tiledefs.
-    placement_helper_file = instanceLocs.resolve('<ITEM_PLACEMENT_HELPER>')
+    placement_helper_file = instanceLocs.resolve_filter('<ITEM_PLACEMENT_HELPER>')
 
     panels: dict[str, Entity] = {}
     for inst in vmf_file.by_class['func_instance']:
@@ -1720,7 +1877,7 @@ def analyse_map(vmf_file: VMF, side_to_ant_seg: dict[int, list[antlines.Segment]
             pos.localise(Vec.from_str(inst['origin']), angles)
             up = Matrix.from_angle(angles).up()
             try:
-                tile = TILES[pos.as_tuple(), up.as_tuple()]
+                tile = TILES[pos, up]
             except KeyError:
                 pass  # On goo or the like.
             else:
@@ -1793,18 +1950,17 @@ def analyse_map(vmf_file: VMF, side_to_ant_seg: dict[int, list[antlines.Segment]
     # Now look at all the blocklocs in the map, applying goo sides.
     # Don't override white surfaces, they can only appear on panels.
     goo_replaceable = [TileType.BLACK, TileType.BLACK_4x4]
-    for pos, block in BLOCK_POS.items():
-        if block.is_goo:
-            for norm in NORMALS:
-                grid_pos = grid_to_world(pos) - 128 * norm
-                try:
-                    tile = TILES[grid_pos.as_tuple(), norm.as_tuple()]
-                except KeyError:
-                    continue
+    for pos, block in BLOCK_POS.iter_blocks(*GOO_BLOCKS):
+        for norm in NORMALS:
+            grid_pos = grid_to_world(pos) - 128 * norm
+            try:
+                tile = TILES[grid_pos, norm]
+            except KeyError:
+                continue
 
-                for u, v, tile_type in tile:
-                    if tile_type in goo_replaceable:
-                        tile[u, v] = TileType.GOO_SIDE
+            for u, v, tile_type in tile:
+                if tile_type in goo_replaceable:
+                    tile[u, v] = TileType.GOO_SIDE
 
 
 def tiledefs_from_cube(face_to_tile: dict[int, TileDef], brush: Solid, grid_pos: Vec):
@@ -1832,7 +1988,7 @@ def tiledefs_from_cube(face_to_tile: dict[int, TileDef], brush: Solid, grid_pos:
             normal,
             base_type=tex_kind,
         )
-        TILES[grid_pos.as_tuple(), normal.as_tuple()] = tiledef
+        TILES[grid_pos, normal] = tiledef
         face_to_tile[face.id] = tiledef
     brush.remove()
 
@@ -1856,7 +2012,7 @@ def tiledefs_from_large_tile(
         norm,
         base_type=tex_kind,
     )
-    TILES[grid_pos.as_tuple(), norm.as_tuple()] = tiledef
+    TILES[grid_pos, norm] = tiledef
     brush.map.remove_brush(brush)
     face_to_tile[front_face.id] = tiledef
 
@@ -1872,7 +2028,7 @@ def tiledef_from_angled_panel(brush_ent: Entity, panel_ent: Entity) -> None:
 
     tex_kind, front_face = find_front_face(brush, grid_pos, norm)
 
-    TILES[grid_pos.as_tuple(), norm.as_tuple()] = tile = TileDef(
+    TILES[grid_pos, norm] = tile = TileDef(
         grid_pos,
         norm,
         base_type=tex_kind,
@@ -1898,7 +2054,7 @@ def tiledef_from_flip_panel(brush_ent: Entity, panel_ent: Entity) -> None:
     # To match the editor model, flip around the orientation.
     panel_ent['spawnflags'] = srctools.conv_int(panel_ent['spawnflags']) ^ 2
 
-    TILES[grid_pos.as_tuple(), norm.as_tuple()] = tile = TileDef(
+    TILES[grid_pos, norm] = tile = TileDef(
         grid_pos,
         norm,
         # It's always white in the forward direction
@@ -1991,7 +2147,8 @@ def bevel_split(
     tile_pos: Plane[TileDef],
 ) -> Iterator[tuple[int, int, int, int, tuple[bool, bool, bool, bool]]]:
     """Split the optimised segments to produce the correct bevelling."""
-    for min_u, min_v, max_u, max_v, _ in grid_optim.optimise(rect_points):
+    exact = options.get(bool, 'tile_exact_optimise')
+    for min_u, min_v, max_u, max_v, _ in grid_optim.optimise(rect_points, exact):
         u_range = range(min_u, max_u + 1)
         v_range = range(min_v, max_v + 1)
 
@@ -2227,7 +2384,7 @@ def generate_goo(vmf: VMF) -> None:
             for x, y in [(-1, 0), (0, -1), (1, 0), (0, 1)]:
                 norm = Vec(x, y)
                 try:
-                    tile = TILES[(voxel_center - 128*norm).as_tuple(), (x, y, 0)]
+                    tile = TILES[voxel_center - 128*norm, norm]
                 except KeyError:
                     continue
                 side = Vec.cross(norm, (0.0, 0.0, -1.0))
@@ -371,16 +371,16 @@ def add_quote(
             # chosen.
             style_vars[prop.value.casefold()] = True
         elif name == 'packlist':
-            packing.pack_list(vmf, prop.value)
+            packing.pack_list(prop.value)
         elif name == 'pack':
             if prop.has_children():
-                packing.pack_files(vmf, *[
+                packing.pack_files(*[
                     subprop.value
                     for subprop in
                     prop
                 ])
             else:
-                packing.pack_files(vmf, prop.value)
+                packing.pack_files(prop.value)
         elif name == 'choreo_name':
             # Change the targetname used for subsequent entities
             targetname = prop.value
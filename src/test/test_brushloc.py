@@ -0,0 +1,200 @@
+"""Test the grid of block positions."""
+from __future__ import annotations
+from random import Random
+
+import pytest
+from srctools import Vec
+
+from precomp import brushLoc
+from precomp.brushLoc import Block, Grid
+
+
+# Positions both inside and outside the dense array.
+POSITIONS = [
+    (0, 0, 0),
+    (brushLoc.GRID_MIN, brushLoc.GRID_MIN, brushLoc.GRID_MIN),
+    (brushLoc.GRID_MIN + brushLoc.GRID_SIZE - 1, 5, -3),
+    (brushLoc.GRID_MIN + brushLoc.GRID_SIZE, 5, -3),
+    (brushLoc.GRID_MIN - 1, 0, 0),
+    (0, 1000, 0),
+    (0.5, 2, 3),
+    (-200, -300, 48),
+]
+
+
+def random_grid(rand: Random) -> tuple[Grid, dict[tuple[float, float, float], Block]]:
+    """Fill in a grid randomly, returning the equivalent dict."""
+    grid = Grid()
+    expected: dict[tuple[float, float, float], Block] = {}
+    blocks = list(Block)
+    for _ in range(300):
+        pos = (rand.randint(-24, 56), rand.randint(-24, 56), rand.randint(-24, 56))
+        expected[pos] = grid[pos] = rand.choice(blocks)
+    for pos in POSITIONS:
+        expected[pos] = grid[pos] = rand.choice(blocks)
+    return grid, expected
+
+
+@pytest.mark.parametrize('pos', POSITIONS)
+def test_get_set(pos: tuple[float, float, float]) -> None:
+    """Positions can be set anywhere, including outside the dense array."""
+    grid = Grid()
+    assert pos not in grid
+    assert grid[pos] is Block.VOID
+    assert len(grid) == 0
+
+    grid[pos] = Block.SOLID
+    assert pos in grid
+    assert Vec(pos) in grid
+    assert grid[pos] is Block.SOLID
+    assert grid[Vec(pos)] is Block.SOLID
+    assert list(grid) == [Vec(pos)]
+    assert list(grid.items()) == [(Vec(pos), Block.SOLID)]
+    assert (Vec(pos), Block.SOLID) in grid.items()
+    assert (Vec(pos), Block.AIR) not in grid.items()
+
+    # Overwriting doesn't change the order.
+    grid[pos] = Block.AIR
+    assert grid[pos] is Block.AIR
+    assert len(grid) == 1
+
+    # Setting VOID explicitly is different to being unset.
+    grid[pos] = Block.VOID
+    assert pos in grid
+    assert grid[pos] is Block.VOID
+
+    del grid[pos]
+    assert pos not in grid
+    assert len(grid) == 0
+    with pytest.raises(KeyError):
+        del grid[pos]
+
+    with pytest.raises(ValueError):
+        grid[pos] = 1  # type: ignore
+
+
+def test_world_pos() -> None:
+    """Keys can be prefixed with 'world' to use world positions."""
+    grid = Grid()
+    grid['world': Vec(200, 64, -100)] = Block.GOO_TOP
+    assert grid[1, 0, -1] is Block.GOO_TOP
+    assert grid['world': (130, 120, -30)] is Block.GOO_TOP
+    assert grid['world': (100, 120, -30)] is Block.VOID
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_iter_blocks(seed: int) -> None:
+    """Iteration produces blocks in the order they were set."""
+    grid, expected = random_grid(Random(seed))
+    assert len(grid) == len(expected)
+    assert list(grid) == [Vec(pos) for pos in expected]
+    assert list(grid.iter_blocks()) == [(Vec(pos), block) for pos, block in expected.items()]
+    for pos, block in expected.items():
+        assert grid[pos] is block
+    assert list(grid.iter_blocks(Block.AIR, *brushLoc.GOO_BLOCKS)) == [
+        (Vec(pos), block) for pos, block in expected.items()
+        if block is Block.AIR or block.is_goo
+    ]
+
+    # Deleting keeps the order of the rest.
+    for pos in list(expected)[::3]:
+        del grid[pos]
+        del expected[pos]
+    assert list(grid.iter_blocks()) == [(Vec(pos), block) for pos, block in expected.items()]
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('axis', ['x', 'y', 'z'])
+def test_slab(seed: int, axis: str) -> None:
+    """Slabs contain every block set in that layer."""
+    grid, expected = random_grid(Random(seed))
+    ind = 'xyz'.index(axis)
+    for pos in [-200, -24, brushLoc.GRID_MIN - 1, brushLoc.GRID_MIN, 0, 0.5, 5, 47, 48, 56, 1000]:
+        assert grid.slab(axis, pos) == {
+            tuple(val for i, val in enumerate(key) if i != ind): block
+            for key, block in expected.items()
+            if key[ind] == pos
+        }, pos
+    with pytest.raises(ValueError):
+        grid.slab('w', 0)
+
+
+def test_raycast() -> None:
+    """Raycasts stop just before colliding blocks."""
+    grid = Grid()
+    for x in range(-20, 10):
+        grid[x, 0, 0] = Block.AIR
+    grid[10, 0, 0] = Block.SOLID
+    grid[-21, 0, 0] = Block.EMBED
+    grid[0, 0, 1] = Block.PIT_TOP
+    grid[0, 0, 2] = Block.PIT_BOTTOM
+
+    assert grid.raycast((0, 0, 0), Vec(1, 0, 0)) == Vec(9, 0, 0)
+    assert grid.raycast((0, 0, 0), Vec(-1, 0, 0)) == Vec(-20, 0, 0)
+    assert grid.raycast((0, 0, 0), Vec(0, 0, 1)) == Vec(0, 0, 1)
+    assert grid.raycast((0, 0, 0), Vec(0, 0, 1), [Block.PIT_TOP]) == Vec(0, 0, 0)
+    assert grid.raycast_world(Vec(64, 64, 64), Vec(1, 0, 0)) == Vec(9 * 128 + 64, 64, 64)
+    # Unset and VOID positions are errors.
+    with pytest.raises(ValueError):
+        grid.raycast((0, 0, 0), Vec(0, 1, 0))
+    grid[0, 0, -1] = Block.VOID
+    with pytest.raises(ValueError):
+        grid.raycast((0, 0, 0), Vec(0, 0, -1))
+
+
+def make_room(grid: Grid, low: int, high: int) -> None:
+    """Fill a solid cube, with an empty interior."""
+    for x in range(low, high + 1):
+        for y in range(low, high + 1):
+            for z in range(low, high + 1):
+                if x in (low, high) or y in (low, high) or z in (low, high):
+                    grid[x, y, z] = Block.SOLID
+
+
+def test_fill_air() -> None:
+    """Flood-filling a sealed room marks the interior as air."""
+    grid = Grid()
+    make_room(grid, 0, 5)
+    grid[2, 2, 1] = Block.PIT_BOTTOM
+    walls = len(grid)
+    grid.fill_air([(Vec(2, 3, 4), False)])
+    assert len(grid) == walls + 4 ** 3 - 1
+    for x in range(1, 5):
+        for y in range(1, 5):
+            for z in range(1, 5):
+                expected = Block.PIT_BOTTOM if (x, y, z) == (2, 2, 1) else Block.AIR
+                assert grid[x, y, z] is expected, (x, y, z)
+
+    # Goo spreads downward and sideways only, and converts pits.
+    grid.fill_air([(Vec(3, 3, 2), True)])
+    assert len(grid) == walls + 4 ** 3 - 1
+    for x in range(1, 5):
+        for y in range(1, 5):
+            for z in range(1, 5):
+                if z > 2:
+                    expected = Block.AIR
+                elif (x, y, z) == (2, 2, 1):
+                    expected = Block.GOO_BOTTOM
+                elif y == 1:  # Solid below in the y axis.
+                    expected = Block.GOO_BOTTOM
+                else:
+                    expected = Block.GOO_MID
+                assert grid[x, y, z] is expected, (x, y, z)
+
+
+def test_fill_air_leak() -> None:
+    """Filling stops at the edge of the map, including outside the dense array."""
+    grid = Grid()
+    make_room(grid, 0, 5)
+    grid.fill_air([(Vec(100, 0, 0), False), (Vec(0.5, 0, 0), False)])
+    assert len(grid) == 6 ** 3 - 4 ** 3
+
+    # A room which crosses the limit, the part beyond isn't filled.
+    grid = Grid()
+    make_room(grid, 38, 43)
+    grid.fill_air([(Vec(39, 39, 39), False)])
+    assert grid[39, 39, 39] is Block.AIR
+    assert grid[40, 40, 40] is Block.AIR
+    assert (41, 39, 39) not in grid
+    assert (40, 42, 40) not in grid
+    assert len(grid) == 6 ** 3 - 4 ** 3 + 2 ** 3
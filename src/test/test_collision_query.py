@@ -0,0 +1,193 @@
+"""Test the collision queries."""
+from random import Random
+
+import pytest
+from srctools import Vec
+
+from precomp.collisions import BBox, CollideType, Collisions
+
+
+def make_colls() -> Collisions:
+    """Build a line of boxes along the X axis."""
+    coll = Collisions()
+    coll.add(BBox(64, -16, -16, 96, 16, 16, name='solid', contents=CollideType.SOLID))
+    coll.add(BBox(128, -32, -32, 128, 32, 32, name='glass', contents=CollideType.GLASS))
+    coll.add(BBox(192, -16, -16, 256, 16, 16, name='grate', contents=CollideType.GRATING))
+    # Off to the side, never hit.
+    coll.add(BBox(64, 64, 64, 128, 128, 128, name='other', contents=CollideType.SOLID))
+    return coll
+
+
+def test_raycast_sorted() -> None:
+    """Rays return all the boxes they pass through, in order."""
+    coll = make_colls()
+    hits = coll.raycast(Vec(0, 0, 0), Vec(10, 0, 0))
+    assert [hit.bbox.name for hit in hits] == ['solid', 'glass', 'grate']
+    assert [hit.distance for hit in hits] == [64.0, 128.0, 192.0]
+    assert hits[0].point == Vec(64, 0, 0)
+    assert hits[0].normal == Vec(-1, 0, 0)
+
+    hits = coll.raycast(Vec(300, 0, 0), Vec(-1, 0, 0))
+    assert [hit.bbox.name for hit in hits] == ['grate', 'glass', 'solid']
+    assert hits[0].distance == 44.0
+    assert hits[0].normal == Vec(1, 0, 0)
+
+
+def test_raycast_mask() -> None:
+    """The mask filters the contents."""
+    coll = make_colls()
+    hits = coll.raycast(Vec(0, 0, 0), Vec(1, 0, 0), CollideType.GLASS | CollideType.GRATING)
+    assert [hit.bbox.name for hit in hits] == ['glass', 'grate']
+    assert coll.raycast(Vec(0, 0, 0), Vec(1, 0, 0), CollideType.FIZZLER) == []
+    # Limited distance.
+    hits = coll.raycast(Vec(0, 0, 0), Vec(1, 0, 0), max_dist=150.0)
+    assert [hit.bbox.name for hit in hits] == ['solid', 'glass']
+
+
+def test_raycast_inside() -> None:
+    """Rays starting inside a box hit at zero distance."""
+    coll = make_colls()
+    [hit] = coll.raycast(Vec(80, 0, 0), Vec(0, 0, 1))
+    assert hit.bbox.name == 'solid'
+    assert hit.distance == 0.0
+    assert hit.point == Vec(80, 0, 0)
+    assert hit.normal == Vec()
+
+
+def test_raycast_empty() -> None:
+    """Empty collisions return no hits, and zero directions are invalid."""
+    assert Collisions().raycast(Vec(), Vec(1, 0, 0)) == []
+    with pytest.raises(ValueError):
+        make_colls().raycast(Vec(), Vec())
+
+
+
+def test_raycast_outside_bounds() -> None:
+    """Rays starting outside all the collisions still reach them."""
+    coll = Collisions()
+    coll.add(BBox(0, -16, -16, 256, 16, 16, name='box'))
+    [hit] = coll.raycast(Vec(-1000, 0, 0), Vec(1, 0, 0))
+    assert hit.distance == 1000.0
+    assert hit.normal == Vec(-1, 0, 0)
+    [hit] = coll.raycast(Vec(128, 0, 5000), Vec(0, 0, -1))
+    assert hit.distance == 5000 - 16
+    assert hit.normal == Vec(0, 0, 1)
+    [hit] = coll.raycast(Vec(-1000, -1000, 0), Vec(1, 1, 0))
+    assert hit.point == Vec(0, 0, 0)
+    # Pointing away, or missing entirely.
+    assert coll.raycast(Vec(-1000, 0, 0), Vec(-1, 0, 0)) == []
+    assert coll.raycast(Vec(-1000, 64, 0), Vec(1, 0, 0)) == []
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_raycast_random(seed: int) -> None:
+    """Compare diagonal rays against sampling points along the ray."""
+    rand = Random(seed)
+    coll = Collisions()
+    boxes = []
+    for i in range(40):
+        pos = Vec(rand.randint(-8, 8), rand.randint(-8, 8), rand.randint(-8, 8)) * 32
+        bbox = BBox(pos, pos + Vec(rand.randint(1, 4), rand.randint(1, 4), rand.randint(1, 4)) * 32, name=f'box_{i}')
+        boxes.append(bbox)
+        coll.add(bbox)
+    start = Vec(rand.uniform(-300, 300), rand.uniform(-300, 300), rand.uniform(-300, 300))
+    direction = Vec(rand.uniform(-1, 1), rand.uniform(-1, 1), rand.uniform(-1, 1)).norm()
+    hits = coll.raycast(start, direction, max_dist=1024.0)
+    assert hits == sorted(hits, key=lambda hit: hit.distance)
+    found = {hit.bbox for hit in hits}
+
+    # Any box containing a sample point must be hit.
+    for i in range(0, 1024 * 4):
+        point = start + direction * (i / 4)
+        for bbox in boxes:
+            if bbox.mins.x < point.x < bbox.maxes.x and bbox.mins.y < point.y < bbox.maxes.y and bbox.mins.z < point.z < bbox.maxes.z:
+                assert bbox in found, (bbox, point)
+    for hit in hits:
+        point = hit.point
+        bbox = hit.bbox
+        assert bbox.mins.x - 1e-6 <= point.x <= bbox.maxes.x + 1e-6
+        assert bbox.mins.y - 1e-6 <= point.y <= bbox.maxes.y + 1e-6
+        assert bbox.mins.z - 1e-6 <= point.z <= bbox.maxes.z + 1e-6
+        assert hit.distance == pytest.approx((point - start).mag())
+
+
+def test_raycast_many() -> None:
+    """Batched raycasts match individual ones."""
+    coll = make_colls()
+    rays = [
+        (Vec(0, 0, 0), Vec(1, 0, 0)),
+        (Vec(96, 96, 0), Vec(0, 0, 1)),
+        (Vec(128, 0, 100), Vec(0, 0, -1)),
+    ]
+    assert coll.raycast_many(rays) == [coll.raycast(start, direction) for start, direction in rays]
+
+
+def test_find_overlapping() -> None:
+    """Overlap queries ignore boxes only touching at an edge."""
+    coll = make_colls()
+    assert {
+        bbox.name for bbox in
+        coll.find_overlapping(BBox(80, -8, -8, 200, 8, 8))
+    } == {'solid', 'glass', 'grate'}
+    assert [
+        bbox.name for bbox in
+        coll.find_overlapping(BBox(80, -8, -8, 200, 8, 8), CollideType.GLASS)
+    ] == ['glass']
+    # Sharing only an edge.
+    assert coll.find_overlapping(BBox(96, 16, -8, 112, 32, 8)) == []
+    # Sharing a face does count.
+    assert [
+        bbox.name for bbox in
+        coll.find_overlapping(BBox(32, -8, -8, 64, 8, 8))
+    ] == ['solid']
+    assert coll.find_overlapping_many([
+        BBox(32, -8, -8, 64, 8, 8),
+        BBox(0, 0, 0, 8, 8, 8),
+    ]) == [coll.find_overlapping(BBox(32, -8, -8, 64, 8, 8)), []]
+
+
+def test_sweep() -> None:
+    """Sweeping boxes hit everything they touch along the way."""
+    coll = make_colls()
+    hits = coll.sweep(BBox(-16, -8, -8, 0, 8, 8), Vec(1, 0, 0))
+    assert [hit.bbox.name for hit in hits] == ['solid', 'glass', 'grate']
+    assert [hit.distance for hit in hits] == [64.0, 128.0, 192.0]
+    # The point is the center of the moved box.
+    assert hits[0].point == Vec(56, 0, 0)
+    assert hits[0].normal == Vec(-1, 0, 0)
+
+    # Rays here would pass beside 'solid', but the box is wider than the gap.
+    hits = coll.sweep(BBox(-16, 16, -8, 0, 48, 8), Vec(1, 0, 0))
+    assert [hit.bbox.name for hit in hits] == ['solid', 'glass', 'grate']
+    assert coll.raycast(Vec(-8, 32, 0), Vec(1, 0, 0))[0].bbox.name == 'glass'
+
+    hits = coll.sweep(BBox(-16, 16, -8, 0, 48, 8), Vec(1, 0, 0), CollideType.GRATING)
+    assert [hit.bbox.name for hit in hits] == ['grate']
+    hits = coll.sweep(BBox(-16, 16, -8, 0, 48, 8), Vec(1, 0, 0), max_dist=100.0)
+    assert [hit.bbox.name for hit in hits] == ['solid']
+
+    # Already overlapping.
+    [hit] = coll.sweep(BBox(70, -8, -8, 80, 8, 8), Vec(0, 0, 1))
+    assert hit.bbox.name == 'solid'
+    assert hit.distance == 0.0
+    assert hit.normal == Vec()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_sweep_random(seed: int) -> None:
+    """Compare random sweeps against overlap tests along the path."""
+    rand = Random(seed)
+    coll = Collisions()
+    for i in range(40):
+        pos = Vec(rand.randint(-8, 8), rand.randint(-8, 8), rand.randint(-8, 8)) * 32
+        coll.add(BBox(pos, pos + Vec(rand.randint(1, 4), rand.randint(1, 4), rand.randint(1, 4)) * 32, name=f'box_{i}'))
+    start = Vec(rand.uniform(-300, 300), rand.uniform(-300, 300), rand.uniform(-300, 300))
+    size = Vec(rand.uniform(4, 64), rand.uniform(4, 64), rand.uniform(4, 64))
+    direction = Vec(rand.uniform(-1, 1), rand.uniform(-1, 1), rand.uniform(-1, 1)).norm()
+    hits = coll.sweep(BBox(start, start + size), direction, max_dist=1024.0)
+    assert hits == sorted(hits, key=lambda hit: hit.distance)
+    found = {hit.bbox for hit in hits}
+    for i in range(0, 1024 * 2):
+        offset = direction * (i / 2)
+        for bbox in coll.find_overlapping(BBox(start + offset, start + size + offset)):
+            assert bbox in found, (bbox, offset)
@@ -0,0 +1,40 @@
+"""Test the editoritems database."""
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+import editoritems_db
+from editoritems import Item
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    """Items are loaded when accessed."""
+    path = tmp_path / 'editor.bin'
+    with path.open('wb') as f:
+        editoritems_db.write(f, [Item('ITEM_FIRST'), Item('ITEM_SECOND')])
+    database = editoritems_db.load(path)
+    assert [summary.id for summary in database.summaries] == ['ITEM_FIRST', 'ITEM_SECOND']
+    assert list(database) == ['item_first', 'item_second']
+    assert 'item_second' in database
+    item = database['item_second']
+    assert item.id == 'ITEM_SECOND'
+    assert database['item_second'] is item
+    with pytest.raises(KeyError):
+        database['item_missing']
+
+
+def test_corrupt_item(tmp_path: Path) -> None:
+    """If an item can't be unpickled, the compile quits like for the header."""
+    buf = BytesIO()
+    editoritems_db.write(buf, [Item('ITEM_FIRST'), Item('ITEM_SECOND')])
+    data = bytearray(buf.getvalue())
+    # Overwrite the end of the last item.
+    data[-8:] = b'\xff' * 8
+    path = tmp_path / 'editor.bin'
+    path.write_bytes(data)
+
+    database = editoritems_db.load(path)
+    assert database['item_first'].id == 'ITEM_FIRST'
+    with pytest.raises(SystemExit):
+        database['item_second']
@@ -0,0 +1,73 @@
+"""Test the grid optimisation functions."""
+import random
+
+import pytest
+
+from precomp import grid_optim
+
+
+def check_rects(grid: dict, rects: list) -> None:
+    """Check the rectangles exactly cover the grid, with matching values."""
+    covered = {}
+    for min_x, min_y, max_x, max_y, value in rects:
+        assert min_x <= max_x and min_y <= max_y
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                assert (x, y) not in covered, f'{x}, {y} overlaps!'
+                assert grid[x, y] is value, (x, y)
+                covered[x, y] = value
+    assert covered.keys() == grid.keys()
+
+
+@pytest.mark.parametrize('exact', [False, True], ids=['greedy', 'exact'])
+def test_single_rect(exact: bool) -> None:
+    """A simple rectangle produces only one box."""
+    grid = {(x, y): 'a' for x in range(-2, 5) for y in range(3, 6)}
+    assert list(grid_optim.optimise(grid, exact)) == [(-2, 3, 4, 5, 'a')]
+
+
+def test_exact_minimal() -> None:
+    """Check the exact method handles shapes the greedy method does badly."""
+    # A plus shape - the optimal is 3 rectangles.
+    grid = {}
+    for i in range(6):
+        for j in range(2, 4):
+            grid[i, j] = grid[j, i] = True
+    rects = list(grid_optim.optimise(grid, exact=True))
+    check_rects(grid, rects)
+    assert len(rects) == 3
+
+    # A ring, with a hole in the middle. This needs 4 rectangles.
+    grid = {
+        (x, y): True
+        for x in range(5) for y in range(5)
+        if not (1 <= x <= 3 and 1 <= y <= 3)
+    }
+    rects = list(grid_optim.optimise(grid, exact=True))
+    check_rects(grid, rects)
+    assert len(rects) == 4
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_grids(seed: int) -> None:
+    """Compare both methods on random grids, checking they're valid and exact is never worse."""
+    rand = random.Random(seed)
+    values = ['a', 'b', 'c']
+    grid = {}
+    for _ in range(rand.randint(1, 12)):
+        # Overlapping random rectangles produce complex shapes.
+        x, y = rand.randint(-8, 8), rand.randint(-8, 8)
+        value = rand.choice(values)
+        for dx in range(rand.randint(1, 8)):
+            for dy in range(rand.randint(1, 8)):
+                grid[x + dx, y + dy] = value
+    for _ in range(rand.randint(0, 15)):
+        grid.pop((rand.randint(-8, 15), rand.randint(-8, 15)), None)
+    if not grid:
+        return
+
+    greedy = list(grid_optim.optimise(grid))
+    exact = list(grid_optim.optimise(grid, exact=True))
+    check_rects(grid, greedy)
+    check_rects(grid, exact)
+    assert len(exact) <= len(greedy)
@@ -0,0 +1,40 @@
+"""Test the instance transform cache."""
+from srctools import VMF, Angle, Matrix, Vec
+
+from precomp import instance_transform
+
+
+def test_parse_and_invalidate() -> None:
+    """Values are parsed, and reparsed when the keyvalues change."""
+    vmf = VMF()
+    inst = vmf.create_ent('func_instance', origin='200 -30 64', angles='0 90 0')
+    assert instance_transform.origin(inst) == Vec(200, -30, 64)
+    assert instance_transform.angles(inst) == Angle(0, 90, 0)
+    assert instance_transform.orient(inst) == Matrix.from_angle(Angle(0, 90, 0))
+    assert instance_transform.grid_pos(inst) == Vec(1, -1, 0)
+
+    inst['origin'] = Vec(-64, 256, 0)
+    inst['angles'] = Angle(90, 0, 0)
+    assert instance_transform.origin(inst) == Vec(-64, 256, 0)
+    assert instance_transform.orient(inst) == Matrix.from_angle(Angle(90, 0, 0))
+    assert instance_transform.grid_pos(inst) == Vec(-1, 2, 0)
+
+
+def test_returns_copies() -> None:
+    """Modifying the results does not affect the cache."""
+    vmf = VMF()
+    inst = vmf.create_ent('func_instance', origin='1 2 3', angles='0 0 0')
+    pos = instance_transform.origin(inst)
+    pos.x = 48
+    orient = instance_transform.orient(inst)
+    orient @= Angle(0, 90, 0)
+    assert instance_transform.origin(inst) == Vec(1, 2, 3)
+    assert instance_transform.orient(inst) == Matrix()
+
+
+def test_differing_case() -> None:
+    """Keys with unusual case are still found."""
+    vmf = VMF()
+    inst = vmf.create_ent('func_instance', Origin='8 16 32', ANGLES='0 180 0')
+    assert instance_transform.origin(inst) == Vec(8, 16, 32)
+    assert instance_transform.angles(inst) == Angle(0, 180, 0)
@@ -0,0 +1,111 @@
+"""Test resolving instance selectors."""
+from __future__ import annotations
+from collections import defaultdict
+
+import pytest
+
+import corridor
+from corridor import Direction, GameMode
+from editoritems_db import ItemSummary
+from precomp import instanceLocs
+
+
+def summary(item_id: str, instances: list[str], cust_instances: dict[str, str] | None = None) -> ItemSummary:
+    """Produce the summary for an item."""
+    return ItemSummary(item_id, instances, cust_instances or {}, None, False, False)
+
+
+def corr_files(item_id: str, count: int) -> list[str]:
+    """Corridor items have the corridor instances first, then the regular ones."""
+    folder = item_id.casefold()
+    return [
+        *[f'instances/bee2_corridor/{folder}/{i}.vmf' for i in range(count)],
+        *[f'instances/{folder}/extra_{i}.vmf' for i in range(count, 11)],
+    ]
+
+
+@pytest.fixture(autouse=True)
+def items(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Load a set of items, without affecting the global state."""
+    monkeypatch.setattr(instanceLocs, 'INSTANCE_FILES', {})
+    monkeypatch.setattr(instanceLocs, 'ITEM_FOR_FILE', {})
+    monkeypatch.setattr(instanceLocs, 'CUST_INST_FILES', defaultdict(dict))
+    monkeypatch.setattr(instanceLocs, 'INST_SPECIAL', {})
+    monkeypatch.setattr(instanceLocs, '_SELECTOR_INDEX', {})
+    monkeypatch.setattr(instanceLocs, '_FILE_SELECTORS', {})
+    instanceLocs.load_conf([
+        summary('ITEM_BARRIER', [f'instances/glass/{i}.vmf' for i in range(9)]),
+        summary('ITEM_CUBE', [
+            'instances/cube/dropper.vmf', '', 'instances/cube/dropper.vmf',
+        ], {'hint': 'instances/cube/hint.vmf'}),
+        summary('ITEM_ENTRY_DOOR', corr_files('ITEM_ENTRY_DOOR', 7)),
+        summary('ITEM_EXIT_DOOR', corr_files('ITEM_EXIT_DOOR', 4)),
+        summary('ITEM_COOP_ENTRY_DOOR', corr_files('ITEM_COOP_ENTRY_DOOR', 1)),
+        summary('ITEM_COOP_EXIT_DOOR', corr_files('ITEM_COOP_EXIT_DOOR', 4)),
+    ])
+
+
+def test_resolve() -> None:
+    """Selectors resolve to the files they refer to."""
+    assert instanceLocs.resolve('<ITEM_CUBE>') == ['instances/cube/dropper.vmf', 'instances/cube/dropper.vmf']
+    assert instanceLocs.resolve('<item_cube:1,bee2_hint>') == ['instances/cube/hint.vmf']
+    assert instanceLocs.resolve('[glass_corner]') == ['instances/glass/1.vmf', 'instances/glass/5.vmf']
+    assert instanceLocs.resolve('<ITEM_BARRIER:3>, instances/Other.vmf') == ['instances/glass/3.vmf']
+    assert instanceLocs.resolve('instances/Other.vmf') == ['instances/other.vmf']
+    assert instanceLocs.resolve('<ITEM_MISSING>', silent=True) == []
+
+    # Results are shared, but resolve() returns a fresh list.
+    assert instanceLocs.resolve('<ITEM_CUBE>') is not instanceLocs.resolve('<ITEM_CUBE>')
+    filt = instanceLocs.resolve_filter('[glass_frames]')
+    assert filt == {f'instances/glass/{i}.vmf' for i in range(1, 9)}
+    assert instanceLocs.resolve_filter('[glass_frames]') is filt
+
+
+def test_selectors_for() -> None:
+    """selectors_for() finds every selector matching a file, even unused ones."""
+    assert instanceLocs.selectors_for('instances/Glass/5.vmf') == {
+        '<item_barrier>', '<item_barrier:5>',
+        '[glass_right_corner]', '[glass_corner]', '[glass_frames]',
+        # The definitions of those specials.
+        '<ITEM_BARRIER:5>', '<ITEM_BARRIER:1,5>', '<ITEM_BARRIER:1,2,3,4,5,6,7,8>',
+    }
+    assert instanceLocs.selectors_for('instances/cube/dropper.vmf') == {
+        '<item_cube>', '<item_cube:0>', '<item_cube:2>',
+    }
+    assert instanceLocs.selectors_for('instances/cube/hint.vmf') == {'<item_cube:bee2_hint>'}
+    assert instanceLocs.selectors_for('instances/unknown.vmf') == frozenset()
+
+    # Selectors resolved later are included.
+    instanceLocs.resolve_filter('<ITEM_BARRIER:4,5>, [glass_128]')
+    assert '<ITEM_BARRIER:4,5>, [glass_128]' in instanceLocs.selectors_for('instances/glass/5.vmf')
+    assert '<ITEM_BARRIER:4,5>, [glass_128]' in instanceLocs.selectors_for('instances/glass/0.vmf')
+    assert '<ITEM_BARRIER:4,5>, [glass_128]' not in instanceLocs.selectors_for('instances/glass/1.vmf')
+
+    # The reverse index matches resolving every selector.
+    for selector, (_, files_set) in instanceLocs._SELECTOR_INDEX.items():
+        for file in files_set:
+            assert selector in instanceLocs.selectors_for(file)
+
+
+def test_chosen_corridor() -> None:
+    """Choosing corridors replaces the selectors for them."""
+    entry = corridor.Corridor('instances/corr/chosen_entry.vmf', {}, 3, True)
+    exit = corridor.Corridor('instances/corr/chosen_exit.vmf', {}, 0, False)
+    assert '[spentrycorr]' in instanceLocs.selectors_for('instances/bee2_corridor/item_entry_door/0.vmf')
+
+    instanceLocs.set_chosen_corridor(GameMode.SP, {Direction.ENTRY: entry, Direction.EXIT: exit})
+    assert instanceLocs.resolve('[spEntryCorr]') == ['instances/corr/chosen_entry.vmf']
+    assert instanceLocs.resolve('[spEntryCorr3]') == ['instances/corr/chosen_entry.vmf']
+    assert instanceLocs.resolve('[spEntryCorr2]') == []
+    assert instanceLocs.resolve('[coopCorr]') == []
+    assert instanceLocs.selectors_for('instances/bee2_corridor/item_entry_door/0.vmf') == frozenset()
+    assert instanceLocs.selectors_for('instances/corr/chosen_entry.vmf') == {
+        '<item_entry_door>', *[f'<item_entry_door:{i}>' for i in range(7)],
+        '[spentrycorr]', '[spentrycorr3]',
+        # Resolved above.
+        '[spEntryCorr]', '[spEntryCorr3]',
+    }
+    assert instanceLocs.selectors_for('instances/corr/chosen_exit.vmf') == {
+        '<item_exit_door>', *[f'<item_exit_door:{i}>' for i in range(4)],
+        '[spexitcorr]',
+    }
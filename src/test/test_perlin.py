@@ -0,0 +1,53 @@
+"""Test the noise functions."""
+from random import Random
+
+import pytest
+
+from perlin import SimplexNoise
+
+
+# Values produced by the original implementation of noise3().
+DEFAULT_VALUES = [
+    ((0, 0, 0), 0.0),
+    ((0.5, 0.25, 0.125), 0.34345447724110784),
+    ((1.3, -2.7, 4.1), -2.1333332634479277e-08),
+    ((-10.5, 3.25, 7.75), 0.1153733024691368),
+    ((100.1, 200.2, 300.3), -0.8600764479999758),
+    ((12, 13, 14.5), 0.37451111111111074),
+    ((0.9, 0.1, 0.5), -0.1274594346666666),
+    ((-0.3, -0.6, -0.9), 0.29148680533333315),
+]
+CUSTOM_VALUES = [
+    ((0, 0, 0), 0.0),
+    ((0.5, 0.25, 0.125), -0.23860668341240265),
+    ((1.3, -2.7, 4.1), 1.0666666736552179e-07),
+    ((-10.5, 3.25, 7.75), 0.36705573559670823),
+]
+
+
+def test_known_values() -> None:
+    """The noise is unchanged from the original implementation."""
+    for noise, values in [
+        (SimplexNoise(), DEFAULT_VALUES),
+        (SimplexNoise(permutation_table=[3, 1, 2, 0, 7, 5, 6, 4]), CUSTOM_VALUES),
+    ]:
+        for (x, y, z), expected in values:
+            assert noise.noise3(x, y, z) == expected, (x, y, z)
+        assert noise.noise3_array([pos for pos, value in values]) == [value for pos, value in values]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_array_matches(seed: int) -> None:
+    """noise3_array() produces exactly the same values as noise3()."""
+    rand = Random(seed)
+    table = list(range(160))
+    rand.shuffle(table)
+    noise = SimplexNoise(permutation_table=table)
+    points = [
+        (rand.uniform(-50, 50), rand.uniform(-50, 50), rand.uniform(-50, 50))
+        for _ in range(500)
+    ]
+    # Include integer grid points, like the cutout tile floors.
+    points += [(x, y, rand.randint(-10, 10)) for x in range(-5, 5) for y in range(-5, 5)]
+    assert noise.noise3_array(iter(points)) == [noise.noise3(x, y, z) for x, y, z in points]
+    assert noise.noise3_array([]) == []
@@ -0,0 +1,140 @@
+"""Test saving and loading parsed templates."""
+from pathlib import Path
+
+import pytest
+from srctools import VMF, Vec
+
+from precomp import template_brush
+from precomp.template_brush import Template, UnparsedTemplate
+
+
+TEMP_ID = 'TEST_TEMPLATE'
+TEMP_PATH = 'templates/test_template.vmf'
+
+
+@pytest.fixture
+def pack(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Write out a template, and reset the global template state."""
+    monkeypatch.setattr(template_brush, '_TEMPLATES', {})
+    monkeypatch.setattr(template_brush, '_CACHE', {})
+    monkeypatch.setattr(template_brush, '_CACHE_CHANGED', False)
+
+    vmf = VMF()
+    vmf.create_ent('bee2_template_conf', template_id=TEMP_ID, temp_type='default')
+    vmf.add_brush(vmf.make_prism(Vec(-64, -64, -64), Vec(64, 64, 64), 'tools/toolsnodraw').solid)
+    prism = vmf.make_prism(Vec(-16, -16, 64), Vec(16, 16, 96), 'metal/black_wall_metal_002c')
+    prism.solid.visgroup_ids.add(vmf.create_visgroup('extra').id)
+    vmf.add_brush(prism.solid)
+
+    folder = tmp_path / 'package'
+    (folder / 'templates').mkdir(parents=True)
+    with (folder / TEMP_PATH).open('w') as f:
+        vmf.export(f)
+    return folder
+
+
+def register(pack: Path, mtime: int) -> None:
+    """Add the template to the list of known templates."""
+    template_brush._TEMPLATES[TEMP_ID.casefold()] = UnparsedTemplate(TEMP_ID, str(pack), TEMP_PATH, mtime)
+
+
+def summarise(temp: Template) -> dict[str, list[list[tuple[str, tuple[Vec, ...]]]]]:
+    """Produce a comparable form of the brushes in a template."""
+    return {
+        group: [
+            [(face.mat, tuple(face.planes)) for face in solid.sides]
+            for solid in world + detail
+        ]
+        for group, (world, detail, overlays) in temp._data.items()
+    }
+
+
+def reload(cache: Path, pack: Path, mtime: int) -> None:
+    """Simulate starting a new compile."""
+    template_brush._TEMPLATES.clear()
+    template_brush._CACHE.clear()
+    template_brush._CACHE_CHANGED = False
+    register(pack, mtime)
+    template_brush.load_cache(str(cache))
+
+
+def test_round_trip(pack: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Templates saved to the cache are loaded without parsing."""
+    cache = tmp_path / 'templates.bin'
+    register(pack, 1234)
+    orig = template_brush.get_template(TEMP_ID)
+    assert set(orig.visgroups) == {'', 'extra'}
+    assert len(summarise(orig)['extra']) == 1
+    template_brush.save_cache(str(cache))
+    assert cache.exists()
+
+    reload(cache, pack, 1234)
+    assert set(template_brush._CACHE) == {TEMP_ID.casefold()}
+
+    def fail_parse(loc: UnparsedTemplate) -> Template:
+        """The template should not be parsed again."""
+        raise AssertionError(loc)
+
+    monkeypatch.setattr(template_brush, '_parse_template', fail_parse)
+    cached = template_brush.get_template(TEMP_ID)
+    assert cached is not orig
+    assert cached.id == orig.id
+    assert set(cached.visgroups) == set(orig.visgroups)
+    assert summarise(cached) == summarise(orig)
+    # Nothing was parsed, so there's no need to rewrite.
+    assert not template_brush._CACHE_CHANGED
+
+
+def test_changed_mtime(pack: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """If the package was modified, the template is parsed again."""
+    cache = tmp_path / 'templates.bin'
+    register(pack, 1234)
+    orig = template_brush.get_template(TEMP_ID)
+    template_brush.save_cache(str(cache))
+
+    reload(cache, pack, 5678)
+    parsed: list[str] = []
+    parse_template = template_brush._parse_template
+
+    def track_parse(loc: UnparsedTemplate) -> Template:
+        """Record templates which are parsed."""
+        parsed.append(loc.id)
+        return parse_template(loc)
+
+    monkeypatch.setattr(template_brush, '_parse_template', track_parse)
+    assert summarise(template_brush.get_template(TEMP_ID)) == summarise(orig)
+    assert parsed == [TEMP_ID]
+    assert template_brush._CACHE_CHANGED
+    assert template_brush._CACHE[TEMP_ID.casefold()][0] == (str(pack), TEMP_PATH, 5678)
+
+
+def test_changed_version(pack: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Caches written by a different version are discarded."""
+    cache = tmp_path / 'templates.bin'
+    register(pack, 1234)
+    template_brush.get_template(TEMP_ID)
+    template_brush.save_cache(str(cache))
+
+    monkeypatch.setattr(template_brush, 'CACHE_VERSION', (-1, 'other'))
+    reload(cache, pack, 1234)
+    assert template_brush._CACHE == {}
+
+
+def test_unknown_mtime(pack: Path, tmp_path: Path) -> None:
+    """Templates without a modification time aren't cached."""
+    cache = tmp_path / 'templates.bin'
+    register(pack, 0)
+    template_brush.get_template(TEMP_ID)
+    assert template_brush._CACHE == {}
+    template_brush.save_cache(str(cache))
+    assert not cache.exists()
+
+
+def test_save_failure(pack: Path, tmp_path: Path) -> None:
+    """Failing to write the cache doesn't raise."""
+    register(pack, 1234)
+    template_brush.get_template(TEMP_ID)
+    # The folder doesn't exist, so the file can't be created.
+    cache = tmp_path / 'missing' / 'templates.bin'
+    template_brush.save_cache(str(cache))
+    assert not cache.exists()
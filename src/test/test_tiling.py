@@ -0,0 +1,191 @@
+"""Test the tiling module."""
+from __future__ import annotations
+from typing import Iterator
+from random import Random
+
+import pytest
+from srctools import Vec
+
+# Import template_brush first, to resolve the circular import.
+from precomp import template_brush  # noqa
+from precomp import tiling
+from precomp.texturing import TileSize
+from precomp.tiling import TileType
+
+
+def iter_uv(umin: int, umax: int, vmin: int, vmax: int) -> Iterator[tuple[int, int]]:
+    """Iterate over the inclusive range of subtile positions."""
+    for u in range(umin, umax + 1):
+        for v in range(vmin, vmax + 1):
+            yield u, v
+
+
+def reference_patterns(
+    tiles: dict[tuple[int, int], TileType],
+    is_wall: bool,
+    pattern_name: str = '',
+    fizz_orient: str = '',
+) -> Iterator[tuple[float, float, float, float, TileSize, TileType]]:
+    """The original dictionary-based implementation of calc_patterns()."""
+    tiles = tiles.copy()
+    if not pattern_name:
+        pattern_name = 'clean'
+        if fizz_orient:
+            patterns = reference_patterns(tiles, is_wall, 'fizzler_split_' + fizz_orient)
+            if fizz_orient == 'u':
+                for umin, umax, vmin, vmax, grid_size, tile_type in patterns:
+                    if umin == 2:
+                        umin = 2.5
+                    if umax == 2:
+                        umax = 1.5
+                    yield umin, umax, vmin, vmax, grid_size, tile_type
+                yield 1.5, 2.5, 0, 4, TileSize.TILE_4x4, TileType.NODRAW
+            else:
+                for umin, umax, vmin, vmax, grid_size, tile_type in patterns:
+                    if vmin == 2:
+                        vmin = 2.5
+                    if vmax == 2:
+                        vmax = 1.5
+                    yield umin, umax, vmin, vmax, grid_size, tile_type
+                yield 0, 4, 1.5, 2.5, TileSize.TILE_4x4, TileType.NODRAW
+            return
+
+    for pattern in tiling.PATTERNS[pattern_name]:
+        if pattern.wall_only and not is_wall:
+            continue
+        for umin, vmin, umax, vmax in pattern.tiles:
+            tile_type = tiles[umin, vmin]
+            if tile_type is TileType.VOID:
+                continue
+            for uv in iter_uv(umin, umax - 1, vmin, vmax - 1):
+                if tiles[uv] is not tile_type:
+                    break
+            else:
+                for uv in iter_uv(umin, umax - 1, vmin, vmax - 1):
+                    tiles[uv] = TileType.VOID
+                yield umin, umax, vmin, vmax, pattern.tex, tile_type
+
+    for (u, v), tile_type in tiles.items():
+        if tile_type is not TileType.VOID:
+            yield u, u + 1, v, v + 1, TileSize.TILE_4x4, tile_type
+
+
+def random_layout(rand: Random) -> dict[tuple[int, int], TileType]:
+    """Produce a subtile layout, made of overlapping rectangles so patterns match."""
+    choices = [
+        TileType.BLACK, TileType.WHITE, TileType.BLACK_4x4, TileType.WHITE_4x4,
+        TileType.NODRAW, TileType.VOID, TileType.GOO_SIDE, TileType.CUTOUT_TILE_BROKEN,
+    ]
+    tiles = dict.fromkeys(iter_uv(0, 3, 0, 3), rand.choice(choices))
+    for _ in range(rand.randint(0, 6)):
+        umin, vmin = rand.randint(0, 3), rand.randint(0, 3)
+        tile_type = rand.choice(choices)
+        for uv in iter_uv(umin, rand.randint(umin, 3), vmin, rand.randint(vmin, 3)):
+            tiles[uv] = tile_type
+    return tiles
+
+
+def to_bytes(tiles: dict[tuple[int, int], TileType]) -> bytearray:
+    """Convert to the packed form."""
+    return bytearray(tiles[u, v].value for u in range(4) for v in range(4))
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_calc_patterns(seed: int) -> None:
+    """Compare calc_patterns() against the dictionary implementation."""
+    rand = Random(seed)
+    tile = tiling.TileDef(Vec(64, 64, 64), Vec(0, 0, 1), TileType.BLACK)
+    for _ in range(500):
+        tiles = random_layout(rand)
+        is_wall = rand.random() < 0.5
+        fizz_orient = rand.choice(['', '', 'u', 'v'])
+        assert list(tile.calc_patterns(
+            to_bytes(tiles), is_wall, fizz_orient=fizz_orient,
+        )) == list(reference_patterns(tiles, is_wall, '', fizz_orient)), (tiles, is_wall, fizz_orient)
+
+
+@pytest.mark.parametrize('invert_black', [False, True], ids=['flip_white', 'flip_invert'])
+def test_flip_inversion(invert_black: bool) -> None:
+    """The translation tables for flip panels match inverting each tile type."""
+    table = tiling._INVERT_ALL if invert_black else tiling._INVERT_WHITE
+    rand = Random(1234)
+    for tile_type in TileType:
+        if invert_black or tile_type.is_white:
+            expected = tile_type.inverted
+        else:
+            expected = tile_type
+        assert bytes([tile_type.value]).translate(table) == bytes([expected.value]), tile_type
+
+    # And whole layouts, then generating patterns from those.
+    tile = tiling.TileDef(Vec(64, 64, 64), Vec(1, 0, 0), TileType.WHITE)
+    for _ in range(200):
+        tiles = random_layout(rand)
+        back = {
+            uv: (
+                tile_type.inverted
+                if invert_black or tile_type.is_white else
+                tile_type
+            ) for uv, tile_type in tiles.items()
+        }
+        back_bytes = to_bytes(tiles).translate(table)
+        assert back_bytes == to_bytes(back)
+        assert list(tile.calc_patterns(back_bytes, True)) == list(reference_patterns(back, True))
+
+
+def test_tile_store() -> None:
+    """TileStore accepts Vecs or tuples, and tolerates slightly inaccurate normals."""
+    store = tiling.TileStore()
+    tile = tiling.TileDef(Vec(64, 192, -64), Vec(0, 0, 1), TileType.BLACK)
+    store[tile.pos, tile.normal] = tile
+    assert len(store) == 1
+    assert store[Vec(64, 192, -64), Vec(0, 0, 1)] is tile
+    assert store[(64.0, 192.0, -64.0), (0.0, 0.0, 1.0)] is tile
+    assert store[Vec(64.0000001, 192, -64), Vec(1e-9, 0, 1)] is tile
+    assert (Vec(64, 192, -64), Vec(0, 0, 1)) in store
+    assert (Vec(64, 192, -64), Vec(0, 0, -1)) not in store
+    assert (Vec(64, 192, -64), Vec(0, 0.5, 0.5)) not in store
+    assert 'not a key' not in store
+    assert store.get_key((64, 192, -64, tiling._NORMAL_INDEX[0, 0, 1])) is tile
+    assert list(store) == [((64, 192, -64), (0.0, 0.0, 1.0))]
+    assert list(store.values()) == [tile]
+    with pytest.raises(KeyError):
+        store[Vec(64, 192, -64), Vec(0, 1, 1)]
+    with pytest.raises(ValueError):
+        store[Vec(64, 192, -64), Vec(0, 1, 1)] = tile
+
+    del store[Vec(64, 192, -64), Vec(0, 0, 1)]
+    assert len(store) == 0
+    assert list(store.iter_plane(Vec(0, 0, 1), 0)) == []
+    with pytest.raises(KeyError):
+        del store[Vec(64, 192, -64), Vec(0, 0, 1)]
+
+
+def test_iter_plane() -> None:
+    """iter_plane() produces the tiles whose surface lies on a plane."""
+    rand = Random(48)
+    store = tiling.TileStore()
+    for _ in range(500):
+        pos = Vec(rand.randint(-4, 4), rand.randint(-4, 4), rand.randint(-4, 4)) * 128 + 64
+        normal = rand.choice(tiling.NORMALS)
+        store[pos, normal] = tiling.TileDef(pos, normal, TileType.WHITE)
+    for pos, normal in rand.sample(list(store), 50):
+        del store[pos, normal]
+    tiles = list(store.values())
+
+    for normal in tiling.NORMALS:
+        planes = set()
+        for dist in range(-640, 640 + 128, 128):
+            expected = [
+                tile for tile in tiles
+                if tile.normal == normal and (tile.pos + 64 * normal).dot(normal) == dist
+            ]
+            planes.update(expected)
+            assert list(store.iter_plane(normal, dist)) == expected, (normal, dist)
+        # Every tile facing this way is on one of those planes.
+        assert planes == {tile for tile in tiles if tile.normal == normal}
+        # Off-grid planes are empty.
+        assert list(store.iter_plane(normal, 32)) == []
+    assert list(store.iter_plane(Vec(1, 1, 0), 64)) == []
+    store.clear()
+    assert len(store) == 0
+    assert list(store.iter_plane(Vec(0, 0, 1), 64)) == []
@@ -72,3 +72,37 @@ def test_bbox() -> None:
     found = set(tree.find_bbox(bb_min, bb_max))
     # Order is irrelevant, but duplicates must all match.
     assert sorted(expected) == sorted(found)
+
+
+def test_insert_many() -> None:
+    """Test bulk-loading produces the same results as individual insertion."""
+    rand = Random(5678)
+    SIZE = 128.0
+    points = [
+        (
+            Vec(rand.uniform(-SIZE, SIZE), rand.uniform(-SIZE, SIZE), rand.uniform(-SIZE, SIZE)),
+            Vec(rand.uniform(-SIZE, SIZE), rand.uniform(-SIZE, SIZE), rand.uniform(-SIZE, SIZE)),
+            rand.getrandbits(64).to_bytes(8, 'little')
+        )
+        for _ in range(200)
+    ]
+    # Include some duplicate bboxes.
+    points += [(a, b, b'dup' + data) for a, b, data in points[:20]]
+    single = RTree()
+    for a, b, data in points:
+        single.insert(a, b, data)
+    bulk = RTree()
+    bulk.insert_many(points[:150])
+    # Adding to a non-empty tree inserts normally.
+    bulk.insert_many(points[150:])
+    assert len(bulk) == len(single) == 220
+    assert sorted(bulk, key=lambda t: t[2]) == sorted(single, key=lambda t: t[2])
+
+    for _ in range(20):
+        bb_min, bb_max = Vec.bbox(
+            Vec(rand.uniform(-SIZE, SIZE), rand.uniform(-SIZE, SIZE), rand.uniform(-SIZE, SIZE)),
+            Vec(rand.uniform(-SIZE, SIZE), rand.uniform(-SIZE, SIZE), rand.uniform(-SIZE, SIZE)),
+        )
+        assert sorted(bulk.find_bbox(bb_min, bb_max)) == sorted(single.find_bbox(bb_min, bb_max))
+    bulk.insert_many([])
+    assert len(bulk) == 220
@@ -1,6 +1,6 @@
 """Wraps the Rtree package, adding typing and usage of our Vec class."""
 from srctools.math import Vec
-from typing import Generic, TypeVar, Iterator, List, Tuple
+from typing import Generic, Iterable, TypeVar, Iterator, List, Tuple
 
 import attrs
 from rtree import index  # type: ignore
@@ -34,6 +34,9 @@ class RTree(Generic[ValueT]):
             ValueHolder[ValueT]
         ] = {}
 
+    def __bool__(self) -> bool:
+        return bool(self._by_id)
+
     def __len__(self) -> int:
         return sum(len(holder.values) for holder in self._by_id.values())
 
@@ -61,6 +64,43 @@ class RTree(Generic[ValueT]):
             if value not in holder.values:
                 holder.values.append(value)
 
+    def insert_many(self, entries: Iterable[Tuple[Vec, Vec, ValueT]]) -> None:
+        """Add many values at once.
+
+        If the tree is empty, it is bulk-loaded which is much faster and produces a better
+        structured tree than individual insertions.
+        """
+        was_empty = not self._by_id
+        new_holders: List[ValueHolder[ValueT]] = []
+        for p1, p2, value in entries:
+            mins, maxs = Vec.bbox(p1, p2)
+            coords = (mins.x, mins.y, mins.z, maxs.x, maxs.y, maxs.z)
+            try:
+                holder = self._by_coord[coords]
+            except KeyError:
+                holder = ValueHolder([value], *coords)
+                self._by_id[id(holder)] = self._by_coord[coords] = holder
+                new_holders.append(holder)
+            else:
+                if value not in holder.values:
+                    holder.values.append(value)
+        if not new_holders:
+            return
+        if was_empty:
+            self.tree = index.Index((
+                (id(holder), (
+                    holder.min_x, holder.min_y, holder.min_z,
+                    holder.max_x, holder.max_y, holder.max_z,
+                ), None)
+                for holder in new_holders
+            ), properties=PROPS)
+        else:
+            for holder in new_holders:
+                self.tree.insert(id(holder), (
+                    holder.min_x, holder.min_y, holder.min_z,
+                    holder.max_x, holder.max_y, holder.max_z,
+                ))
+
     def remove(self, p1: Vec, p2: Vec, value: ValueT) -> None:
         """Remove the specified value from the tree."""
         mins, maxs = Vec.bbox(p1, p2)
@@ -82,6 +122,14 @@ class RTree(Generic[ValueT]):
         for holder_id in self.tree.intersection((*mins, *maxs)):
             yield from self._by_id[holder_id].values
 
+    def bounds(self) -> Tuple[float, float, float, float, float, float]:
+        """Return the bounding box containing all values, as (min_x, min_y, min_z, max_x, max_y, max_z).
+
+        If empty, the mins are larger than the maxes.
+        """
+        min_x, min_y, min_z, max_x, max_y, max_z = self.tree.bounds
+        return min_x, min_y, min_z, max_x, max_y, max_z
+
     def find_nearest(self, point: Vec, min_count: int = 1) -> Iterator[ValueT]:
         """Find the values nearest to a point.
 
@@ -11,6 +11,7 @@ import logging
 import pickle
 from io import StringIO
 from collections import defaultdict, namedtuple, Counter
+from concurrent.futures import ProcessPoolExecutor
 from atomicwrites import atomic_write
 
 from srctools import Property, Vec, Vec_tuple, Angle, Matrix
@@ -38,13 +39,15 @@ from precomp import (
     antlines,
     packing,
     conditions,
+    condition_profile,
     fizzler,
     voice_line,
     music,
     rand,
 )
 import consts
-import editoritems
+import compiled_conf
+import editoritems_db
 
 from typing import Any, Dict, List, Tuple, Set, Iterable, Optional, cast
 from typing_extensions import TypedDict
@@ -86,17 +89,22 @@ PRESET_CLUMPS = []  # Additional clumps set by conditions, for certain areas.
 
 def load_settings() -> Tuple[
     antlines.AntType, antlines.AntType,
-    Dict[str, editoritems.Item],
+    editoritems_db.ItemDatabase,
     corridor.ExportedConf,
 ]:
     """Load in all our settings from vbsp_config."""
-    try:
-        with open("bee2/vbsp_config.cfg", encoding='utf8') as config:
-            conf = Property.parse(config, 'bee2/vbsp_config.cfg')
-    except FileNotFoundError:
-        LOGGER.warning('Error: No vbsp_config file!')
-        conf = Property(None, [])
-        # All the find_all commands will fail, and we will use the defaults.
+    # Prefer the binary form, which only loads each section when used.
+    conf = compiled_conf.load('bee2/vbsp_config.bin', 'bee2/vbsp_config.cfg')
+    if conf is None:
+        try:
+            with open("bee2/vbsp_config.cfg", encoding='utf8') as config:
+                conf = compiled_conf.ConfSections.from_property(
+                    Property.parse(config, 'bee2/vbsp_config.cfg')
+                )
+        except FileNotFoundError:
+            LOGGER.warning('Error: No vbsp_config file!')
+            conf = compiled_conf.ConfSections.from_property(Property(None, []))
+            # All the find_all commands will fail, and we will use the defaults.
 
     texturing.load_config(conf.find_block('textures', or_blank=True))
 
@@ -131,26 +139,18 @@ def load_settings() -> Tuple[
 
     # Load in templates locations.
     template_brush.load_templates('bee2/templates.lst')
+    template_brush.load_cache('bee2/templates.bin')
 
-    # Load a copy of the item configuration.
-    id_to_item: dict[str, editoritems.Item] = {}
-    item: editoritems.Item
-    with open('bee2/editor.bin', 'rb') as inst:
-        try:
-            for item in pickle.load(inst):
-                id_to_item[item.id.casefold()] = item
-        except Exception:  # Anything from __setstate__ etc.
-            LOGGER.exception(
-                'Failed to parse editoritems dump. Recompile the compiler '
-                'and/or export the palette.'
-                if utils.DEV_MODE else
-                'Failed to parse editoritems dump. Re-export BEE2.'
-            )
-            sys.exit(1)
+    # Load a copy of the item configuration. Only the summaries are parsed
+    # here, each item is loaded when it's first used.
+    try:
+        id_to_item = editoritems_db.load('bee2/editor.bin')
+    except Exception:  # Anything from __setstate__ etc.
+        editoritems_db.parse_failed()
 
     # Send that data to the relevant modules.
-    instanceLocs.load_conf(id_to_item.values())
-    connections.read_configs(id_to_item.values())
+    instanceLocs.load_conf(id_to_item.summaries)
+    connections.read_configs(id_to_item.summaries)
 
     # Parse packlist data.
     with open('bee2/pack_list.cfg') as f:
@@ -165,10 +165,10 @@ def load_settings() -> Tuple[
         conditions.add(cond)
 
     # Data for different cube types.
-    cubes.parse_conf(conf)
+    cubes.parse_conf(conf.as_root('DropperItems'))
 
     # Fizzler data
-    fizzler.read_configs(conf)
+    fizzler.read_configs(conf.as_root('Fizzlers'))
 
     # Selected corridors.
     with open('bee2/corridors.bin', 'rb') as bf:
@@ -176,7 +176,7 @@ def load_settings() -> Tuple[
 
     # Signage items
     from precomp.conditions.signage import load_signs
-    load_signs(conf)
+    load_signs(conf.as_root('Signage'))
 
     # Get configuration for the elevator, defaulting to ''.
     elev = conf.find_block('elevator', or_blank=True)
@@ -798,7 +798,7 @@ def set_elev_videos(vmf: VMF, info: corridor.Info) -> None:
         LOGGER.warning('Invalid elevator video type!')
         return
 
-    transition_ents = instanceLocs.resolve('[transitionents]')
+    transition_ents = instanceLocs.resolve_filter('[transitionents]')
     for inst in vmf.by_class['func_instance']:
         if inst['file'].casefold() not in transition_ents:
             continue
@@ -920,11 +920,10 @@ def change_brush(vmf: VMF) -> None:
     # so we can ensure the 'fancy' pit is the largest one.
     # Valve just does it semi-randomly.
     goo_heights = Counter()
-    for pos, block in brushLoc.POS.items():
-        if block.is_goo and block.is_top:
-            # Block position is the center,
-            # save at the height of the top face
-            goo_heights[brushLoc.g2w(pos).z + 32] += 1
+    for pos, block in brushLoc.POS.iter_blocks(brushLoc.Block.GOO_TOP, brushLoc.Block.GOO_SINGLE):
+        # Block position is the center,
+        # save at the height of the top face
+        goo_heights[brushLoc.g2w(pos).z + 32] += 1
     # Find key with the highest value = z-level with highest brush.
     try:
         best_goo = max(goo_heights.items(), key=lambda x: x[1])[0]
@@ -1143,7 +1142,7 @@ def change_overlays(vmf: VMF) -> None:
             )
             conditions.ALL_INST.add(sign_inst.casefold())
             if sign_inst_pack:
-                packing.pack_list(vmf, sign_inst_pack)
+                packing.pack_list(sign_inst_pack)
             new_inst.fixup['mat'] = sign_type.name.lower()
 
         # Delete the overlay's targetname - signs aren't ever dynamic.
@@ -1557,9 +1556,18 @@ def main() -> None:
         LOGGER.info("PeTI map detected!")
 
         LOGGER.info("Loading settings...")
-        ant_floor, ant_wall, id_to_item, corridor_conf = load_settings()
-
-        vmf = load_map(path)
+        if BEE2_config.get_bool('General', 'parallel_load', False):
+            # The map and settings don't depend on each other, so parse the
+            # map in another process at the same time.
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                LOGGER.info("Parsing map in the background...")
+                map_future = pool.submit(VMF.parse, path)
+                ant_floor, ant_wall, id_to_item, corridor_conf = load_settings()
+                vmf = map_future.result()
+            LOGGER.info("Loading complete!")
+        else:
+            ant_floor, ant_wall, id_to_item, corridor_conf = load_settings()
+            vmf = load_map(path)
         coll = Collisions()
 
         instance_traits.set_traits(vmf, id_to_item, coll)
@@ -1599,7 +1607,12 @@ def main() -> None:
 
         texturing.setup(game, vmf, list(tiling.TILES.values()))
 
-        conditions.check_all(vmf, coll, info)
+        if condition_profile.is_enabled(BEE2_config):
+            profiler = condition_profile.Profiler()
+            conditions.check_all(vmf, coll, info, profiler)
+            profiler.write_report('bee2/condition_profile')
+        else:
+            conditions.check_all(vmf, coll, info)
         add_extra_ents(vmf, info)
 
         tiling.generate_brushes(vmf)
@@ -1621,6 +1634,8 @@ def main() -> None:
         # Set this so VRAD can know.
         vmf.spawn['BEE2_is_preview'] = info.is_preview
 
+        packing.write_ents(vmf)
+        template_brush.save_cache('bee2/templates.bin')
         save(vmf, new_path)
         if not skip_vbsp:
             run_vbsp(